@@ -30,8 +30,17 @@ author: "Kevin Carter (@cloudnull)"
 options:
     name:
         description:
-          - Name of a container.
-        required: true
+          - Name of a container. Required unless I(containers) is given.
+        required: false
+    containers:
+        version_added: "2.1"
+        description:
+          - List of existing containers to start or stop concurrently. This
+            can be used instead of I(name) with the states "started" and
+            "stopped" only. All state changes are issued first and the module
+            then waits for all containers at once, so the run takes about as
+            long as the slowest container.
+        required: false
     backing_store:
         choices:
           - dir
@@ -149,11 +158,36 @@ options:
         choices:
           - gzip
           - bzip2
+          - xz
+          - zstd
           - none
         description:
           - Type of compression to use when creating an archive of a running
-            container.
+            container. A multi-threaded compressor (pigz, pbzip2, pxz or
+            zstd -T0) is used when one is available on the host.
         default: gzip
+    archive_mode:
+        version_added: "2.1"
+        choices:
+          - copy
+          - stream
+        description:
+          - How to build the archive. C(copy) first copies the container into
+            a temporary directory and archives the copy. C(stream) archives
+            the container directory, LVM snapshot or overlayfs mount directly
+            without the intermediate copy.
+        default: copy
+    archive_incremental:
+        version_added: "2.1"
+        choices:
+          - true
+          - false
+        description:
+          - Create incremental archives relative to the previous archive of
+            the container. The manifest of the last archive is kept next to
+            the archives in I(archive_path) as C(<name>.snar) and each archive
+            is named with a timestamp. Requires I(archive_mode=stream).
+        default: false
     state:
         choices:
           - started
@@ -194,6 +228,11 @@ notes:
     tarball of the running container. The "archive" option supports LVM backed
     containers and will create a snapshot of the running container when
     creating the archive.
+  - An incremental archive only contains the files changed since the previous
+    archive. To restore, extract the first (full) archive followed by each
+    incremental archive in order using "tar --listed-incremental=/dev/null".
+  - When "containers" is used the containers must already exist; missing
+    containers are reported as a failure and are not created.
   - If your distro does not have a package for "python2-lxc", which is a
     requirement for this module, it can be installed from source at
     "https://github.com/lxc/python2-lxc" or installed via pip using the package
@@ -316,6 +355,17 @@ EXAMPLES = """
     archive: true
     archive_path: /opt/archives
 
+# Stream an incremental, zstd compressed archive of a running container
+# without copying it to a temporary directory first.
+- name: Incremental container archive
+  lxc_container:
+    name: test-container-started
+    archive: true
+    archive_mode: stream
+    archive_incremental: true
+    archive_compression: zstd
+    archive_path: /opt/archives
+
 # Create a container using overlayfs, create an archive of it, create a
 # snapshot clone of the container and and finally leave the container
 # in a frozen state. The container archive will be compressed using gzip.
@@ -362,6 +412,14 @@ EXAMPLES = """
     name: test-container-new-archive-destroyed-clone
     state: started
 
+- name: Start a group of existing containers concurrently
+  lxc_container:
+    containers:
+      - test-container-stopped
+      - test-container-started
+      - test-container-new-archive-clone
+    state: started
+
 - name: Destroy a container
   lxc_container:
     name: "{{ item }}"
@@ -391,19 +449,28 @@ else:
 
 
 # LXC_COMPRESSION_MAP is a map of available compression types when creating
-# an archive of a container.
+# an archive of a container. The programs are tried in order and the first one
+# found on the host is used to compress the tar stream.
 LXC_COMPRESSION_MAP = {
     'gzip': {
         'extension': 'tar.tgz',
-        'argument': '-czf'
+        'programs': [['pigz', '-c'], ['gzip', '-c']]
     },
     'bzip2': {
         'extension': 'tar.bz2',
-        'argument': '-cjf'
+        'programs': [['pbzip2', '-c'], ['bzip2', '-c']]
+    },
+    'xz': {
+        'extension': 'tar.xz',
+        'programs': [['pxz', '-c'], ['xz', '-T0', '-c']]
+    },
+    'zstd': {
+        'extension': 'tar.zst',
+        'programs': [['zstd', '-T0', '-q', '-c']]
     },
     'none': {
         'extension': 'tar',
-        'argument': '-cf'
+        'programs': []
     }
 }
 
@@ -462,6 +529,14 @@ LXC_BACKING_STORE = {
 }
 
 
+# LXC_GROUP_STATES is a map of states supported when managing a list of
+# containers to the liblxc state waited for.
+LXC_GROUP_STATES = {
+    'started': 'RUNNING',
+    'stopped': 'STOPPED'
+}
+
+
 # LXC_LOGGING_LEVELS is a map of available log levels
 LXC_LOGGING_LEVELS = {
     'INFO': ['info', 'INFO', 'Info'],
@@ -930,14 +1005,13 @@ class LxcContainerManagement(object):
         """
 
         self.container = self.get_container_bind()
-        for _ in xrange(timeout):
-            if self._get_state() != 'running':
-                self.container.start()
-                self.state_change = True
-                # post startup sleep for 1 second.
-                time.sleep(1)
-            else:
-                return True
+        if self._get_state() == 'running':
+            return True
+
+        self.container.start()
+        self.state_change = True
+        if self.container.wait('RUNNING', timeout):
+            return True
         else:
             self.failure(
                 lxc_container=self._container_data(),
@@ -984,26 +1058,24 @@ class LxcContainerManagement(object):
         :type timeout: ``int``
         """
 
-        for _ in xrange(timeout):
-            if not self._container_exists(container_name=self.container_name):
-                break
+        if not self._container_exists(container_name=self.container_name):
+            return
 
-            # Check if the container needs to have an archive created.
-            self._check_archive()
+        # Check if the container needs to have an archive created.
+        self._check_archive()
 
-            # Check if the container is to be cloned
-            self._check_clone()
+        # Check if the container is to be cloned
+        self._check_clone()
 
-            if self._get_state() != 'stopped':
-                self.state_change = True
-                self.container.stop()
+        if self._get_state() != 'stopped':
+            self.state_change = True
+            self.container.stop()
+            self.container.wait('STOPPED', timeout)
 
-            if self.container.destroy():
-                self.state_change = True
+        if self.container.destroy():
+            self.state_change = True
 
-            # post destroy attempt sleep for 1 second.
-            time.sleep(1)
-        else:
+        if self._container_exists(container_name=self.container_name):
             self.failure(
                 lxc_container=self._container_data(),
                 error='Failed to destroy container'
@@ -1035,10 +1107,12 @@ class LxcContainerManagement(object):
                 pass
             elif container_state == 'running':
                 self.container.freeze()
+                self.container.wait('FROZEN', 60)
                 self.state_change = True
             else:
                 self._container_startup()
                 self.container.freeze()
+                self.container.wait('FROZEN', 60)
                 self.state_change = True
 
             # Check if the container needs to have an archive created.
@@ -1069,6 +1143,7 @@ class LxcContainerManagement(object):
 
             if self._get_state() != 'stopped':
                 self.container.stop()
+                self.container.wait('STOPPED', 60)
                 self.state_change = True
 
             # Run container startup
@@ -1102,6 +1177,7 @@ class LxcContainerManagement(object):
 
             if self._get_state() != 'stopped':
                 self.container.stop()
+                self.container.wait('STOPPED', 60)
                 self.state_change = True
 
             # Check if the container needs to have an archive created.
@@ -1330,44 +1406,139 @@ class LxcContainerManagement(object):
         :type source_dir: ``str``
         """
 
+        source_dir = os.path.realpath(os.path.expanduser(source_dir))
+        return self._stream_tar(members=[(source_dir, ['.'])])
+
+    def _get_compressor(self, compression_type):
+        """Return the command of the first available compressor.
+
+        :param compression_type: Entry of ``LXC_COMPRESSION_MAP``.
+        :type compression_type: ``dict``
+        :returns: compressor command or None when no compression is used.
+        :rtype: ``list``
+        """
+
+        if not compression_type['programs']:
+            return None
+
+        for program in compression_type['programs']:
+            bin_path = self.module.get_bin_path(program[0])
+            if bin_path:
+                return [bin_path] + program[1:]
+        else:
+            self.failure(
+                error='Compressor not found',
+                rc=1,
+                msg='none of [ %s ] were found on the host' % ', '.join(
+                    [i[0] for i in compression_type['programs']]
+                )
+            )
+
+    def _stream_tar(self, members, incremental=False):
+        """Stream a tar of ``members`` through a compressor into an archive.
+
+        :param members: Tuples of a directory and the paths within it to
+                        archive, the paths are stored relative to it.
+        :type members: ``list``
+        :param incremental: Only archive changes since the last archive.
+        :type incremental: ``bol``
+        :returns: path of the created archive.
+        :rtype: ``str``
+        """
+
         archive_path = self.module.params.get('archive_path')
         if not os.path.isdir(archive_path):
             os.makedirs(archive_path)
 
         archive_compression = self.module.params.get('archive_compression')
         compression_type = LXC_COMPRESSION_MAP[archive_compression]
-
-        # remove trailing / if present.
-        archive_name = '%s.%s' % (
-            os.path.join(
-                archive_path,
-                self.container_name
-            ),
-            compression_type['extension']
-        )
+        compressor = self._get_compressor(compression_type)
+
+        archive_base = os.path.join(archive_path, self.container_name)
+        if incremental:
+            archive_name = '%s.%s.%s' % (
+                archive_base,
+                time.strftime('%Y%m%d%H%M%S'),
+                compression_type['extension']
+            )
+        else:
+            archive_name = '%s.%s' % (
+                archive_base,
+                compression_type['extension']
+            )
 
         build_command = [
             self.module.get_bin_path('tar', True),
-            '--directory=%s' % os.path.realpath(
-                os.path.expanduser(source_dir)
-            ),
-            compression_type['argument'],
-            archive_name,
-            '.'
+            '--create',
+            '--file=-'
         ]
 
-        rc, stdout, err = self._run_command(
-            build_command=build_command,
-            unsafe_shell=True
-        )
+        # The manifest is updated on a copy so that a failed archive does not
+        # leave a manifest describing data that was never archived.
+        snapshot_file = '%s.snar' % archive_base
+        snapshot_work_file = '%s.snar.tmp' % archive_base
+        if incremental:
+            if os.path.exists(snapshot_file):
+                shutil.copy2(snapshot_file, snapshot_work_file)
+            build_command.extend([
+                '--listed-incremental=%s' % snapshot_work_file,
+                '--no-check-device'
+            ])
+
+        for directory, paths in members:
+            if paths:
+                build_command.append('--directory=%s' % directory)
+                build_command.extend(paths)
+
+        err = ''
+        tar_err = tempfile.TemporaryFile()
+        archive = open(archive_name, 'wb')
+        try:
+            if compressor:
+                tar = subprocess.Popen(
+                    build_command,
+                    stdout=subprocess.PIPE,
+                    stderr=tar_err
+                )
+                compress = subprocess.Popen(
+                    compressor,
+                    stdin=tar.stdout,
+                    stdout=archive,
+                    stderr=subprocess.PIPE
+                )
+                tar.stdout.close()
+                _, err = compress.communicate()
+                rc = tar.wait() or compress.returncode
+            else:
+                tar = subprocess.Popen(
+                    build_command,
+                    stdout=archive,
+                    stderr=tar_err
+                )
+                rc = tar.wait()
+        finally:
+            archive.close()
+            tar_err.seek(0)
+            err = tar_err.read() + err
+            tar_err.close()
+
         if rc != 0:
+            if os.path.exists(snapshot_work_file):
+                os.remove(snapshot_work_file)
+            os.remove(archive_name)
+            command = ' '.join(build_command)
+            if compressor:
+                command = '%s | %s' % (command, ' '.join(compressor))
             self.failure(
                 err=err,
                 rc=rc,
                 msg='failed to create tar archive',
-                command=' '.join(build_command)
+                command=command
             )
 
+        if incremental:
+            os.rename(snapshot_work_file, snapshot_file)
+
         return archive_name
 
     def _lvm_lv_remove(self, lv_name):
@@ -1476,6 +1647,132 @@ class LxcContainerManagement(object):
                     % (lowerdir, upperdir, mount_point, build_command)
             )
 
+    def _container_stream_tar(self):
+        """Stream a tar archive directly from an LXC container.
+
+        Unlike ``_container_create_tar`` the container is not copied into a
+        temporary directory first. The process is as follows:
+            * Stop or Freeze the container
+            * If LVM backed:
+                * Create LVM snapshot of LV backing the container
+                * Mount the snapshot to tmpdir/rootfs
+            * If overlayfs backed:
+                * Mount the overlay to tmpdir/rootfs
+            * Stream a tar of the container directory and the mounted rootfs
+              into the compressor
+            * Restore the state of the container
+            * Clean up
+        """
+
+        incremental = self.module.params.get('archive_incremental') in BOOLEANS_TRUE
+
+        # Create a temp dir used as the parent of the rootfs mount point
+        temp_dir = tempfile.mkdtemp()
+        mount_point = os.path.join(temp_dir, 'rootfs')
+
+        # LXC container rootfs
+        lxc_rootfs = self.container.get_config_item('lxc.rootfs')
+
+        # Test if the containers rootfs is a block device
+        block_backed = lxc_rootfs.startswith(os.path.join(os.sep, 'dev'))
+
+        # Test if the container is using overlayfs
+        overlayfs_backed = lxc_rootfs.startswith('overlayfs')
+
+        # Set the snapshot name if needed
+        snapshot_name = '%s_lxc_snapshot' % self.container_name
+
+        # Entries of the container directory which are replaced by the mounted
+        # rootfs in the archive.
+        if overlayfs_backed:
+            lowerdir, upperdir = lxc_rootfs.split(':')[1:]
+            container_dir = os.path.dirname(upperdir)
+            skip = ['rootfs', os.path.basename(upperdir)]
+        elif block_backed:
+            container_dir = os.path.dirname(self.container.config_file_name)
+            skip = ['rootfs']
+        else:
+            container_dir = os.path.dirname(lxc_rootfs)
+            skip = []
+
+        container_state = self._get_state()
+        mounted = False
+        snapshotted = False
+        try:
+            # Ensure the original container is stopped or frozen
+            if container_state not in ['stopped', 'frozen']:
+                if container_state == 'running':
+                    self.container.freeze()
+                else:
+                    self.container.stop()
+
+            if block_backed:
+                if snapshot_name not in self._lvm_lv_list():
+                    os.makedirs(mount_point)
+
+                    # Take snapshot
+                    size, measurement = self._get_lv_size(
+                        lv_name=self.container_name
+                    )
+                    self._lvm_snapshot_create(
+                        source_lv=self.container_name,
+                        snapshot_name=snapshot_name,
+                        snapshot_size_gb=size
+                    )
+                    snapshotted = True
+
+                    # Mount snapshot
+                    self._lvm_lv_mount(
+                        lv_name=snapshot_name,
+                        mount_point=mount_point
+                    )
+                    mounted = True
+                else:
+                    self.failure(
+                        err='snapshot [ %s ] already exists' % snapshot_name,
+                        rc=1,
+                        msg='The snapshot [ %s ] already exists. Please clean'
+                            ' up old snapshot of containers before continuing.'
+                            % snapshot_name
+                    )
+            elif overlayfs_backed:
+                os.makedirs(mount_point)
+                self._overlayfs_mount(
+                    lowerdir=lowerdir,
+                    upperdir=upperdir,
+                    mount_point=mount_point
+                )
+                mounted = True
+
+            members = [(
+                container_dir,
+                sorted([i for i in os.listdir(container_dir) if i not in skip])
+            )]
+            if mounted:
+                members.append((temp_dir, ['rootfs']))
+
+            # Set the state as changed and set a new fact
+            self.state_change = True
+            return self._stream_tar(members=members, incremental=incremental)
+        finally:
+            if mounted:
+                # unmount snapshot
+                self._unmount(mount_point)
+
+            if snapshotted:
+                # Remove snapshot
+                self._lvm_lv_remove(snapshot_name)
+
+            # Restore original state of container
+            if container_state == 'running':
+                if self._get_state() == 'frozen':
+                    self.container.unfreeze()
+                else:
+                    self.container.start()
+
+            # Remove tmpdir
+            shutil.rmtree(temp_dir)
+
     def _container_create_tar(self):
         """Create a tar archive from an LXC container.
 
@@ -1491,6 +1788,9 @@ class LxcContainerManagement(object):
             * Clean up
         """
 
+        if self.module.params.get('archive_mode') == 'stream':
+            return self._container_stream_tar()
+
         # Create a temp dir
         temp_dir = tempfile.mkdtemp()
 
@@ -1620,14 +1920,109 @@ class LxcContainerManagement(object):
         )
 
 
+class LxcContainerGroupManagement(object):
+    def __init__(self, module, timeout=60):
+        """Concurrent start/stop of a list of LXC containers via Ansible.
+
+        :param module: Processed Ansible Module.
+        :type module: ``object``
+        :param timeout: Time before waiting on the containers is abandoned.
+        :type timeout: ``int``
+        """
+        self.module = module
+        self.state = self.module.params.get('state')
+        self.container_names = self.module.params['containers']
+        self.timeout = timeout
+
+    def _get_containers(self):
+        """Return a dict of container binds for all requested containers.
+
+        :returns: map of container name to container.
+        :rtype: ``dict``
+        """
+
+        lxc_path = self.module.params['lxc_path']
+        if lxc_path:
+            existing = set(lxc.list_containers(config_path=lxc_path))
+        else:
+            existing = set(lxc.list_containers())
+        missing = [i for i in self.container_names if i not in existing]
+        if missing:
+            self.module.fail_json(
+                error='Containers not found',
+                rc=1,
+                msg='The containers [ %s ] do not exist.' % ', '.join(missing)
+            )
+
+        return dict(
+            (i, lxc.Container(name=i, config_path=lxc_path))
+            for i in self.container_names
+        )
+
+    def run(self):
+        """Run the main method.
+
+        Every container is first sent its state change without waiting, and
+        only then are all of them waited on against a single shared deadline.
+        """
+
+        target = LXC_GROUP_STATES[self.state]
+        containers = self._get_containers()
+
+        changed = []
+        for name, container in containers.items():
+            container_state = str(container.state).lower()
+            if self.state == 'started':
+                if container_state == 'running':
+                    continue
+                elif container_state == 'frozen':
+                    container.unfreeze()
+                else:
+                    container.start()
+            elif container_state != 'stopped':
+                container.stop()
+            else:
+                continue
+            changed.append(name)
+
+        deadline = time.time() + self.timeout
+        failed = []
+        for name in changed:
+            remaining = max(deadline - time.time(), 0)
+            if not containers[name].wait(target, int(remaining)):
+                failed.append(name)
+
+        outcome = dict(
+            (name, str(container.state).lower())
+            for name, container in containers.items()
+        )
+
+        if failed:
+            self.module.fail_json(
+                lxc_containers=outcome,
+                error='Failed to %s containers' % self.state,
+                rc=1,
+                msg='The containers [ %s ] did not reach the %s state. Check'
+                    ' that lxc is available and that the containers are in a'
+                    ' functional state.' % (', '.join(failed), self.state)
+            )
+
+        self.module.exit_json(
+            changed=bool(changed),
+            lxc_containers=outcome
+        )
+
+
 def main():
     """Ansible Main module."""
 
     module = AnsibleModule(
         argument_spec=dict(
             name=dict(
-                type='str',
-                required=True
+                type='str'
+            ),
+            containers=dict(
+                type='list'
             ),
             template=dict(
                 type='str',
@@ -1709,8 +2104,18 @@ def main():
             archive_compression=dict(
                 choices=LXC_COMPRESSION_MAP.keys(),
                 default='gzip'
+            ),
+            archive_mode=dict(
+                choices=['copy', 'stream'],
+                default='copy'
+            ),
+            archive_incremental=dict(
+                choices=BOOLEANS,
+                default='false'
             )
         ),
+        required_one_of=[['name', 'containers']],
+        mutually_exclusive=[['name', 'containers']],
         supports_check_mode=False,
     )
 
@@ -1719,6 +2124,20 @@ def main():
             msg='The `lxc` module is not importable. Check the requirements.'
         )
 
+    if module.params.get('containers'):
+        if module.params['state'] not in LXC_GROUP_STATES:
+            module.fail_json(
+                msg='containers can only be used with the states: %s' %
+                    ', '.join(LXC_GROUP_STATES.keys())
+            )
+        LxcContainerGroupManagement(module=module).run()
+
+    if module.params.get('archive_incremental') in BOOLEANS_TRUE:
+        if module.params.get('archive_mode') != 'stream':
+            module.fail_json(
+                msg='archive_incremental requires archive_mode=stream'
+            )
+
     lv_name = module.params.get('lv_name')
     if not lv_name:
         module.params['lv_name'] = module.params.get('name')
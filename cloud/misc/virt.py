@@ -135,35 +135,90 @@ class LibvirtConnection(object):
             raise Exception("hypervisor connection failure")
 
         self.conn = conn
+        self._domains = None
+        self._by_name = {}
+        self._by_uuid = {}
 
-    def find_vm(self, vmid):
+    def all_domains(self):
         """
-        Extra bonus feature: vmid = -1 returns a list of everything
+        Return every running and defined domain, enumerated once per run and
+        indexed by name and UUID
         """
-        conn = self.conn
+        if self._domains is not None:
+            return self._domains
 
+        conn = self.conn
         vms = []
+        if hasattr(conn, 'listAllDomains'):
+            vms = conn.listAllDomains(0)
+        else:
+            # this block of code borrowed from virt-manager:
+            # get working domain's name
+            ids = conn.listDomainsID()
+            for id in ids:
+                vm = conn.lookupByID(id)
+                vms.append(vm)
+            # get defined domain
+            names = conn.listDefinedDomains()
+            for name in names:
+                vm = conn.lookupByName(name)
+                vms.append(vm)
 
-        # this block of code borrowed from virt-manager:
-        # get working domain's name
-        ids = conn.listDomainsID()
-        for id in ids:
-            vm = conn.lookupByID(id)
-            vms.append(vm)
-        # get defined domain
-        names = conn.listDefinedDomains()
-        for name in names:
-            vm = conn.lookupByName(name)
-            vms.append(vm)
+        for vm in vms:
+            self._by_name[vm.name()] = vm
+            self._by_uuid[vm.UUIDString()] = vm
+        self._domains = vms
+        return vms
 
+    def find_vm(self, vmid):
+        """
+        Extra bonus feature: vmid = -1 returns a list of everything
+        """
         if vmid == -1:
-            return vms
+            return self.all_domains()
 
-        for vm in vms:
-            if vm.name() == vmid:
+        if self._domains is not None:
+            vm = self._by_name.get(vmid, self._by_uuid.get(vmid))
+            if vm is not None:
                 return vm
+            raise VMNotFound("virtual machine %s not found" % vmid)
+
+        try:
+            return self.conn.lookupByName(vmid)
+        except libvirt.libvirtError:
+            raise VMNotFound("virtual machine %s not found" % vmid)
+
+    def all_infos(self):
+        """
+        Return a map of domain name to (domain, info tuple) for every domain,
+        gathered with a single getAllDomainStats call where available
+        """
+        infos = {}
+        stats = []
+        if hasattr(self.conn, 'getAllDomainStats'):
+            flags = (libvirt.VIR_DOMAIN_STATS_STATE |
+                     libvirt.VIR_DOMAIN_STATS_CPU_TOTAL |
+                     libvirt.VIR_DOMAIN_STATS_BALLOON |
+                     libvirt.VIR_DOMAIN_STATS_VCPU)
+            try:
+                stats = self.conn.getAllDomainStats(flags)
+            except libvirt.libvirtError:
+                stats = []
 
-        raise VMNotFound("virtual machine %s not found" % vmid)
+        for vm, record in stats:
+            try:
+                data = (record['state.state'], record['balloon.maximum'],
+                        record['balloon.current'], record['vcpu.current'],
+                        record['cpu.time'])
+            except KeyError:
+                # inactive domains carry no balloon/cpu stats
+                data = vm.info()
+            infos[vm.name()] = (vm, data)
+
+        for vm in self.all_domains():
+            if vm.name() not in infos:
+                infos[vm.name()] = (vm, vm.info())
+        return infos
 
     def shutdown(self, vmid):
         return self.find_vm(vmid).shutdown()
@@ -235,9 +290,11 @@ class Virt(object):
     def __init__(self, uri, module):
         self.module = module
         self.uri = uri
+        self.conn = None
 
     def __get_conn(self):
-        self.conn = LibvirtConnection(self.uri, self.module)
+        if self.conn is None:
+            self.conn = LibvirtConnection(self.uri, self.module)
         return self.conn
 
     def get_vm(self, vmid):
@@ -245,18 +302,17 @@ class Virt(object):
         return self.conn.find_vm(vmid)
 
     def state(self):
-        vms = self.list_vms()
+        infos = self.__get_conn().all_infos()
         state = []
-        for vm in vms:
-            state_blurb = self.conn.get_status(vm)
+        for vm in sorted(infos):
+            state_blurb = VIRT_STATE_NAME_MAP.get(infos[vm][1][0],"unknown")
             state.append("%s %s" % (vm,state_blurb))
         return state
 
     def info(self):
-        vms = self.list_vms()
+        infos = self.__get_conn().all_infos()
         info = dict()
-        for vm in vms:
-            data = self.conn.find_vm(vm).info()
+        for vm, (dom, data) in infos.items():
             # libvirt returns maxMem, memory, and cpuTime as long()'s, which
             # xmlrpclib tries to convert to regular int's during serialization.
             # This throws exceptions, so convert them to strings here and
@@ -269,7 +325,7 @@ class Virt(object):
                 "nrVirtCpu" : data[3],
                 "cpuTime"   : str(data[4]),
             }
-            info[vm]["autostart"] = self.conn.get_autostart(vm)
+            info[vm]["autostart"] = dom.autostart()
 
         return info
 
@@ -291,18 +347,12 @@ class Virt(object):
 
     def list_vms(self, state=None):
         self.conn = self.__get_conn()
-        vms = self.conn.find_vm(-1)
+        if not state:
+            return [x.name() for x in self.conn.find_vm(-1)]
         results = []
-        for x in vms:
-            try:
-                if state:
-                    vmstate = self.conn.get_status2(x)
-                    if vmstate == state:
-                        results.append(x.name())
-                else:
-                    results.append(x.name())
-            except:
-                pass
+        for name, (vm, data) in self.conn.all_infos().items():
+            if VIRT_STATE_NAME_MAP.get(data[0],"unknown") == state:
+                results.append(name)
         return results
 
     def virttype(self):
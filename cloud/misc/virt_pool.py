@@ -208,30 +208,57 @@ class LibvirtConnection(object):
             raise Exception("hypervisor connection failure")
 
         self.conn = conn
+        self._entries = None
+        self._index = {}
+        self._trees = {}
 
-    def find_entry(self, entryid):
-        # entryid = -1 returns a list of everything
+    def list_entries(self):
+        # List every active and inactive pool once per run
 
-        results = []
+        if self._entries is not None:
+            return self._entries
 
-        # Get active entries
-        for name in self.conn.listStoragePools():
-            entry = self.conn.storagePoolLookupByName(name)
-            results.append(entry)
+        if hasattr(self.conn, 'listAllStoragePools'):
+            results = self.conn.listAllStoragePools(0)
+        else:
+            results = []
 
-        # Get inactive entries
-        for name in self.conn.listDefinedStoragePools():
-            entry = self.conn.storagePoolLookupByName(name)
-            results.append(entry)
+            # Get active entries
+            for name in self.conn.listStoragePools():
+                entry = self.conn.storagePoolLookupByName(name)
+                results.append(entry)
 
-        if entryid == -1:
-            return results
+            # Get inactive entries
+            for name in self.conn.listDefinedStoragePools():
+                entry = self.conn.storagePoolLookupByName(name)
+                results.append(entry)
 
         for entry in results:
-            if entry.name() == entryid:
-                return entry
+            self._index[entry.name()] = entry
+        self._entries = results
+        return results
 
-        raise EntryNotFound("storage pool %s not found" % entryid)
+    def find_entry(self, entryid):
+        # entryid = -1 returns a list of everything
+
+        if entryid == -1:
+            return self.list_entries()
+
+        if entryid in self._index:
+            return self._index[entryid]
+
+        try:
+            entry = self.conn.storagePoolLookupByName(entryid)
+        except libvirt.libvirtError:
+            raise EntryNotFound("storage pool %s not found" % entryid)
+        self._index[entryid] = entry
+        return entry
+
+    def get_xml_tree(self, entryid):
+        # The pool XML is fetched and parsed once, then shared by all getters
+        if entryid not in self._trees:
+            self._trees[entryid] = etree.fromstring(self.find_entry(entryid).XMLDesc(0))
+        return self._trees[entryid]
 
     def create(self, entryid):
         if not self.module.check_mode:
@@ -286,10 +313,13 @@ class LibvirtConnection(object):
         return self.find_entry(entryid).numOfVolumes()
 
     def get_volume_names(self, entryid):
-        return self.find_entry(entryid).listVolumes()
+        entry = self.find_entry(entryid)
+        if hasattr(entry, 'listAllVolumes'):
+            return [volume.name() for volume in entry.listAllVolumes(0)]
+        return entry.listVolumes()
 
     def get_devices(self, entryid):
-        xml = etree.fromstring(self.find_entry(entryid).XMLDesc(0))
+        xml = self.get_xml_tree(entryid)
         if xml.xpath('/pool/source/device'):
             result = []
             for device in xml.xpath('/pool/source/device'):
@@ -300,7 +330,7 @@ class LibvirtConnection(object):
             raise ValueError('No devices specified')
 
     def get_format(self, entryid):
-        xml = etree.fromstring(self.find_entry(entryid).XMLDesc(0))
+        xml = self.get_xml_tree(entryid)
         try:
             result = xml.xpath('/pool/source/format')[0].get('type')
         except:
@@ -308,7 +338,7 @@ class LibvirtConnection(object):
         return result
 
     def get_host(self, entryid):
-        xml = etree.fromstring(self.find_entry(entryid).XMLDesc(0))
+        xml = self.get_xml_tree(entryid)
         try:
             result = xml.xpath('/pool/source/host')[0].get('name')
         except:
@@ -316,7 +346,7 @@ class LibvirtConnection(object):
         return result
 
     def get_source_path(self, entryid):
-        xml = etree.fromstring(self.find_entry(entryid).XMLDesc(0))
+        xml = self.get_xml_tree(entryid)
         try:
             result = xml.xpath('/pool/source/dir')[0].get('path')
         except:
@@ -324,11 +354,11 @@ class LibvirtConnection(object):
         return result
 
     def get_path(self, entryid):
-        xml = etree.fromstring(self.find_entry(entryid).XMLDesc(0))
+        xml = self.get_xml_tree(entryid)
         return xml.xpath('/pool/target/path')[0].text
 
     def get_type(self, entryid):
-        xml = etree.fromstring(self.find_entry(entryid).XMLDesc(0))
+        xml = self.get_xml_tree(entryid)
         return xml.get('type')
 
     def build(self, entryid, flags):
@@ -386,6 +416,7 @@ class LibvirtConnection(object):
 
     def define_from_xml(self, entryid, xml):
         if not self.module.check_mode:
+            self._trees.pop(entryid, None)
             return self.conn.storagePoolDefineXML(xml)
         else:
             try:
@@ -468,58 +499,54 @@ class VirtStoragePool(object):
 
     def facts(self, facts_mode='facts'):
         results = dict()
-        for entry in self.list_pools():
-            results[entry] = dict()
-            if self.conn.find_entry(entry):
-                data = self.conn.get_info(entry)
-                # libvirt returns maxMem, memory, and cpuTime as long()'s, which
-                # xmlrpclib tries to convert to regular int's during serialization.
-                # This throws exceptions, so convert them to strings here and
-                # assume the other end of the xmlrpc connection can figure things
-                # out or doesn't care.
-                results[entry] = {
-                    "status"    : ENTRY_STATE_INFO_MAP.get(data[0],"unknown"),
-                    "size_total"  : str(data[1]),
-                    "size_used"  : str(data[2]),
-                    "size_available"  : str(data[3]),
-                }
-                results[entry]["autostart"] = self.conn.get_autostart(entry)
-                results[entry]["persistent"] = self.conn.get_persistent(entry)
-                results[entry]["state"] = self.conn.get_status(entry)
-                results[entry]["path"] = self.conn.get_path(entry)
-                results[entry]["type"] = self.conn.get_type(entry)
-                results[entry]["uuid"] = self.conn.get_uuid(entry)
-                if self.conn.find_entry(entry).isActive():
-                    results[entry]["volume_count"] = self.conn.get_volume_count(entry)
-                    results[entry]["volumes"] = list()
-                    for volume in self.conn.get_volume_names(entry):
-                        results[entry]["volumes"].append(volume)
-                else:
-                    results[entry]["volume_count"] = -1
-
-                try:
-                    results[entry]["host"] = self.conn.get_host(entry)
-                except ValueError as e:
-                    pass
+        for pool in self.conn.find_entry(-1):
+            entry = pool.name()
+            data = pool.info()
+            # libvirt returns maxMem, memory, and cpuTime as long()'s, which
+            # xmlrpclib tries to convert to regular int's during serialization.
+            # This throws exceptions, so convert them to strings here and
+            # assume the other end of the xmlrpc connection can figure things
+            # out or doesn't care.
+            results[entry] = {
+                "status"    : ENTRY_STATE_INFO_MAP.get(data[0],"unknown"),
+                "size_total"  : str(data[1]),
+                "size_used"  : str(data[2]),
+                "size_available"  : str(data[3]),
+            }
+            active = pool.isActive()
+            results[entry]["autostart"] = ENTRY_STATE_AUTOSTART_MAP.get(pool.autostart(),"unknown")
+            results[entry]["persistent"] = ENTRY_STATE_PERSISTENT_MAP.get(pool.isPersistent(),"unknown")
+            results[entry]["state"] = ENTRY_STATE_ACTIVE_MAP.get(active,"unknown")
+            results[entry]["path"] = self.conn.get_path(entry)
+            results[entry]["type"] = self.conn.get_type(entry)
+            results[entry]["uuid"] = pool.UUIDString()
+            if active:
+                volumes = self.conn.get_volume_names(entry)
+                results[entry]["volume_count"] = len(volumes)
+                results[entry]["volumes"] = list(volumes)
+            else:
+                results[entry]["volume_count"] = -1
 
-                try:
-                    results[entry]["source_path"] = self.conn.get_source_path(entry)
-                except ValueError as e:
-                    pass
+            try:
+                results[entry]["host"] = self.conn.get_host(entry)
+            except ValueError as e:
+                pass
 
-                try:
-                    results[entry]["format"] = self.conn.get_format(entry)
-                except ValueError as e:
-                    pass
+            try:
+                results[entry]["source_path"] = self.conn.get_source_path(entry)
+            except ValueError as e:
+                pass
 
-                try:
-                    devices = self.conn.get_devices(entry)
-                    results[entry]["devices"] = devices
-                except ValueError as e:
-                    pass
+            try:
+                results[entry]["format"] = self.conn.get_format(entry)
+            except ValueError as e:
+                pass
 
-            else:
-                results[entry]["state"] = self.conn.get_status(entry)
+            try:
+                devices = self.conn.get_devices(entry)
+                results[entry]["devices"] = devices
+            except ValueError as e:
+                pass
 
         facts = dict()
         if facts_mode == 'facts':
@@ -88,6 +88,28 @@ options:
             - A redis config value.
         required: false
         default: null
+    settings:
+        version_added: "2.1"
+        description:
+            - A dict of redis config keys and values to ensure at once
+              [config command]. The current configuration is read with a
+              single C(CONFIG GET *) and all changes are sent in one pipeline.
+        required: false
+        default: null
+    hosts:
+        version_added: "2.1"
+        description:
+            - A list of instances, as C(host) or C(host:port), to run the
+              command against instead of I(login_host) and I(login_port).
+              The instances are handled concurrently.
+        required: false
+        default: null
+    concurrency:
+        version_added: "2.1"
+        description:
+            - Maximum number of instances from I(hosts) handled at the same time.
+        required: false
+        default: 10
 
 
 notes:
@@ -119,8 +141,19 @@ EXAMPLES = '''
 
 # Configure local redis to have lua time limit of 100 ms
 - redis: command=config name=lua-time-limit value=100
+
+# Tune several settings on a group of instances
+- redis:
+    command: config
+    hosts: [ "cache1:6379", "cache1:6380", "cache2:6379" ]
+    settings:
+      maxclients: 10000
+      lua-time-limit: 100
+      maxmemory-policy: allkeys-lru
 '''
 
+from multiprocessing.pool import ThreadPool
+
 try:
     import redis
 except ImportError:
@@ -158,6 +191,150 @@ def flush(client, db=None):
         return False
 
 
+class RedisCommandError(Exception):
+    pass
+
+
+def connect(module, host, port, db=0):
+    r = redis.StrictRedis(host=host,
+                          port=port,
+                          password=module.params['login_password'],
+                          db=db)
+    return r
+
+
+def run_slave(module, host, port):
+    master_host = module.params['master_host']
+    master_port = module.params['master_port']
+    try:
+        master_port = int(module.params['master_port'])
+    except Exception:
+        pass
+    mode = module.params['slave_mode']
+
+    #Connect and check, only the replication section is needed
+    r = connect(module, host, port)
+    try:
+        info = r.info('replication')
+    except Exception, e:
+        raise RedisCommandError("unable to connect to database: %s" % e)
+
+    #Check if we are already in the mode that we want
+    if mode == "master" and info["role"] == "master":
+        return dict(changed=False, mode=mode)
+
+    elif mode == "slave" and\
+         info["role"] == "slave" and\
+         info["master_host"] == master_host and\
+         info["master_port"] == master_port:
+        status = {
+            'status': mode,
+            'master_host': master_host,
+            'master_port': master_port,
+        }
+        return dict(changed=False, mode=status)
+    else:
+        # Do the stuff
+        # (Check Check_mode before commands so the commands aren't evaluated
+        # if not necessary)
+        if mode == "slave":
+            if module.check_mode or\
+               set_slave_mode(r, master_host, master_port):
+                status = {
+                    'status': mode,
+                    'master_host': master_host,
+                    'master_port': master_port,
+                }
+                return dict(changed=True, mode=status)
+            else:
+                raise RedisCommandError('Unable to set slave mode')
+
+        else:
+            if module.check_mode or set_master_mode(r):
+                return dict(changed=True, mode=mode)
+            else:
+                raise RedisCommandError('Unable to set master mode')
+
+
+def run_flush(module, host, port):
+    try:
+        db = int(module.params['db'])
+    except Exception:
+        db = 0
+    mode = module.params['flush_mode']
+
+    #Connect and check
+    r = connect(module, host, port, db)
+    try:
+        r.ping()
+    except Exception, e:
+        raise RedisCommandError("unable to connect to database: %s" % e)
+
+    # Do the stuff
+    # (Check Check_mode before commands so the commands aren't evaluated
+    # if not necessary)
+    if mode == "all":
+        if module.check_mode or flush(r):
+            return dict(changed=True, flushed=True)
+        else:  # Flush never fails :)
+            raise RedisCommandError("Unable to flush all databases")
+
+    else:
+        if module.check_mode or flush(r, db):
+            return dict(changed=True, flushed=True, db=db)
+        else:  # Flush never fails :)
+            raise RedisCommandError("Unable to flush '%d' database" % db)
+
+
+def run_config(module, host, port):
+    name = module.params['name']
+    value = module.params['value']
+    settings = module.params['settings']
+    if settings is None:
+        settings = {name: value}
+
+    r = connect(module, host, port)
+
+    # read every key at once, this also checks the connection
+    try:
+        if len(settings) == 1:
+            current = r.config_get(settings.keys()[0])
+        else:
+            current = r.config_get('*')
+    except Exception, e:
+        raise RedisCommandError("unable to read config: %s" % e)
+
+    changed_settings = dict()
+    for key, wanted in settings.items():
+        if isinstance(wanted, bool):
+            wanted = wanted and 'yes' or 'no'
+        elif wanted is not None:
+            wanted = str(wanted)
+        if current.get(key) != wanted:
+            changed_settings[key] = wanted
+    changed = len(changed_settings) > 0
+
+    if not module.check_mode and changed:
+        pipe = r.pipeline(transaction=False)
+        for key, wanted in changed_settings.items():
+            pipe.config_set(key, wanted)
+        try:
+            pipe.execute()
+        except Exception, e:
+            raise RedisCommandError("unable to write config: %s" % e)
+
+    if module.params['settings'] is None:
+        return dict(changed=changed, name=name, value=value)
+    return dict(changed=changed, settings=settings, changed_settings=changed_settings.keys())
+
+
+COMMANDS = {
+    'slave': run_slave,
+    'flush': run_flush,
+    'config': run_config,
+}
+
+
 # ===========================================
 # Module execution.
 #
@@ -175,154 +352,80 @@ def main():
             db=dict(default=None),
             flush_mode=dict(default='all', choices=['all', 'db']),
             name=dict(default=None),
-            value=dict(default=None)
+            value=dict(default=None),
+            settings=dict(default=None, type='dict'),
+            hosts=dict(default=None, type='list'),
+            concurrency=dict(default=10, type='int'),
         ),
+        mutually_exclusive = [['name', 'settings']],
         supports_check_mode = True
     )
 
     if not redis_found:
         module.fail_json(msg="python redis module is required")
 
-    login_password = module.params['login_password']
     login_host = module.params['login_host']
     login_port = int(module.params['login_port'])
     command = module.params['command']
 
-    # Slave Command section -----------
-    if command == "slave":
-        master_host = module.params['master_host']
-        master_port = module.params['master_port']
-        try:
-            master_port = int(module.params['master_port'])
-        except Exception:
-            pass
-        mode = module.params['slave_mode']
-
-        #Check if we have all the data
-        if mode == "slave":  # Only need data if we want to be slave
-            if not master_host:
-                module.fail_json(
-                            msg='In slave mode master host must be provided')
-
-            if not master_port:
-                module.fail_json(
-                            msg='In slave mode master port must be provided')
-
-        #Connect and check
-        r = redis.StrictRedis(host=login_host,
-                              port=login_port,
-                              password=login_password)
-        try:
-            r.ping()
-        except Exception, e:
-            module.fail_json(msg="unable to connect to database: %s" % e)
-
-        #Check if we are already in the mode that we want
-        info = r.info()
-        if mode == "master" and info["role"] == "master":
-            module.exit_json(changed=False, mode=mode)
-
-        elif mode == "slave" and\
-             info["role"] == "slave" and\
-             info["master_host"] == master_host and\
-             info["master_port"] == master_port:
-            status = {
-                'status': mode,
-                'master_host': master_host,
-                'master_port': master_port,
-            }
-            module.exit_json(changed=False, mode=status)
-        else:
-            # Do the stuff
-            # (Check Check_mode before commands so the commands aren't evaluated
-            # if not necessary)
-            if mode == "slave":
-                if module.check_mode or\
-                   set_slave_mode(r, master_host, master_port):
-                    info = r.info()
-                    status = {
-                        'status': mode,
-                        'master_host': master_host,
-                        'master_port': master_port,
-                    }
-                    module.exit_json(changed=True, mode=status)
-                else:
-                    module.fail_json(msg='Unable to set slave mode')
-
-            else:
-                if module.check_mode or set_master_mode(r):
-                    module.exit_json(changed=True, mode=mode)
-                else:
-                    module.fail_json(msg='Unable to set master mode')
+    if command not in COMMANDS:
+        module.fail_json(msg='A valid command must be provided')
 
-    # flush Command section -----------
-    elif command == "flush":
-        try:
-            db = int(module.params['db'])
-        except Exception:
-            db = 0
-        mode = module.params['flush_mode']
-
-        #Check if we have all the data
-        if mode == "db":
-            if type(db) != int:
-                module.fail_json(
-                            msg="In db mode the db number must be provided")
-
-        #Connect and check
-        r = redis.StrictRedis(host=login_host,
-                              port=login_port,
-                              password=login_password,
-                              db=db)
-        try:
-            r.ping()
-        except Exception, e:
-            module.fail_json(msg="unable to connect to database: %s" % e)
+    #Check if we have all the data
+    if command == "slave" and module.params['slave_mode'] == "slave":
+        # Only need data if we want to be slave
+        if not module.params['master_host']:
+            module.fail_json(
+                        msg='In slave mode master host must be provided')
 
-        # Do the stuff
-        # (Check Check_mode before commands so the commands aren't evaluated
-        # if not necessary)
-        if mode == "all":
-            if module.check_mode or flush(r):
-                module.exit_json(changed=True, flushed=True)
-            else:  # Flush never fails :)
-                module.fail_json(msg="Unable to flush all databases")
-
-        else:
-            if module.check_mode or flush(r, db):
-                module.exit_json(changed=True, flushed=True, db=db)
-            else:  # Flush never fails :)
-                module.fail_json(msg="Unable to flush '%d' database" % db)
-    elif command == 'config':
-        name = module.params['name']
-        value = module.params['value']
-
-        r = redis.StrictRedis(host=login_host,
-                              port=login_port,
-                              password=login_password)
+        if not module.params['master_port']:
+            module.fail_json(
+                        msg='In slave mode master port must be provided')
 
+    if module.params['hosts'] is None:
         try:
-            r.ping()
-        except Exception, e:
-            module.fail_json(msg="unable to connect to database: %s" % e)
+            result = COMMANDS[command](module, login_host, login_port)
+        except RedisCommandError, e:
+            module.fail_json(msg=str(e))
+        module.exit_json(**result)
+
+    targets = list()
+    for target in module.params['hosts']:
+        fields = str(target).split(':', 1)
+        port = login_port
+        if len(fields) == 2 and fields[1]:
+            port = fields[1]
+        try:
+            targets.append((fields[0], int(port)))
+        except ValueError:
+            module.fail_json(msg="invalid instance '%s'" % target)
 
-        
+    def _run(target):
         try:
-            old_value = r.config_get(name)[name]
+            return target, COMMANDS[command](module, *target), None
         except Exception, e:
-            module.fail_json(msg="unable to read config: %s" % e)
-        changed = old_value != value
+            return target, None, str(e)
 
-        if module.check_mode or not changed:
-            module.exit_json(changed=changed, name=name, value=value)
+    pool = ThreadPool(max(1, min(module.params['concurrency'], len(targets))))
+    try:
+        outcomes = pool.map(_run, targets)
+    finally:
+        pool.close()
+        pool.join()
+
+    results = dict()
+    failed_hosts = dict()
+    for (host, port), result, error in outcomes:
+        if error is not None:
+            failed_hosts['%s:%d' % (host, port)] = error
         else:
-            try:
-                r.config_set(name, value)
-            except Exception, e:
-                module.fail_json(msg="unable to write config: %s" % e)
-            module.exit_json(changed=changed, name=name, value=value)
-    else:
-        module.fail_json(msg='A valid command must be provided')
+            results['%s:%d' % (host, port)] = result
+    changed = any([result['changed'] for result in results.values()])
+
+    if failed_hosts:
+        module.fail_json(msg="command failed on %d instance(s)" % len(failed_hosts),
+                         changed=changed, results=results, failed_hosts=failed_hosts)
+    module.exit_json(changed=changed, results=results)
 
 # import module snippets
 from ansible.module_utils.basic import *
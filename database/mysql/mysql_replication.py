@@ -116,6 +116,25 @@ options:
         required: false
         default: null
         version_added: "2.0"
+    slaves:
+        description:
+            - list of replicas, as C(host) or C(host:port), to run the getslave, changemaster, startslave or stopslave mode on instead of I(login_host)
+            - the replicas are connected to and handled concurrently with the same login credentials; in changemaster mode each one is stopped, re-pointed and started again
+        required: false
+        default: null
+        version_added: "2.1"
+    concurrency:
+        description:
+            - maximum number of replicas from I(slaves) handled at the same time
+        required: false
+        default: 10
+        version_added: "2.1"
+    wait_timeout:
+        description:
+            - in changemaster mode with I(slaves), wait up to this many seconds for every replica to run both replication threads with Seconds_Behind_Master at 0; 0 disables the wait
+        required: false
+        default: 0
+        version_added: "2.1"
 '''
 
 EXAMPLES = '''
@@ -130,11 +149,22 @@ EXAMPLES = '''
 
 # Check slave status using port 3308
 - mysql_replication: mode=getslave login_host=ansible.example.com login_port=3308
+
+# Re-point all replicas to the new master after a failover and wait for them to catch up
+- mysql_replication:
+    mode: changemaster
+    master_host: db2.example.com
+    master_auto_position: yes
+    slaves: [ db3.example.com, db4.example.com, "db5.example.com:3307" ]
+    wait_timeout: 600
 '''
 
 import ConfigParser
+import getpass
 import os
+import time
 import warnings
+from multiprocessing.pool import ThreadPool
 
 try:
     import MySQLdb
@@ -180,6 +210,183 @@ def changemaster(cursor, chm, chm_params):
     cursor.execute(query, chm_params)
 
 
+def build_changemaster(params):
+    chm=[]
+    chm_params = {}
+    if params["master_host"]:
+        chm.append("MASTER_HOST=%(master_host)s")
+        chm_params['master_host'] = params["master_host"]
+    if params["master_user"]:
+        chm.append("MASTER_USER=%(master_user)s")
+        chm_params['master_user'] = params["master_user"]
+    if params["master_password"]:
+        chm.append("MASTER_PASSWORD=%(master_password)s")
+        chm_params['master_password'] = params["master_password"]
+    if params["master_port"] is not None:
+        chm.append("MASTER_PORT=%(master_port)s")
+        chm_params['master_port'] = params["master_port"]
+    if params["master_connect_retry"] is not None:
+        chm.append("MASTER_CONNECT_RETRY=%(master_connect_retry)s")
+        chm_params['master_connect_retry'] = params["master_connect_retry"]
+    if params["master_log_file"]:
+        chm.append("MASTER_LOG_FILE=%(master_log_file)s")
+        chm_params['master_log_file'] = params["master_log_file"]
+    if params["master_log_pos"] is not None:
+        chm.append("MASTER_LOG_POS=%(master_log_pos)s")
+        chm_params['master_log_pos'] = params["master_log_pos"]
+    if params["relay_log_file"]:
+        chm.append("RELAY_LOG_FILE=%(relay_log_file)s")
+        chm_params['relay_log_file'] = params["relay_log_file"]
+    if params["relay_log_pos"] is not None:
+        chm.append("RELAY_LOG_POS=%(relay_log_pos)s")
+        chm_params['relay_log_pos'] = params["relay_log_pos"]
+    if params["master_ssl"]:
+        chm.append("MASTER_SSL=1")
+    if params["master_ssl_ca"]:
+        chm.append("MASTER_SSL_CA=%(master_ssl_ca)s")
+        chm_params['master_ssl_ca'] = params["master_ssl_ca"]
+    if params["master_ssl_capath"]:
+        chm.append("MASTER_SSL_CAPATH=%(master_ssl_capath)s")
+        chm_params['master_ssl_capath'] = params["master_ssl_capath"]
+    if params["master_ssl_cert"]:
+        chm.append("MASTER_SSL_CERT=%(master_ssl_cert)s")
+        chm_params['master_ssl_cert'] = params["master_ssl_cert"]
+    if params["master_ssl_key"]:
+        chm.append("MASTER_SSL_KEY=%(master_ssl_key)s")
+        chm_params['master_ssl_key'] = params["master_ssl_key"]
+    if params["master_ssl_cipher"]:
+        chm.append("MASTER_SSL_CIPHER=%(master_ssl_cipher)s")
+        chm_params['master_ssl_cipher'] = params["master_ssl_cipher"]
+    if params["master_auto_position"]:
+        chm.append("MASTER_AUTO_POSITION = 1")
+    return chm, chm_params
+
+
+def slave_caught_up(slavestatus):
+    return slavestatus is not None and \
+        slavestatus.get('Slave_IO_Running') == 'Yes' and \
+        slavestatus.get('Slave_SQL_Running') == 'Yes' and \
+        slavestatus.get('Seconds_Behind_Master') == 0
+
+
+def wait_for_slaves(cursors, timeout, interval=1):
+    """ Poll all replicas in one loop until they have caught up with
+    their master or the timeout expires
+
+    Returns the replicas still lagging and the last lag seen per replica.
+    """
+    deadline = time.time() + timeout
+    pending = set(cursors.keys())
+    lag = {}
+    while True:
+        for slave in list(pending):
+            try:
+                slavestatus = get_slave_status(cursors[slave])
+            except Exception:
+                slavestatus = None
+            if slavestatus is not None:
+                lag[slave] = slavestatus.get('Seconds_Behind_Master')
+            if slave_caught_up(slavestatus):
+                pending.discard(slave)
+        if not pending or time.time() >= deadline:
+            break
+        time.sleep(interval)
+    return sorted(pending), lag
+
+
+def run_parallel(concurrency, func, items):
+    """ Run func over items in a thread pool and return a dict of results
+    and a dict of errors, both keyed by item
+    """
+    def _run(item):
+        try:
+            return item, func(item), None
+        except Exception, e:
+            return item, None, str(e)
+
+    results = {}
+    errors = {}
+    if not items:
+        return results, errors
+    pool = ThreadPool(max(1, min(concurrency, len(items))))
+    try:
+        for item, result, error in pool.map(_run, items):
+            if error is not None:
+                errors[item] = error
+            else:
+                results[item] = result
+    finally:
+        pool.close()
+        pool.join()
+    return results, errors
+
+
+def manage_slaves(module, mode, slaves, login_user, login_password):
+    """ Run mode on every replica of slaves concurrently """
+    targets = []
+    for slave in slaves:
+        fields = str(slave).split(':', 1)
+        port = module.params["login_port"]
+        if len(fields) == 2 and fields[1]:
+            port = fields[1]
+        try:
+            targets.append((fields[0], int(port)))
+        except ValueError:
+            module.fail_json(msg="invalid slave '%s'" % slave)
+    concurrency = module.params["concurrency"]
+
+    def _connect(target):
+        db_connection = MySQLdb.connect(host=target[0], port=target[1], user=login_user, passwd=login_password)
+        return db_connection.cursor(cursorclass=MySQLdb.cursors.DictCursor)
+
+    cursors, failed = run_parallel(concurrency, _connect, targets)
+    for target in failed:
+        failed[target] = "unable to connect to database: %s" % failed[target]
+
+    if mode == "getslave":
+        def _run(target):
+            slavestatus = get_slave_status(cursors[target])
+            if slavestatus is None:
+                raise Exception("Server is not configured as mysql slave")
+            return slavestatus
+    elif mode == "changemaster":
+        chm, chm_params = build_changemaster(module.params)
+        def _run(target):
+            stop_slave(cursors[target])
+            changemaster(cursors[target], chm, chm_params)
+            if not start_slave(cursors[target]):
+                raise Exception("Slave cannot be started")
+            return dict(changed=True)
+    elif mode == "startslave":
+        def _run(target):
+            if start_slave(cursors[target]):
+                return dict(msg="Slave started ", changed=True)
+            return dict(msg="Slave already started (Or cannot be started)", changed=False)
+    else:
+        def _run(target):
+            if stop_slave(cursors[target]):
+                return dict(msg="Slave stopped", changed=True)
+            return dict(msg="Slave already stopped", changed=False)
+
+    results, errors = run_parallel(concurrency, _run, cursors.keys())
+    failed.update(errors)
+
+    if mode == "changemaster" and module.params["wait_timeout"] > 0:
+        lagging, lag = wait_for_slaves(dict((t, cursors[t]) for t in results), module.params["wait_timeout"])
+        for target in results:
+            results[target]['seconds_behind_master'] = lag.get(target)
+        for target in lagging:
+            failed[target] = "slave did not catch up within %d seconds" % module.params["wait_timeout"]
+
+    name = lambda target: '%s:%d' % target
+    changed = any([result.get('changed', False) for result in results.values()])
+    results = dict((name(t), r) for t, r in results.items())
+    if failed:
+        module.fail_json(msg="%s failed on %d slave(s)" % (mode, len(failed)), changed=changed,
+                         slaves=results, failed_slaves=dict((name(t), e) for t, e in failed.items()))
+    module.exit_json(changed=changed, slaves=results)
+
+
 def strip_quotes(s):
     """ Remove surrounding single or double quotes
 
@@ -264,6 +471,9 @@ def main():
             master_ssl_cert=dict(default=None),
             master_ssl_key=dict(default=None),
             master_ssl_cipher=dict(default=None),
+            slaves=dict(default=None, type='list'),
+            concurrency=dict(default=10, type='int'),
+            wait_timeout=dict(default=0, type='int'),
         )
     )
     user = module.params["login_user"]
@@ -271,22 +481,6 @@ def main():
     host = module.params["login_host"]
     port = module.params["login_port"]
     mode = module.params["mode"]
-    master_host = module.params["master_host"]
-    master_user = module.params["master_user"]
-    master_password = module.params["master_password"]
-    master_port = module.params["master_port"]
-    master_connect_retry = module.params["master_connect_retry"]
-    master_log_file = module.params["master_log_file"]
-    master_log_pos = module.params["master_log_pos"]
-    relay_log_file = module.params["relay_log_file"]
-    relay_log_pos = module.params["relay_log_pos"]
-    master_ssl = module.params["master_ssl"]
-    master_ssl_ca = module.params["master_ssl_ca"]
-    master_ssl_capath = module.params["master_ssl_capath"]
-    master_ssl_cert = module.params["master_ssl_cert"]
-    master_ssl_key = module.params["master_ssl_key"]
-    master_ssl_cipher = module.params["master_ssl_cipher"]
-    master_auto_position = module.params["master_auto_position"]
 
     if not mysqldb_found:
         module.fail_json(msg="the python mysqldb module is required")
@@ -309,6 +503,11 @@ def main():
     elif login_password is None or login_user is None:
         module.fail_json(msg="when supplying login arguments, both login_user and login_password must be provided")
 
+    if module.params["slaves"] is not None:
+        if mode == "getmaster":
+            module.fail_json(msg="slaves cannot be used with mode=getmaster")
+        manage_slaves(module, mode, module.params["slaves"], login_user, login_password)
+
     try:
         if module.params["login_unix_socket"]:
             db_connection = MySQLdb.connect(host=module.params["login_host"], unix_socket=module.params["login_unix_socket"], user=login_user, passwd=login_password)
@@ -338,54 +537,7 @@ def main():
             module.fail_json(msg="Server is not configured as mysql slave")
 
     elif mode in "changemaster":
-        chm=[]
-        chm_params = {}
-        if master_host:
-            chm.append("MASTER_HOST=%(master_host)s")
-            chm_params['master_host'] = master_host
-        if master_user:
-            chm.append("MASTER_USER=%(master_user)s")
-            chm_params['master_user'] = master_user
-        if master_password:
-            chm.append("MASTER_PASSWORD=%(master_password)s")
-            chm_params['master_password'] = master_password
-        if master_port is not None:
-            chm.append("MASTER_PORT=%(master_port)s")
-            chm_params['master_port'] = master_port
-        if master_connect_retry is not None:
-            chm.append("MASTER_CONNECT_RETRY=%(master_connect_retry)s")
-            chm_params['master_connect_retry'] = master_connect_retry
-        if master_log_file:
-            chm.append("MASTER_LOG_FILE=%(master_log_file)s")
-            chm_params['master_log_file'] = master_log_file
-        if master_log_pos is not None:
-            chm.append("MASTER_LOG_POS=%(master_log_pos)s")
-            chm_params['master_log_pos'] = master_log_pos
-        if relay_log_file:
-            chm.append("RELAY_LOG_FILE=%(relay_log_file)s")
-            chm_params['relay_log_file'] = relay_log_file
-        if relay_log_pos is not None:
-            chm.append("RELAY_LOG_POS=%(relay_log_pos)s")
-            chm_params['relay_log_pos'] = relay_log_pos
-        if master_ssl:
-            chm.append("MASTER_SSL=1")
-        if master_ssl_ca:
-            chm.append("MASTER_SSL_CA=%(master_ssl_ca)s")
-            chm_params['master_ssl_ca'] = master_ssl_ca
-        if master_ssl_capath:
-            chm.append("MASTER_SSL_CAPATH=%(master_ssl_capath)s")
-            chm_params['master_ssl_capath'] = master_ssl_capath
-        if master_ssl_cert:
-            chm.append("MASTER_SSL_CERT=%(master_ssl_cert)s")
-            chm_params['master_ssl_cert'] = master_ssl_cert
-        if master_ssl_key:
-            chm.append("MASTER_SSL_KEY=%(master_ssl_key)s")
-            chm_params['master_ssl_key'] = master_ssl_key
-        if master_ssl_cipher:
-            chm.append("MASTER_SSL_CIPHER=%(master_ssl_cipher)s")
-            chm_params['master_ssl_cipher'] = master_ssl_cipher
-        if master_auto_position:
-            chm.append("MASTER_AUTO_POSITION = 1")
+        chm, chm_params = build_changemaster(module.params)
         changemaster(cursor, chm, chm_params)
         module.exit_json(changed=True)
     elif mode in "startslave":
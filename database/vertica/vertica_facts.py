@@ -49,6 +49,37 @@ options:
       - The password used to authenticate with.
     required: false
     default: null
+  sections:
+    description:
+      - List of fact sections to gather.
+    required: false
+    choices: ['schemas', 'users', 'roles', 'configuration', 'nodes']
+    default: ['schemas', 'users', 'roles', 'configuration', 'nodes']
+    version_added: "2.1"
+  concurrency:
+    description:
+      - Maximum number of sections gathered at the same time, each over its own connection.
+    required: false
+    default: 5
+    version_added: "2.1"
+  fetch_size:
+    description:
+      - Number of rows fetched per round-trip.
+    required: false
+    default: 1000
+    version_added: "2.1"
+  cache_dir:
+    description:
+      - Directory of a local cache of the catalog sections C(schemas), C(users) and C(roles).
+        The cache is keyed by the last DDL request recorded in C(v_monitor.query_requests),
+        so cached sections are reused until the next DDL statement. C(configuration) and
+        C(nodes) are always gathered live, as is everything when the data collector has
+        no DDL requests on record.
+      - The cached C(users) section contains the password hashes of the users. The cache
+        file is created readable by its owner only.
+    required: false
+    default: null
+    version_added: "2.1"
 notes:
   - The default authentication assumes that you are either logging in as or sudo'ing
     to the C(dbadmin) account on the host.
@@ -65,8 +96,16 @@ author: "Dariusz Owczarek (@dareko)"
 EXAMPLES = """
 - name: gathering vertica facts
   vertica_facts: db=db_name
+
+- name: gathering only users and roles, served from a cache while nothing changed
+  vertica_facts: db=db_name sections=users,roles cache_dir=/var/cache/ansible
 """
 
+import json
+import os
+import tempfile
+from multiprocessing.pool import ThreadPool
+
 try:
     import pyodbc
 except ImportError:
@@ -79,7 +118,7 @@ class NotSupportedError(Exception):
 
 # module specific functions
 
-def get_schema_facts(cursor, schema=''):
+def get_schema_facts(cursor, schema='', fetch_size=100):
     facts = {}
     cursor.execute("""
         select schema_name, schema_owner, create_time
@@ -88,7 +127,7 @@ def get_schema_facts(cursor, schema=''):
         and (? = '' or schema_name ilike ?)
     """, schema, schema)
     while True:
-        rows = cursor.fetchmany(100)
+        rows = cursor.fetchmany(fetch_size)
         if not rows:
             break
         for row in rows:
@@ -108,7 +147,7 @@ def get_schema_facts(cursor, schema=''):
         and (? = '' or g.object_name ilike ?)
     """, schema, schema)
     while True:
-        rows = cursor.fetchmany(100)
+        rows = cursor.fetchmany(fetch_size)
         if not rows:
             break
         for row in rows:
@@ -119,7 +158,7 @@ def get_schema_facts(cursor, schema=''):
                 facts[schema_key]['usage_roles'].append(row.role_name)
     return facts
 
-def get_user_facts(cursor, user=''):
+def get_user_facts(cursor, user='', fetch_size=100):
     facts = {}
     cursor.execute("""
         select u.user_name, u.is_locked, u.lock_time,
@@ -131,7 +170,7 @@ def get_user_facts(cursor, user=''):
         and (? = '' or u.user_name ilike ?)
      """, user, user)
     while True:
-        rows = cursor.fetchmany(100)
+        rows = cursor.fetchmany(fetch_size)
         if not rows:
             break
         for row in rows:
@@ -153,7 +192,7 @@ def get_user_facts(cursor, user=''):
                 facts[user_key]['default_roles'] = row.default_roles.replace(' ', '').split(',')
     return facts
 
-def get_role_facts(cursor, role=''):
+def get_role_facts(cursor, role='', fetch_size=100):
     facts = {}
     cursor.execute("""
         select r.name, r.assigned_roles
@@ -161,7 +200,7 @@ def get_role_facts(cursor, role=''):
         where (? = '' or r.name ilike ?)
     """, role, role)
     while True:
-        rows = cursor.fetchmany(100)
+        rows = cursor.fetchmany(fetch_size)
         if not rows:
             break
         for row in rows:
@@ -173,7 +212,7 @@ def get_role_facts(cursor, role=''):
                 facts[role_key]['assigned_roles'] = row.assigned_roles.replace(' ', '').split(',')
     return facts
 
-def get_configuration_facts(cursor, parameter=''):
+def get_configuration_facts(cursor, parameter='', fetch_size=100):
     facts = {}
     cursor.execute("""
         select c.parameter_name, c.current_value, c.default_value
@@ -182,7 +221,7 @@ def get_configuration_facts(cursor, parameter=''):
         and (? = '' or c.parameter_name ilike ?)
     """, parameter, parameter)
     while True:
-        rows = cursor.fetchmany(100)
+        rows = cursor.fetchmany(fetch_size)
         if not rows:
             break
         for row in rows:
@@ -192,7 +231,7 @@ def get_configuration_facts(cursor, parameter=''):
                 'default_value': row.default_value}
     return facts
 
-def get_node_facts(cursor, schema=''):
+def get_node_facts(cursor, schema='', fetch_size=100):
     facts = {}
     cursor.execute("""
         select node_name, node_address, export_address, node_state, node_type,
@@ -200,7 +239,7 @@ def get_node_facts(cursor, schema=''):
         from nodes
     """)
     while True:
-        rows = cursor.fetchmany(100)
+        rows = cursor.fetchmany(fetch_size)
         if not rows:
             break
         for row in rows:
@@ -212,6 +251,72 @@ def get_node_facts(cursor, schema=''):
                 'catalog_path': row.catalog_path}
     return facts
 
+SECTIONS = {
+    'schemas': ('vertica_schemas', get_schema_facts),
+    'users': ('vertica_users', get_user_facts),
+    'roles': ('vertica_roles', get_role_facts),
+    'configuration': ('vertica_configuration', get_configuration_facts),
+    'nodes': ('vertica_nodes', get_node_facts),
+}
+
+# catalog sections that only change through DDL
+CACHED_SECTIONS = ['schemas', 'users', 'roles']
+
+def get_last_ddl(cursor):
+    cursor.execute("""
+        select count(*) as ddl_count, max(end_timestamp) as last_ddl
+        from v_monitor.query_requests
+        where request_type = 'DDL'
+    """)
+    row = cursor.fetchone()
+    if row.last_ddl is None:
+        return None
+    return '{0}/{1}'.format(row.last_ddl, row.ddl_count)
+
+def read_cache(path):
+    try:
+        f = open(path)
+        try:
+            return json.load(f)
+        finally:
+            f.close()
+    except (IOError, ValueError):
+        return {}
+
+def write_cache(module, path, cache):
+    # mkstemp creates the file with mode 0600, which the rename keeps; the
+    # cache holds password hashes, so it must not become world-readable the
+    # way a new file from module.atomic_move does
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path))
+    f = os.fdopen(fd, 'w')
+    try:
+        json.dump(cache, f)
+    finally:
+        f.close()
+    try:
+        os.rename(tmp_path, path)
+    except OSError, e:
+        os.unlink(tmp_path)
+        module.fail_json(msg="Unable to write cache file %s: %s" % (path, e))
+
+def gather_sections(dsn, sections, fetch_size, concurrency):
+    """ Gather every section over its own connection, concurrently """
+    def _gather(section):
+        db_conn = pyodbc.connect(dsn, autocommit=True)
+        try:
+            return section, SECTIONS[section][1](db_conn.cursor(), fetch_size=fetch_size)
+        finally:
+            db_conn.close()
+
+    if len(sections) == 1:
+        return dict([_gather(sections[0])])
+    pool = ThreadPool(max(1, min(concurrency, len(sections))))
+    try:
+        return dict(pool.map(_gather, sections))
+    finally:
+        pool.close()
+        pool.join()
+
 # module logic
 
 def main():
@@ -223,6 +328,10 @@ def main():
             db=dict(default=None),
             login_user=dict(default='dbadmin'),
             login_password=dict(default=None),
+            sections=dict(default=sorted(SECTIONS.keys()), type='list'),
+            concurrency=dict(default=5, type='int'),
+            fetch_size=dict(default=1000, type='int'),
+            cache_dir=dict(default=None),
         ), supports_check_mode = True)
 
     if not pyodbc_found:
@@ -232,6 +341,11 @@ def main():
     if module.params['db']:
         db = module.params['db']
 
+    sections = module.params['sections']
+    unknown = set(sections) - set(SECTIONS.keys())
+    if unknown:
+        module.fail_json(msg="Unknown section(s): {0}.".format(', '.join(sorted(unknown))))
+
     changed = False
 
     try:
@@ -251,17 +365,40 @@ def main():
         module.fail_json(msg="Unable to connect to database: {0}.".format(e))
         
     try:
-        schema_facts = get_schema_facts(cursor)
-        user_facts = get_user_facts(cursor)
-        role_facts = get_role_facts(cursor)
-        configuration_facts = get_configuration_facts(cursor)
-        node_facts = get_node_facts(cursor)
-        module.exit_json(changed=False,
-            ansible_facts={'vertica_schemas': schema_facts,
-                           'vertica_users': user_facts,
-                           'vertica_roles': role_facts,
-                           'vertica_configuration': configuration_facts,
-                           'vertica_nodes': node_facts})
+        facts = {}
+        cache = {}
+        cache_path = None
+        if module.params['cache_dir']:
+            cache_path = os.path.join(module.params['cache_dir'], 'vertica_facts-{0}-{1}-{2}.json'.format(
+                module.params['cluster'], module.params['port'], db))
+            last_ddl = get_last_ddl(cursor)
+            if last_ddl is None:
+                cache_path = None
+            else:
+                cache = read_cache(cache_path)
+                if cache.get('last_ddl') != last_ddl:
+                    cache = {'last_ddl': last_ddl, 'sections': {}}
+                for section in sections:
+                    if section in CACHED_SECTIONS and section in cache['sections']:
+                        facts[section] = cache['sections'][section]
+        db_conn.close()
+
+        missing = [section for section in sections if section not in facts]
+        if missing:
+            facts.update(gather_sections(dsn, missing, module.params['fetch_size'],
+                module.params['concurrency']))
+            if cache_path is not None:
+                for section in missing:
+                    if section in CACHED_SECTIONS:
+                        cache['sections'][section] = facts[section]
+                try:
+                    write_cache(module, cache_path, cache)
+                except (IOError, OSError):
+                    # the cache is only an optimisation
+                    pass
+
+        module.exit_json(changed=False, cached_sections=sorted(set(sections) - set(missing)),
+            ansible_facts=dict((SECTIONS[section][0], facts[section]) for section in sections))
     except NotSupportedError, e:
         module.fail_json(msg=str(e))
     except SystemExit:
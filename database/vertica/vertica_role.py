@@ -27,7 +27,8 @@ options:
   name:
     description:
       - Name of the role to add or remove.
-    required: true
+      - Required unless I(roles) is given.
+    required: false
   assigned_roles:
     description:
       - Comma separated list of roles to assign to the role.
@@ -40,6 +41,16 @@ options:
     required: false
     choices: ['present', 'absent']
     default: present
+  roles:
+    description:
+      - List of roles to manage in one run, each a dict with the key C(name) and
+        optionally C(assigned_roles) and C(state), which default to the module
+        options of the same name.
+      - The roles are read from the catalog once, and all statements run over
+        one connection and are committed together at the end.
+    required: false
+    default: null
+    version_added: "2.1"
   db:
     description:
       - Name of the Vertica database.
@@ -84,6 +95,14 @@ EXAMPLES = """
 
 - name: creating a new vertica role with other role assigned
   vertica_role: name=role_name assigned_role=other_role_name state=present
+
+- name: creating a list of vertica roles in one transaction
+  vertica_role:
+    db: db_name
+    roles:
+      - { name: reporting_ro }
+      - { name: etl_rw, assigned_roles: reporting_ro }
+      - { name: legacy_rw, state: absent }
 """
 
 try:
@@ -136,12 +155,13 @@ def check(role_facts, role, assigned_roles):
         return False
     return True
 
-def present(role_facts, cursor, role, assigned_roles):
+def present(role_facts, cursor, role, assigned_roles, refresh=True):
     role_key = role.lower()
     if role_key not in role_facts:
         cursor.execute("create role {0}".format(role))
         update_roles(role_facts, cursor, role, [], assigned_roles)
-        role_facts.update(get_role_facts(cursor, role))
+        if refresh:
+            role_facts.update(get_role_facts(cursor, role))
         return True
     else:
         changed = False
@@ -149,7 +169,7 @@ def present(role_facts, cursor, role, assigned_roles):
             update_roles(role_facts, cursor, role,
                 role_facts[role_key]['assigned_roles'], assigned_roles)
             changed = True
-        if changed:
+        if changed and refresh:
             role_facts.update(get_role_facts(cursor, role))
         return changed
 
@@ -164,13 +184,64 @@ def absent(role_facts, cursor, role, assigned_roles):
     else:
         return False
 
+def role_params(module, item):
+    """ Settings of one entry of roles, defaulting to the module options """
+    name = item.get('name', item.get('role'))
+    if not name:
+        module.fail_json(msg="name must be supplied for each role")
+    assigned_roles = item.get('assigned_roles', module.params['assigned_roles']) or []
+    if not isinstance(assigned_roles, list):
+        assigned_roles = assigned_roles.split(',')
+    state = item.get('state', module.params['state'])
+    if state not in ['absent', 'present']:
+        module.fail_json(msg="invalid state '{0}' for role {1}".format(state, name))
+    return dict(role=name, assigned_roles=filter(None, assigned_roles), state=state)
+
+def bulk(module, db_conn, cursor):
+    """ Reconcile all entries of roles against one read of the catalog and
+    commit the resulting statements together """
+    roles = [role_params(module, item) for item in module.params['roles']]
+    role_facts = get_role_facts(cursor)
+
+    changed_roles = []
+    try:
+        for r in roles:
+            if r['state'] == 'absent':
+                if module.check_mode:
+                    changed = r['role'].lower() in role_facts
+                else:
+                    changed = absent(role_facts, cursor, r['role'], r['assigned_roles'])
+            elif module.check_mode:
+                changed = not check(role_facts, r['role'], r['assigned_roles'])
+            else:
+                changed = present(role_facts, cursor, r['role'], r['assigned_roles'], refresh=False)
+            if changed:
+                changed_roles.append(r['role'])
+        if not module.check_mode:
+            db_conn.commit()
+    except (NotSupportedError, CannotDropError, pyodbc.Error), e:
+        db_conn.rollback()
+        module.fail_json(msg=str(e), ansible_facts={'vertica_roles': get_role_facts(cursor)})
+    except SystemExit:
+        # avoid catching this on python 2.4
+        db_conn.rollback()
+        raise
+    except Exception, e:
+        db_conn.rollback()
+        module.fail_json(msg=str(e))
+
+    if changed_roles and not module.check_mode:
+        role_facts = get_role_facts(cursor)
+    module.exit_json(changed=len(changed_roles) > 0, roles=changed_roles,
+        ansible_facts={'vertica_roles': role_facts})
+
 # module logic
 
 def main():
 
     module = AnsibleModule(
         argument_spec=dict(
-            role=dict(required=True, aliases=['name']),
+            role=dict(default=None, aliases=['name']),
             assigned_roles=dict(default=None, aliases=['assigned_role']),
             state=dict(default='present', choices=['absent', 'present']),
             db=dict(default=None),
@@ -178,7 +249,11 @@ def main():
             port=dict(default='5433'),
             login_user=dict(default='dbadmin'),
             login_password=dict(default=None),
-        ), supports_check_mode = True)
+            roles=dict(default=None, type='list'),
+        ),
+        required_one_of=[['role', 'roles']],
+        mutually_exclusive=[['role', 'roles']],
+        supports_check_mode = True)
 
     if not pyodbc_found:
         module.fail_json(msg="The python pyodbc module is required.")
@@ -206,11 +281,14 @@ def main():
             "ConnectionLoadBalance={5}"
             ).format(module.params['cluster'], module.params['port'], db,
                 module.params['login_user'], module.params['login_password'], 'true')
-        db_conn = pyodbc.connect(dsn, autocommit=True)
+        db_conn = pyodbc.connect(dsn, autocommit=module.params['roles'] is None)
         cursor = db_conn.cursor()
     except Exception, e:
         module.fail_json(msg="Unable to connect to database: {0}.".format(e))
 
+    if module.params['roles'] is not None:
+        bulk(module, db_conn, cursor)
+
     try:
         role_facts = get_role_facts(cursor)
         if module.check_mode:
@@ -32,7 +32,8 @@ options:
   name:
     description:
       - Name of the schema to add or remove.
-    required: true
+      - Required unless I(schemas) is given.
+    required: false
   usage_roles:
     description:
       - Comma separated list of roles to create and grant usage access to the schema.
@@ -56,6 +57,16 @@ options:
     required: false
     default: present
     choices: ['present', 'absent']
+  schemas:
+    description:
+      - List of schemas to manage in one run, each a dict with the key C(name) and
+        optionally C(usage_roles), C(create_roles), C(owner) and C(state), which
+        default to the module options of the same name.
+      - The schemas and their grants are read from the catalog once, and all
+        statements run over one connection and are committed together at the end.
+    required: false
+    default: null
+    version_added: "2.1"
   db:
     description:
       - Name of the Vertica database.
@@ -108,6 +119,14 @@ EXAMPLES = """
     usage_roles=schema_name_ro,schema_name_rw
     db=db_name
     state=present
+
+- name: creating a list of schemas with roles in one transaction
+  vertica_schema:
+    db: db_name
+    schemas:
+      - { name: sales, usage_roles: sales_ro, create_roles: sales_rw }
+      - { name: finance, usage_roles: "finance_ro,audit", owner: dbowner }
+      - { name: scratch, state: absent }
 """
 
 try:
@@ -190,7 +209,7 @@ def check(schema_facts, schema, usage_roles, create_roles, owner):
         return False
     return True
 
-def present(schema_facts, cursor, schema, usage_roles, create_roles, owner):
+def present(schema_facts, cursor, schema, usage_roles, create_roles, owner, refresh=True):
     schema_key = schema.lower()
     if schema_key not in schema_facts:
         query_fragments = ["create schema {0}".format(schema)]
@@ -198,7 +217,8 @@ def present(schema_facts, cursor, schema, usage_roles, create_roles, owner):
             query_fragments.append("authorization {0}".format(owner))
         cursor.execute(' '.join(query_fragments))
         update_roles(schema_facts, cursor, schema, [], usage_roles, [], create_roles)
-        schema_facts.update(get_schema_facts(cursor, schema))
+        if refresh:
+            schema_facts.update(get_schema_facts(cursor, schema))
         return True
     else:
         changed = False
@@ -213,7 +233,7 @@ def present(schema_facts, cursor, schema, usage_roles, create_roles, owner):
                 schema_facts[schema_key]['usage_roles'], usage_roles,
                 schema_facts[schema_key]['create_roles'], create_roles)
             changed = True
-        if changed:
+        if changed and refresh:
             schema_facts.update(get_schema_facts(cursor, schema))
         return changed
 
@@ -231,13 +251,68 @@ def absent(schema_facts, cursor, schema, usage_roles, create_roles):
     else:
         return False
 
+def schema_params(module, item):
+    """ Settings of one entry of schemas, defaulting to the module options """
+    name = item.get('name', item.get('schema'))
+    if not name:
+        module.fail_json(msg="name must be supplied for each schema")
+    params = dict(schema=name, owner=item.get('owner', module.params['owner']))
+    for key in ['usage_roles', 'create_roles']:
+        roles = item.get(key, module.params[key]) or []
+        if not isinstance(roles, list):
+            roles = roles.split(',')
+        params[key] = filter(None, roles)
+    params['state'] = item.get('state', module.params['state'])
+    if params['state'] not in ['absent', 'present']:
+        module.fail_json(msg="invalid state '{0}' for schema {1}".format(params['state'], name))
+    return params
+
+def bulk(module, db_conn, cursor):
+    """ Reconcile all entries of schemas against one read of the catalog and
+    commit the resulting statements together """
+    schemas = [schema_params(module, item) for item in module.params['schemas']]
+    schema_facts = get_schema_facts(cursor)
+
+    changed_schemas = []
+    try:
+        for s in schemas:
+            if s['state'] == 'absent':
+                if module.check_mode:
+                    changed = s['schema'].lower() in schema_facts
+                else:
+                    changed = absent(schema_facts, cursor, s['schema'], s['usage_roles'], s['create_roles'])
+            elif module.check_mode:
+                changed = not check(schema_facts, s['schema'], s['usage_roles'], s['create_roles'], s['owner'])
+            else:
+                changed = present(schema_facts, cursor, s['schema'], s['usage_roles'], s['create_roles'],
+                    s['owner'], refresh=False)
+            if changed:
+                changed_schemas.append(s['schema'])
+        if not module.check_mode:
+            db_conn.commit()
+    except (NotSupportedError, CannotDropError, pyodbc.Error), e:
+        db_conn.rollback()
+        module.fail_json(msg=str(e), ansible_facts={'vertica_schemas': get_schema_facts(cursor)})
+    except SystemExit:
+        # avoid catching this on python 2.4
+        db_conn.rollback()
+        raise
+    except Exception, e:
+        db_conn.rollback()
+        module.fail_json(msg=str(e))
+
+    if changed_schemas and not module.check_mode:
+        schema_facts = get_schema_facts(cursor)
+    module.exit_json(changed=len(changed_schemas) > 0, schemas=changed_schemas,
+        ansible_facts={'vertica_schemas': schema_facts})
+
 # module logic
 
 def main():
 
     module = AnsibleModule(
         argument_spec=dict(
-            schema=dict(required=True, aliases=['name']),
+            schema=dict(default=None, aliases=['name']),
             usage_roles=dict(default=None, aliases=['usage_role']),
             create_roles=dict(default=None, aliases=['create_role']),
             owner=dict(default=None),
@@ -247,7 +322,11 @@ def main():
             port=dict(default='5433'),
             login_user=dict(default='dbadmin'),
             login_password=dict(default=None),
-        ), supports_check_mode = True)
+            schemas=dict(default=None, type='list'),
+        ),
+        required_one_of=[['schema', 'schemas']],
+        mutually_exclusive=[['schema', 'schemas']],
+        supports_check_mode = True)
 
     if not pyodbc_found:
         module.fail_json(msg="The python pyodbc module is required.")
@@ -280,11 +359,14 @@ def main():
             "ConnectionLoadBalance={5}"
             ).format(module.params['cluster'], module.params['port'], db,
                 module.params['login_user'], module.params['login_password'], 'true')
-        db_conn = pyodbc.connect(dsn, autocommit=True)
+        db_conn = pyodbc.connect(dsn, autocommit=module.params['schemas'] is None)
         cursor = db_conn.cursor()
     except Exception, e:
         module.fail_json(msg="Unable to connect to database: {0}.".format(e))
 
+    if module.params['schemas'] is not None:
+        bulk(module, db_conn, cursor)
+
     try:
         schema_facts = get_schema_facts(cursor)
         if module.check_mode:
@@ -30,7 +30,8 @@ options:
   name:
     description:
       - Name of the user to add or remove.
-    required: true
+      - Required unless I(users) is given.
+    required: false
   profile:
     description:
       - Sets the user's profile.
@@ -72,6 +73,16 @@ options:
     required: false
     choices: ['present', 'absent', 'locked']
     default: present
+  users:
+    description:
+      - List of users to manage in one run, each a dict with the key C(name) and
+        optionally C(profile), C(resource_pool), C(password), C(expired), C(ldap),
+        C(roles) and C(state), which default to the module options of the same name.
+      - The users and resource pools are read from the catalog once, and all
+        statements run over one connection and are committed together at the end.
+    required: false
+    default: null
+    version_added: "2.1"
   db:
     description:
       - Name of the Vertica database.
@@ -121,6 +132,15 @@ EXAMPLES = """
     db=db_name
     roles=schema_name_ro
     state=present
+
+- name: provisioning a list of vertica users in one transaction
+  vertica_user:
+    db: db_name
+    roles: reporting_ro
+    users:
+      - { name: alice, password: "md5<encrypted_password>" }
+      - { name: bob, ldap: true, roles: "reporting_ro,etl_rw", resource_pool: etl }
+      - { name: carol, state: absent }
 """
 
 try:
@@ -172,6 +192,10 @@ def get_user_facts(cursor, user=''):
                 facts[user_key]['default_roles'] = row.default_roles.replace(' ', '').split(',')
     return facts
 
+def get_resource_pools(cursor):
+    cursor.execute("select name from resource_pools")
+    return set([row.name.lower() for row in cursor.fetchall()])
+
 def update_roles(user_facts, cursor, user,
                  existing_all, existing_default, required):
     del_roles = list(set(existing_all) - set(required))
@@ -205,7 +229,7 @@ def check(user_facts, user, profile, resource_pool,
     return True
 
 def present(user_facts, cursor, user, profile, resource_pool,
-    locked, password, expired, ldap, roles):
+    locked, password, expired, ldap, roles, refresh=True):
     user_key = user.lower()
     if user_key not in user_facts:
         query_fragments = ["create user {0}".format(user)]
@@ -227,7 +251,8 @@ def present(user_facts, cursor, user, profile, resource_pool,
             cursor.execute("grant usage on resource pool {0} to {1}".format(
                 resource_pool, user))
         update_roles(user_facts, cursor, user, [], [], roles)
-        user_facts.update(get_user_facts(cursor, user))
+        if refresh:
+            user_facts.update(get_user_facts(cursor, user))
         return True
     else:
         changed = False
@@ -271,7 +296,7 @@ def present(user_facts, cursor, user, profile, resource_pool,
             update_roles(user_facts, cursor, user,
                 user_facts[user_key]['roles'], user_facts[user_key]['default_roles'], roles)
             changed = True
-        if changed:
+        if changed and refresh:
             user_facts.update(get_user_facts(cursor, user))
         return changed
 
@@ -289,13 +314,87 @@ def absent(user_facts, cursor, user, roles):
     else:
         return False
 
+def user_params(module, item):
+    """ Settings of one entry of users, defaulting to the module options """
+    name = item.get('name', item.get('user'))
+    if not name:
+        module.fail_json(msg="name must be supplied for each user")
+    profile = item.get('profile', module.params['profile'])
+    if profile:
+        profile = profile.lower()
+    resource_pool = item.get('resource_pool', module.params['resource_pool'])
+    if resource_pool:
+        resource_pool = resource_pool.lower()
+    roles = item.get('roles', module.params['roles']) or []
+    if not isinstance(roles, list):
+        roles = roles.split(',')
+    roles = filter(None, roles)
+    state = item.get('state', module.params['state'])
+    if state not in ['absent', 'present', 'locked']:
+        module.fail_json(msg="invalid state '{0}' for user {1}".format(state, name))
+    expired = item.get('expired', module.params['expired'])
+    if expired is not None:
+        expired = module.boolean(expired)
+    ldap = item.get('ldap', module.params['ldap'])
+    if ldap is not None:
+        ldap = module.boolean(ldap)
+    return dict(user=name, profile=profile, resource_pool=resource_pool,
+        password=item.get('password', module.params['password']),
+        expired=expired, ldap=ldap, roles=roles, state=state)
+
+def bulk(module, db_conn, cursor):
+    """ Reconcile all entries of users against one read of the catalog and
+    commit the resulting statements together """
+    users = [user_params(module, item) for item in module.params['users']]
+    user_facts = get_user_facts(cursor)
+    if [u for u in users if u['resource_pool']]:
+        resource_pools = get_resource_pools(cursor)
+        unknown = set([u['resource_pool'] for u in users if u['resource_pool']]) - resource_pools
+        if unknown:
+            module.fail_json(msg="Unknown resource pool(s): {0}.".format(', '.join(sorted(unknown))))
+
+    changed_users = []
+    try:
+        for u in users:
+            locked = u['state'] == 'locked'
+            if u['state'] == 'absent':
+                if module.check_mode:
+                    changed = u['user'].lower() in user_facts
+                else:
+                    changed = absent(user_facts, cursor, u['user'], u['roles'])
+            elif module.check_mode:
+                changed = not check(user_facts, u['user'], u['profile'], u['resource_pool'],
+                    locked, u['password'], u['expired'], u['ldap'], u['roles'])
+            else:
+                changed = present(user_facts, cursor, u['user'], u['profile'], u['resource_pool'],
+                    locked, u['password'], u['expired'], u['ldap'], u['roles'], refresh=False)
+            if changed:
+                changed_users.append(u['user'])
+        if not module.check_mode:
+            db_conn.commit()
+    except (NotSupportedError, CannotDropError, pyodbc.Error), e:
+        db_conn.rollback()
+        module.fail_json(msg=str(e), ansible_facts={'vertica_users': get_user_facts(cursor)})
+    except SystemExit:
+        # avoid catching this on python 2.4
+        db_conn.rollback()
+        raise
+    except Exception, e:
+        db_conn.rollback()
+        module.fail_json(msg=str(e))
+
+    if changed_users and not module.check_mode:
+        user_facts = get_user_facts(cursor)
+    module.exit_json(changed=len(changed_users) > 0, users=changed_users,
+        ansible_facts={'vertica_users': user_facts})
+
 # module logic
 
 def main():
 
     module = AnsibleModule(
         argument_spec=dict(
-            user=dict(required=True, aliases=['name']),
+            user=dict(default=None, aliases=['name']),
             profile=dict(default=None),
             resource_pool=dict(default=None),
             password=dict(default=None),
@@ -308,7 +407,11 @@ def main():
             port=dict(default='5433'),
             login_user=dict(default='dbadmin'),
             login_password=dict(default=None),
-        ), supports_check_mode = True)
+            users=dict(default=None, type='list'),
+        ),
+        required_one_of=[['user', 'users']],
+        mutually_exclusive=[['user', 'users']],
+        supports_check_mode = True)
 
     if not pyodbc_found:
         module.fail_json(msg="The python pyodbc module is required.")
@@ -349,11 +452,14 @@ def main():
             "ConnectionLoadBalance={5}"
             ).format(module.params['cluster'], module.params['port'], db,
                 module.params['login_user'], module.params['login_password'], 'true')
-        db_conn = pyodbc.connect(dsn, autocommit=True)
+        db_conn = pyodbc.connect(dsn, autocommit=module.params['users'] is None)
         cursor = db_conn.cursor()
     except Exception, e:
         module.fail_json(msg="Unable to connect to database: {0}.".format(e))
 
+    if module.params['users'] is not None:
+        bulk(module, db_conn, cursor)
+
     try:
         user_facts = get_user_facts(cursor)
         if module.check_mode:
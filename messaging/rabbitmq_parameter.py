@@ -30,12 +30,14 @@ options:
   component:
     description:
       - Name of the component of which the parameter is being set
-    required: true
+      - Required unless I(parameters) is given.
+    required: false
     default: null
   name:
     description:
       - Name of the parameter being set
-    required: true
+      - Required unless I(parameters) is given.
+    required: false
     default: null
   value:
     description:
@@ -59,6 +61,47 @@ options:
     required: false
     default: present
     choices: [ 'present', 'absent']
+  parameters:
+    description:
+      - List of parameters to manage in one run, each a dict with the keys
+        C(component) and C(name) and optionally C(value) and C(vhost), which
+        default to the module options of the same name.
+      - The existing parameters are read once per vhost, or once in total
+        with I(management_api=yes).
+    required: false
+    default: null
+    version_added: "2.1"
+  management_api:
+    description:
+      - Talk to the management plugin HTTP API instead of running C(rabbitmqctl).
+    required: false
+    default: "no"
+    choices: [ "yes", "no" ]
+    version_added: "2.1"
+  login_user:
+    description:
+      - rabbitMQ user for connection when I(management_api=yes)
+    required: false
+    default: guest
+    version_added: "2.1"
+  login_password:
+    description:
+      - rabbitMQ password for connection when I(management_api=yes)
+    required: false
+    default: guest
+    version_added: "2.1"
+  login_host:
+    description:
+      - rabbitMQ host for connection when I(management_api=yes)
+    required: false
+    default: localhost
+    version_added: "2.1"
+  login_port:
+    description:
+      - rabbitMQ management api port
+    required: false
+    default: 15672
+    version_added: "2.1"
 '''
 
 EXAMPLES = """
@@ -67,20 +110,80 @@ EXAMPLES = """
                       name=local-username
                       value='"guest"'
                       state=present
+
+# Set several federation parameters through the management API
+- rabbitmq_parameter:
+    management_api: yes
+    login_user: admin
+    login_password: secret
+    component: federation
+    parameters:
+      - { name: local-username, value: '"guest"' }
+      - { name: expires, value: '3600000' }
 """
 
+import json
+import urllib
+try:
+    import requests
+    HAS_REQUESTS = True
+except ImportError:
+    HAS_REQUESTS = False
+
+
+# This class is copied verbatim into rabbitmq_user, rabbitmq_vhost,
+# rabbitmq_policy, rabbitmq_parameter and rabbitmq_topology, as modules
+# can only share code through ansible's module_utils. Keep the copies
+# identical.
+class RabbitMqApi(object):
+    """
+    Minimal client for the management plugin HTTP API over one requests
+    session. Changes are skipped in check mode, and errors are raised
+    rather than failing the module so they can be reported per object.
+    """
+    def __init__(self, module):
+        self.module = module
+        self.base_url = "http://%s:%s/api/" % (module.params['login_host'], module.params['login_port'])
+        self.session = requests.Session()
+        self.session.auth = (module.params['login_user'], module.params['login_password'])
+        self.session.headers.update({"content-type": "application/json"})
+
+    def request(self, method, data, *parts):
+        if method != 'GET' and self.module.check_mode:
+            return None
+        url = self.base_url + '/'.join([urllib.quote(part, '') for part in parts])
+        if data is not None:
+            data = json.dumps(data)
+        r = self.session.request(method, url, data=data)
+        if r.status_code not in (200, 201, 204):
+            raise Exception("Invalid response from RESTAPI for %s: %s %s" % (r.url, r.status_code, r.text))
+        if method == 'GET':
+            return r.json()
+
+    def get(self, *parts):
+        return self.request('GET', None, *parts)
+
+    def put(self, data, *parts):
+        return self.request('PUT', data, *parts)
+
+    def delete(self, *parts):
+        return self.request('DELETE', None, *parts)
+
+
 class RabbitMqParameter(object):
-    def __init__(self, module, component, name, value, vhost, node):
+    def __init__(self, module, component, name, value, vhost, node, api=None):
         self.module = module
         self.component = component
         self.name = name
         self.value = value
         self.vhost = vhost
         self.node = node
+        self.api = api
 
         self._value = None
 
-        self._rabbitmqctl = module.get_bin_path('rabbitmqctl', True)
+        if api is None:
+            self._rabbitmqctl = module.get_bin_path('rabbitmqctl', True)
 
     def _exec(self, args, run_in_check_mode=False):
         if not self.module.check_mode or (self.module.check_mode and run_in_check_mode):
@@ -89,37 +192,98 @@ class RabbitMqParameter(object):
             return out.splitlines()
         return list()
 
-    def get(self):
-        parameters = self._exec(['list_parameters', '-p', self.vhost], True)
+    def list(self):
+        """
+        Values of the existing parameters keyed by (vhost, component, name).
+        The management API returns every vhost at once, rabbitmqctl only the
+        one of this parameter
+        """
+        parameters = dict()
+        if self.api is not None:
+            for param_item in self.api.get('parameters'):
+                key = (param_item['vhost'], param_item['component'], param_item['name'])
+                parameters[key] = param_item['value']
+            return parameters
 
-        for param_item in parameters:
+        for param_item in self._exec(['list_parameters', '-p', self.vhost], True):
             component, name, value = param_item.split('\t')
+            parameters[(self.vhost, component, name)] = value
+        return parameters
+
+    def get(self, parameters=None, vhosts=None):
+        if parameters is None:
+            parameters = self.list()
+        elif self.api is None and vhosts is not None and self.vhost not in vhosts:
+            parameters.update(self.list())
+            vhosts.add(self.vhost)
 
-            if component == self.component and name == self.name:
-                self._value = value
-                return True
+        key = (self.vhost, self.component, self.name)
+        if key in parameters:
+            self._value = parameters[key]
+            return True
         return False
 
+    def _decoded_value(self):
+        """
+        The value as a JSON term; values given as YAML structures rather than
+        JSON strings are taken as they are
+        """
+        if self.value is None:
+            self.module.fail_json(msg="value must be supplied for parameter %s" % self.name)
+        if not isinstance(self.value, basestring):
+            return self.value
+        try:
+            return json.loads(self.value)
+        except ValueError:
+            self.module.fail_json(msg="value of parameter %s is not valid JSON: %s" % (self.name, self.value))
+
+    def _encoded_value(self):
+        if self.value is None or isinstance(self.value, basestring):
+            return self.value
+        return json.dumps(self.value)
+
     def set(self):
-        self._exec(['set_parameter', '-p', self.vhost, self.component, self.name, self.value])
+        if self.api is not None:
+            self.api.put(dict(
+                component=self.component,
+                vhost=self.vhost,
+                name=self.name,
+                value=self._decoded_value()
+            ), 'parameters', self.component, self.vhost, self.name)
+            return
+        self._exec(['set_parameter', '-p', self.vhost, self.component, self.name, self._encoded_value()])
 
     def delete(self):
+        if self.api is not None:
+            self.api.delete('parameters', self.component, self.vhost, self.name)
+            return
         self._exec(['clear_parameter', '-p', self.vhost, self.component, self.name])
 
     def has_modifications(self):
-        return self.value != self._value
+        if self.api is not None:
+            # the API returns the decoded JSON term
+            return self._decoded_value() != self._value
+        return self._encoded_value() != self._value
 
 def main():
     arg_spec = dict(
-        component=dict(required=True),
-        name=dict(required=True),
+        component=dict(),
+        name=dict(),
         value=dict(default=None),
         vhost=dict(default='/'),
         state=dict(default='present', choices=['present', 'absent']),
-        node=dict(default='rabbit')
+        node=dict(default='rabbit'),
+        parameters=dict(type='list'),
+        management_api=dict(default='no', type='bool'),
+        login_user=dict(default='guest'),
+        login_password=dict(default='guest', no_log=True),
+        login_host=dict(default='localhost'),
+        login_port=dict(default='15672'),
     )
     module = AnsibleModule(
         argument_spec=arg_spec,
+        required_one_of=[['name', 'parameters']],
+        mutually_exclusive=[['name', 'parameters']],
         supports_check_mode=True
     )
 
@@ -130,21 +294,59 @@ def main():
     state = module.params['state']
     node = module.params['node']
 
-    rabbitmq_parameter = RabbitMqParameter(module, component, name, value, vhost, node)
+    api = None
+    if module.params['management_api']:
+        if not HAS_REQUESTS:
+            module.fail_json(msg="python requests is required when management_api=yes")
+        api = RabbitMqApi(module)
 
-    changed = False
-    if rabbitmq_parameter.get():
-        if state == 'absent':
-            rabbitmq_parameter.delete()
-            changed = True
-        else:
-            if rabbitmq_parameter.has_modifications():
+    if module.params['parameters'] is not None:
+        items = list()
+        for item in module.params['parameters']:
+            params = dict()
+            for key in ['component', 'name', 'value', 'vhost']:
+                params[key] = item.get(key, module.params[key])
+            if not params['component'] or not params['name']:
+                module.fail_json(msg="component and name must be supplied for each parameter")
+            items.append(params)
+    else:
+        if component is None:
+            module.fail_json(msg="component is required when name is given")
+        items = [dict(component=component, name=name, value=value, vhost=vhost)]
+
+    changed_parameters = list()
+    parameters = None
+    vhosts = None
+    try:
+        for params in items:
+            rabbitmq_parameter = RabbitMqParameter(module, params['component'], params['name'],
+                                                   params['value'], params['vhost'], node, api)
+            if parameters is None:
+                parameters = rabbitmq_parameter.list()
+                vhosts = set([params['vhost']])
+
+            changed = False
+            if rabbitmq_parameter.get(parameters, vhosts):
+                if state == 'absent':
+                    rabbitmq_parameter.delete()
+                    changed = True
+                else:
+                    if rabbitmq_parameter.has_modifications():
+                        rabbitmq_parameter.set()
+                        changed = True
+            elif state == 'present':
                 rabbitmq_parameter.set()
                 changed = True
-    elif state == 'present':
-        rabbitmq_parameter.set()
-        changed = True
 
+            if changed:
+                changed_parameters.append(dict(component=params['component'], name=params['name'], vhost=params['vhost']))
+    except Exception, e:
+        # errors of the management API
+        module.fail_json(msg=str(e))
+
+    changed = len(changed_parameters) > 0
+    if module.params['parameters'] is not None:
+        module.exit_json(changed=changed, parameters=changed_parameters, state=state)
     module.exit_json(changed=changed, component=component, name=name, vhost=vhost, state=state)
 
 # import module snippets
@@ -31,7 +31,8 @@ options:
   name:
     description:
       - The name of the policy to manage.
-    required: true
+      - Required unless I(policies) is given.
+    required: false
     default: null
   vhost:
     description:
@@ -41,12 +42,14 @@ options:
   pattern:
     description:
       - A regex of queues to apply the policy to.
-    required: true
+      - Required when I(name) is given.
+    required: false
     default: null
   tags:
     description:
       - A dict or string describing the policy.
-    required: true
+      - Required when I(name) is given.
+    required: false
     default: null
   priority:
     description:
@@ -63,6 +66,47 @@ options:
       - The state of the policy.
     default: present
     choices: [present, absent]
+  policies:
+    description:
+      - List of policies to manage in one run, each a dict with the keys
+        C(name), C(pattern) and C(tags) and optionally C(vhost) and
+        C(priority), which default to the module options of the same name.
+      - The existing policies are read once per vhost, or once in total
+        with I(management_api=yes).
+    required: false
+    default: null
+    version_added: "2.1"
+  management_api:
+    description:
+      - Talk to the management plugin HTTP API instead of running C(rabbitmqctl).
+    required: false
+    default: "no"
+    choices: [ "yes", "no" ]
+    version_added: "2.1"
+  login_user:
+    description:
+      - rabbitMQ user for connection when I(management_api=yes)
+    required: false
+    default: guest
+    version_added: "2.1"
+  login_password:
+    description:
+      - rabbitMQ password for connection when I(management_api=yes)
+    required: false
+    default: guest
+    version_added: "2.1"
+  login_host:
+    description:
+      - rabbitMQ host for connection when I(management_api=yes)
+    required: false
+    default: localhost
+    version_added: "2.1"
+  login_port:
+    description:
+      - rabbitMQ management api port
+    required: false
+    default: 15672
+    version_added: "2.1"
 '''
 
 EXAMPLES = '''
@@ -74,17 +118,78 @@ EXAMPLES = '''
 
 - name: ensure the default vhost contains the HA policy
   rabbitmq_policy: name=HA pattern='.*' tags="ha-mode=all"
+
+- name: ensure a set of policies through the management API
+  rabbitmq_policy:
+    management_api: yes
+    login_user: admin
+    login_password: secret
+    policies:
+      - { name: HA, pattern: '.*', tags: { ha-mode: all } }
+      - { name: TTL, vhost: /orders, pattern: '^tmp\.', tags: { message-ttl: 60000 }, priority: 1 }
 '''
+import json
+import urllib
+try:
+    import requests
+    HAS_REQUESTS = True
+except ImportError:
+    HAS_REQUESTS = False
+
+
+# This class is copied verbatim into rabbitmq_user, rabbitmq_vhost,
+# rabbitmq_policy, rabbitmq_parameter and rabbitmq_topology, as modules
+# can only share code through ansible's module_utils. Keep the copies
+# identical.
+class RabbitMqApi(object):
+    """
+    Minimal client for the management plugin HTTP API over one requests
+    session. Changes are skipped in check mode, and errors are raised
+    rather than failing the module so they can be reported per object.
+    """
+    def __init__(self, module):
+        self.module = module
+        self.base_url = "http://%s:%s/api/" % (module.params['login_host'], module.params['login_port'])
+        self.session = requests.Session()
+        self.session.auth = (module.params['login_user'], module.params['login_password'])
+        self.session.headers.update({"content-type": "application/json"})
+
+    def request(self, method, data, *parts):
+        if method != 'GET' and self.module.check_mode:
+            return None
+        url = self.base_url + '/'.join([urllib.quote(part, '') for part in parts])
+        if data is not None:
+            data = json.dumps(data)
+        r = self.session.request(method, url, data=data)
+        if r.status_code not in (200, 201, 204):
+            raise Exception("Invalid response from RESTAPI for %s: %s %s" % (r.url, r.status_code, r.text))
+        if method == 'GET':
+            return r.json()
+
+    def get(self, *parts):
+        return self.request('GET', None, *parts)
+
+    def put(self, data, *parts):
+        return self.request('PUT', data, *parts)
+
+    def delete(self, *parts):
+        return self.request('DELETE', None, *parts)
+
+
 class RabbitMqPolicy(object):
-    def __init__(self, module, name):
+    def __init__(self, module, name, params=None, api=None):
+        if params is None:
+            params = module.params
         self._module = module
         self._name = name
-        self._vhost = module.params['vhost']
-        self._pattern = module.params['pattern']
-        self._tags = module.params['tags']
-        self._priority = module.params['priority']
+        self._vhost = params['vhost']
+        self._pattern = params['pattern']
+        self._tags = params['tags']
+        self._priority = params['priority']
         self._node = module.params['node']
-        self._rabbitmqctl = module.get_bin_path('rabbitmqctl', True)
+        self._api = api
+        if api is None:
+            self._rabbitmqctl = module.get_bin_path('rabbitmqctl', True)
 
     def _exec(self, args, run_in_check_mode=False):
         if not self._module.check_mode or (self._module.check_mode and run_in_check_mode):
@@ -95,60 +200,120 @@ class RabbitMqPolicy(object):
             return out.splitlines()
         return list()
 
-    def list(self):
-        policies = self._exec(['list_policies'], True)
+    def list_all(self):
+        """
+        Names of the existing policies, keyed by vhost.  The management API
+        returns every vhost at once, rabbitmqctl only the one of this policy
+        """
+        policies = dict()
+        if self._api is not None:
+            for policy in self._api.get('policies'):
+                policies.setdefault(policy['vhost'], set()).add(policy['name'])
+            return policies
+
+        policies[self._vhost] = set()
+        for policy in self._exec(['list_policies'], True):
+            policies[self._vhost].add(policy.split('\t')[1])
+        return policies
 
-        for policy in policies:
-            policy_name = policy.split('\t')[1]
-            if policy_name == self._name:
-                return True
-        return False
+    def list(self, policies=None):
+        if policies is None:
+            policies = self.list_all()
+        elif self._api is None and self._vhost not in policies:
+            policies.update(self.list_all())
+
+        return self._name in policies.get(self._vhost, set())
 
     def set(self):
-        import json
+        if self._api is not None:
+            return self._api.put(dict(
+                pattern=self._pattern,
+                definition=self._tags,
+                priority=int(self._priority)
+            ), 'policies', self._vhost, self._name)
+
         args = ['set_policy']
         args.append(self._name)
         args.append(self._pattern)
         args.append(json.dumps(self._tags))
         args.append('--priority')
-        args.append(self._priority)
+        args.append(str(self._priority))
         return self._exec(args)
 
     def clear(self):
+        if self._api is not None:
+            return self._api.delete('policies', self._vhost, self._name)
         return self._exec(['clear_policy', self._name])
 
 
 def main():
     arg_spec = dict(
-        name=dict(required=True),
+        name=dict(),
         vhost=dict(default='/'),
-        pattern=dict(required=True),
-        tags=dict(type='dict', required=True),
+        pattern=dict(),
+        tags=dict(type='dict'),
         priority=dict(default='0'),
         node=dict(default='rabbit'),
         state=dict(default='present', choices=['present', 'absent']),
+        policies=dict(type='list'),
+        management_api=dict(default='no', type='bool'),
+        login_user=dict(default='guest'),
+        login_password=dict(default='guest', no_log=True),
+        login_host=dict(default='localhost'),
+        login_port=dict(default='15672'),
     )
 
     module = AnsibleModule(
         argument_spec=arg_spec,
+        required_one_of=[['name', 'policies']],
+        mutually_exclusive=[['name', 'policies']],
+        required_together=[['name', 'pattern', 'tags']],
         supports_check_mode=True
     )
 
     name = module.params['name']
     state = module.params['state']
-    rabbitmq_policy = RabbitMqPolicy(module, name)
-
-    changed = False
-    if rabbitmq_policy.list():
-        if state == 'absent':
-            rabbitmq_policy.clear()
-            changed = True
-        else:
-            changed = False
-    elif state == 'present':
-        rabbitmq_policy.set()
-        changed = True
 
+    api = None
+    if module.params['management_api']:
+        if not HAS_REQUESTS:
+            module.fail_json(msg="python requests is required when management_api=yes")
+        api = RabbitMqApi(module)
+
+    if module.params['policies'] is not None:
+        items = list()
+        for item in module.params['policies']:
+            params = dict()
+            for key in ['name', 'vhost', 'pattern', 'tags', 'priority']:
+                params[key] = item.get(key, module.params[key])
+            if not params['name'] or params['pattern'] is None or params['tags'] is None:
+                module.fail_json(msg="name, pattern and tags must be supplied for each policy")
+            items.append(params)
+    else:
+        items = [module.params]
+
+    changed_policies = list()
+    policies = None
+    try:
+        for params in items:
+            rabbitmq_policy = RabbitMqPolicy(module, params['name'], params, api)
+            if policies is None:
+                policies = rabbitmq_policy.list_all()
+
+            if rabbitmq_policy.list(policies):
+                if state == 'absent':
+                    rabbitmq_policy.clear()
+                    changed_policies.append(params['name'])
+            elif state == 'present':
+                rabbitmq_policy.set()
+                changed_policies.append(params['name'])
+    except Exception, e:
+        # errors of the management API
+        module.fail_json(msg=str(e))
+
+    changed = len(changed_policies) > 0
+    if module.params['policies'] is not None:
+        module.exit_json(changed=changed, policies=changed_policies, state=state)
     module.exit_json(changed=changed, name=name, state=state)
 
 # import module snippets
@@ -0,0 +1,404 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+# This file is part of Ansible
+#
+# Ansible is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Ansible is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Ansible.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+DOCUMENTATION = '''
+---
+module: rabbitmq_topology
+version_added: "2.1"
+
+short_description: Manage exchanges, queues, bindings and policies of RabbitMQ in bulk
+description:
+  - This module uses the rabbitMQ Rest API to bring a whole set of exchanges,
+    queues, bindings and policies to the desired state.
+  - The current definitions of the broker are fetched once from
+    C(/api/definitions) and diffed locally, so only the missing, changed or,
+    with I(purge=yes), unlisted objects cause further requests.
+requirements: [ python requests ]
+options:
+    login_user:
+        description:
+            - rabbitMQ user for connection
+        required: false
+        default: guest
+    login_password:
+        description:
+            - rabbitMQ password for connection
+        required: false
+        default: guest
+    login_host:
+        description:
+            - rabbitMQ host for connection
+        required: false
+        default: localhost
+    login_port:
+        description:
+            - rabbitMQ management api port
+        required: false
+        default: 15672
+    vhost:
+        description:
+            - rabbitMQ virtual host of the objects that do not name one
+        required: false
+        default: "/"
+    exchanges:
+        description:
+            - List of exchanges, each a dict with the key C(name) and optionally
+              C(vhost), C(type) (default C(direct)), C(durable), C(auto_delete),
+              C(internal) and C(arguments).
+        required: false
+        default: []
+    queues:
+        description:
+            - List of queues, each a dict with the key C(name) and optionally
+              C(vhost), C(durable), C(auto_delete) and C(arguments).
+        required: false
+        default: []
+    bindings:
+        description:
+            - List of bindings, each a dict with the keys C(source) and
+              C(destination) and optionally C(vhost), C(destination_type)
+              (default C(queue)), C(routing_key) (default C(#)) and C(arguments).
+        required: false
+        default: []
+    policies:
+        description:
+            - List of policies, each a dict with the keys C(name), C(pattern) and
+              C(definition) and optionally C(vhost), C(priority) and C(apply-to).
+        required: false
+        default: []
+    purge:
+        description:
+            - Remove the exchanges, queues, bindings and policies of the vhosts
+              used above that are not listed. Default and C(amq.*) exchanges
+              are never removed.
+        required: false
+        choices: [ "yes", "no" ]
+        default: no
+    method:
+        description:
+            - How the changes are applied.
+            - C(api) issues one request per created, changed or removed object
+              over a persistent session, I(concurrency) at a time.
+            - C(definitions) posts all created and changed objects as one merged
+              definitions document; removals still use single requests.
+        required: false
+        choices: [ "api", "definitions" ]
+        default: api
+    concurrency:
+        description:
+            - Maximum number of requests issued at the same time.
+        required: false
+        default: 8
+notes:
+  - RabbitMQ cannot change the properties of an existing exchange or queue,
+    so such differences make the module fail instead of being applied.
+'''
+
+EXAMPLES = '''
+# Declare the topology of the orders application in one task
+- rabbitmq_topology:
+    login_user: admin
+    login_password: secret
+    vhost: /orders
+    exchanges:
+      - { name: orders, type: topic }
+    queues:
+      - { name: orders.created }
+      - { name: orders.failed, arguments: { x-message-ttl: 86400000 } }
+    bindings:
+      - { source: orders, destination: orders.created, routing_key: "created.#" }
+      - { source: orders, destination: orders.failed, routing_key: "*.failed" }
+    policies:
+      - { name: HA, pattern: ".*", definition: { ha-mode: all } }
+
+# Apply a large generated topology as a single definitions upload and
+# remove everything else from the vhost
+- rabbitmq_topology:
+    vhost: /events
+    queues: "{{ event_queues }}"
+    bindings: "{{ event_bindings }}"
+    method: definitions
+    purge: yes
+'''
+
+import json
+import urllib
+from multiprocessing.pool import ThreadPool
+try:
+    import requests
+    HAS_REQUESTS = True
+except ImportError:
+    HAS_REQUESTS = False
+
+
+# desired keys and their defaults, per object type
+OBJECT_DEFAULTS = {
+    'exchanges': dict(type='direct', durable=True, auto_delete=False, internal=False, arguments={}),
+    'queues': dict(durable=True, auto_delete=False, arguments={}),
+    'bindings': dict(destination_type='queue', routing_key='#', arguments={}),
+    'policies': dict(priority=0, definition=None, pattern=None, **{'apply-to': 'all'}),
+}
+
+OBJECT_REQUIRED = {
+    'exchanges': ['name'],
+    'queues': ['name'],
+    'bindings': ['source', 'destination'],
+    'policies': ['name', 'pattern', 'definition'],
+}
+
+
+# This class is copied verbatim into rabbitmq_user, rabbitmq_vhost,
+# rabbitmq_policy, rabbitmq_parameter and rabbitmq_topology, as modules
+# can only share code through ansible's module_utils. Keep the copies
+# identical.
+class RabbitMqApi(object):
+    """
+    Minimal client for the management plugin HTTP API over one requests
+    session. Changes are skipped in check mode, and errors are raised
+    rather than failing the module so they can be reported per object.
+    """
+    def __init__(self, module):
+        self.module = module
+        self.base_url = "http://%s:%s/api/" % (module.params['login_host'], module.params['login_port'])
+        self.session = requests.Session()
+        self.session.auth = (module.params['login_user'], module.params['login_password'])
+        self.session.headers.update({"content-type": "application/json"})
+
+    def request(self, method, data, *parts):
+        if method != 'GET' and self.module.check_mode:
+            return None
+        url = self.base_url + '/'.join([urllib.quote(part, '') for part in parts])
+        if data is not None:
+            data = json.dumps(data)
+        r = self.session.request(method, url, data=data)
+        if r.status_code not in (200, 201, 204):
+            raise Exception("Invalid response from RESTAPI for %s: %s %s" % (r.url, r.status_code, r.text))
+        if method == 'GET':
+            return r.json()
+
+    def get(self, *parts):
+        return self.request('GET', None, *parts)
+
+    def put(self, data, *parts):
+        return self.request('PUT', data, *parts)
+
+    def delete(self, *parts):
+        return self.request('DELETE', None, *parts)
+
+
+def object_key(kind, obj):
+    """
+    Identity of an object within its type
+    """
+    if kind == 'bindings':
+        return (obj['vhost'], obj['source'], obj['destination_type'], obj['destination'],
+                obj['routing_key'], json.dumps(obj['arguments'] or {}, sort_keys=True))
+    return (obj['vhost'], obj['name'])
+
+
+def normalize(module, kind, items):
+    desired = dict()
+    for item in items or []:
+        obj = dict(OBJECT_DEFAULTS[kind])
+        obj['vhost'] = module.params['vhost']
+        obj.update(item)
+        for key in OBJECT_REQUIRED[kind]:
+            if obj.get(key) is None:
+                module.fail_json(msg="%s must be supplied for each entry of %s" % (key, kind))
+        if kind == 'policies':
+            obj['priority'] = int(obj['priority'])
+        desired[object_key(kind, obj)] = obj
+    return desired
+
+
+def diff_topology(current, desired, vhosts, purge):
+    """
+    Compare the broker definitions with the desired objects and return the
+    objects to create, the policies to update, the exchanges and queues whose
+    properties cannot be changed and the objects to delete, per type
+    """
+    create, update, conflict, delete = dict(), dict(), list(), dict()
+    for kind in ['exchanges', 'queues', 'bindings', 'policies']:
+        existing = dict()
+        for obj in current.get(kind, []):
+            if kind == 'bindings':
+                obj = dict(obj, arguments=obj.get('arguments') or {})
+            existing[object_key(kind, obj)] = obj
+
+        create[kind] = [obj for key, obj in desired[kind].items() if key not in existing]
+        update[kind] = list()
+        for key, obj in desired[kind].items():
+            if key not in existing or kind == 'bindings':
+                continue
+            props = [k for k in OBJECT_DEFAULTS[kind] if existing[key].get(k) != obj[k]]
+            if not props:
+                continue
+            if kind == 'policies':
+                update[kind].append(obj)
+            else:
+                conflict.append(dict(kind=kind[:-1], vhost=obj['vhost'], name=obj['name'], properties=props))
+
+        delete[kind] = list()
+        if purge:
+            for key, obj in existing.items():
+                if key in desired[kind] or obj['vhost'] not in vhosts:
+                    continue
+                if kind == 'exchanges' and (obj['name'] == '' or obj['name'].startswith('amq.')):
+                    continue
+                delete[kind].append(obj)
+    return create, update, conflict, delete
+
+
+def _put_object(api, kind, obj):
+    if kind == 'exchanges':
+        api.put(dict((k, obj[k]) for k in OBJECT_DEFAULTS[kind]), 'exchanges', obj['vhost'], obj['name'])
+    elif kind == 'queues':
+        api.put(dict((k, obj[k]) for k in OBJECT_DEFAULTS[kind]), 'queues', obj['vhost'], obj['name'])
+    elif kind == 'bindings':
+        api.request('POST', dict(routing_key=obj['routing_key'], arguments=obj['arguments']),
+                    'bindings', obj['vhost'], 'e', obj['source'], obj['destination_type'][0], obj['destination'])
+    else:
+        api.put(dict((k, obj[k]) for k in OBJECT_DEFAULTS[kind]), 'policies', obj['vhost'], obj['name'])
+
+
+def _delete_object(api, kind, obj):
+    if kind == 'bindings':
+        api.delete('bindings', obj['vhost'], 'e', obj['source'], obj['destination_type'][0],
+                   obj['destination'], urllib.unquote(obj['properties_key']))
+    else:
+        api.delete(kind, obj['vhost'], obj['name'])
+
+
+def run_parallel(pool, func, jobs):
+    """
+    Run func over jobs in the pool and collect the errors instead of
+    stopping at the first one
+    """
+    def _run(job):
+        try:
+            func(*job)
+        except Exception, e:
+            return str(e)
+        return None
+    return [error for error in pool.map(_run, jobs) if error is not None]
+
+
+def apply_topology(api, pool, method, create, update, delete):
+    errors = list()
+
+    # bindings need their source and destination, so they go last on
+    # creation and first on removal
+    if method == 'definitions':
+        document = dict(create)
+        document['policies'] = create['policies'] + update['policies']
+        try:
+            api.request('POST', document, 'definitions')
+        except Exception, e:
+            errors.append(str(e))
+    else:
+        errors += run_parallel(pool, _put_object,
+                               [(api, kind, obj) for kind in ['exchanges', 'queues', 'policies']
+                                for obj in create[kind] + update[kind]])
+        if not errors:
+            errors += run_parallel(pool, _put_object, [(api, 'bindings', obj) for obj in create['bindings']])
+
+    if delete['bindings']:
+        # the definitions do not carry the properties key needed to address a binding
+        properties_keys = dict()
+        for vhost in set([obj['vhost'] for obj in delete['bindings']]):
+            for obj in api.get('bindings', vhost):
+                obj = dict(obj, arguments=obj.get('arguments') or {})
+                properties_keys[object_key('bindings', obj)] = obj['properties_key']
+        bindings = [dict(obj, properties_key=properties_keys[object_key('bindings', obj)])
+                    for obj in delete['bindings'] if object_key('bindings', obj) in properties_keys]
+        errors += run_parallel(pool, _delete_object, [(api, 'bindings', obj) for obj in bindings])
+    errors += run_parallel(pool, _delete_object,
+                           [(api, kind, obj) for kind in ['policies', 'queues', 'exchanges']
+                            for obj in delete[kind]])
+    return errors
+
+
+def main():
+    module = AnsibleModule(
+        argument_spec = dict(
+            login_user = dict(default='guest', type='str'),
+            login_password = dict(default='guest', type='str', no_log=True),
+            login_host = dict(default='localhost', type='str'),
+            login_port = dict(default='15672', type='str'),
+            vhost = dict(default='/', type='str'),
+            exchanges = dict(default=[], type='list'),
+            queues = dict(default=[], type='list'),
+            bindings = dict(default=[], type='list'),
+            policies = dict(default=[], type='list'),
+            purge = dict(default=False, choices=BOOLEANS, type='bool'),
+            method = dict(default='api', choices=['api', 'definitions'], type='str'),
+            concurrency = dict(default=8, type='int'),
+        ),
+        supports_check_mode = True
+    )
+
+    if not HAS_REQUESTS:
+        module.fail_json(msg="python requests is required for this module")
+
+    concurrency = max(1, module.params['concurrency'])
+    api = RabbitMqApi(module)
+    # one pooled connection per worker thread
+    api.session.mount('http://', requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=concurrency))
+
+    desired = dict()
+    vhosts = set([module.params['vhost']])
+    for kind in ['exchanges', 'queues', 'bindings', 'policies']:
+        desired[kind] = normalize(module, kind, module.params[kind])
+        vhosts.update([obj['vhost'] for obj in desired[kind].values()])
+
+    try:
+        current = api.get('definitions')
+    except Exception, e:
+        module.fail_json(msg=str(e))
+
+    create, update, conflict, delete = diff_topology(current, desired, vhosts, module.params['purge'])
+    if conflict:
+        module.fail_json(
+            msg = "RabbitMQ RESTAPI doesn't support attribute changes for existing exchanges and queues",
+            conflicts = conflict
+        )
+
+    changed = any([create[kind] or update[kind] or delete[kind] for kind in create])
+    result = dict(changed=changed, created=create, updated=update, deleted=delete)
+
+    if module.check_mode or not changed:
+        module.exit_json(**result)
+
+    pool = ThreadPool(concurrency)
+    try:
+        try:
+            errors = apply_topology(api, pool, module.params['method'], create, update, delete)
+        except Exception, e:
+            errors = [str(e)]
+    finally:
+        pool.close()
+        pool.join()
+
+    if errors:
+        module.fail_json(msg="Error applying topology", errors=errors, **result)
+    module.exit_json(**result)
+
+# import module snippets
+from ansible.module_utils.basic import *
+main()
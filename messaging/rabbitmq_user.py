@@ -30,7 +30,8 @@ options:
   user:
     description:
       - Name of user to add
-    required: true
+      - Required unless I(users) is given.
+    required: false
     default: null
     aliases: [username, name]
   password:
@@ -89,6 +90,48 @@ options:
     required: false
     default: present
     choices: [present, absent]
+  users:
+    description:
+      - List of users to manage in one run, each a dict with the key C(user)
+        and optionally C(password), C(tags), C(vhost), C(configure_priv),
+        C(write_priv) and C(read_priv). Missing keys default to the module
+        options of the same name.
+      - The existing users and, with I(management_api=yes), all permissions
+        are read once for the whole list.
+    required: false
+    default: null
+    version_added: "2.1"
+  management_api:
+    description:
+      - Talk to the management plugin HTTP API instead of running C(rabbitmqctl).
+    required: false
+    default: "no"
+    choices: [ "yes", "no" ]
+    version_added: "2.1"
+  login_user:
+    description:
+      - rabbitMQ user for connection when I(management_api=yes)
+    required: false
+    default: guest
+    version_added: "2.1"
+  login_password:
+    description:
+      - rabbitMQ password for connection when I(management_api=yes)
+    required: false
+    default: guest
+    version_added: "2.1"
+  login_host:
+    description:
+      - rabbitMQ host for connection when I(management_api=yes)
+    required: false
+    default: localhost
+    version_added: "2.1"
+  login_port:
+    description:
+      - rabbitMQ management api port
+    required: false
+    default: 15672
+    version_added: "2.1"
 '''
 
 EXAMPLES = '''
@@ -100,14 +143,75 @@ EXAMPLES = '''
                  read_priv=.*
                  write_priv=.*
                  state=present
+
+# Add a set of users through the management API
+- rabbitmq_user:
+    management_api: yes
+    login_user: admin
+    login_password: secret
+    vhost: /orders
+    read_priv: .*
+    users:
+      - { user: orders-reader }
+      - { user: orders-writer, password: changeme, write_priv: .* }
+      - { user: ops, tags: "monitoring", vhost: / }
 '''
 
+import json
+import urllib
+try:
+    import requests
+    HAS_REQUESTS = True
+except ImportError:
+    HAS_REQUESTS = False
+
+
+# This class is copied verbatim into rabbitmq_user, rabbitmq_vhost,
+# rabbitmq_policy, rabbitmq_parameter and rabbitmq_topology, as modules
+# can only share code through ansible's module_utils. Keep the copies
+# identical.
+class RabbitMqApi(object):
+    """
+    Minimal client for the management plugin HTTP API over one requests
+    session. Changes are skipped in check mode, and errors are raised
+    rather than failing the module so they can be reported per object.
+    """
+    def __init__(self, module):
+        self.module = module
+        self.base_url = "http://%s:%s/api/" % (module.params['login_host'], module.params['login_port'])
+        self.session = requests.Session()
+        self.session.auth = (module.params['login_user'], module.params['login_password'])
+        self.session.headers.update({"content-type": "application/json"})
+
+    def request(self, method, data, *parts):
+        if method != 'GET' and self.module.check_mode:
+            return None
+        url = self.base_url + '/'.join([urllib.quote(part, '') for part in parts])
+        if data is not None:
+            data = json.dumps(data)
+        r = self.session.request(method, url, data=data)
+        if r.status_code not in (200, 201, 204):
+            raise Exception("Invalid response from RESTAPI for %s: %s %s" % (r.url, r.status_code, r.text))
+        if method == 'GET':
+            return r.json()
+
+    def get(self, *parts):
+        return self.request('GET', None, *parts)
+
+    def put(self, data, *parts):
+        return self.request('PUT', data, *parts)
+
+    def delete(self, *parts):
+        return self.request('DELETE', None, *parts)
+
+
 class RabbitMqUser(object):
-    def __init__(self, module, username, password, tags, vhost, configure_priv, write_priv, read_priv, node):
+    def __init__(self, module, username, password, tags, vhost, configure_priv, write_priv, read_priv, node, api=None):
         self.module = module
         self.username = username
         self.password = password
         self.node = node
+        self.api = api
         if not tags:
             self.tags = list()
         else:
@@ -123,7 +227,10 @@ class RabbitMqUser(object):
 
         self._tags = None
         self._permissions = None
-        self._rabbitmqctl = module.get_bin_path('rabbitmqctl', True)
+        self._password_hash = None
+        self._hashing_algorithm = None
+        if api is None:
+            self._rabbitmqctl = module.get_bin_path('rabbitmqctl', True)
 
     def _exec(self, args, run_in_check_mode=False):
         if not self.module.check_mode or (self.module.check_mode and run_in_check_mode):
@@ -132,23 +239,63 @@ class RabbitMqUser(object):
             return out.splitlines()
         return list()
 
-    def get(self):
-        users = self._exec(['list_users'], True)
+    def list(self):
+        users = dict()
+        if self.api is not None:
+            for user in self.api.get('users'):
+                tags = user.get('tags', '')
+                if not isinstance(tags, list):
+                    tags = [tag for tag in tags.split(',') if tag != '']
+                users[user['name']] = dict(
+                    tags=tags,
+                    password_hash=user.get('password_hash', ''),
+                    hashing_algorithm=user.get('hashing_algorithm')
+                )
+            return users
 
-        for user_tag in users:
+        for user_tag in self._exec(['list_users'], True):
             user, tags = user_tag.split('\t')
+            for c in ['[',']',' ']:
+                tags = tags.replace(c, '')
 
-            if user == self.username:
-                for c in ['[',']',' ']:
-                    tags = tags.replace(c, '')
+            if tags != '':
+                users[user] = dict(tags=tags.split(','))
+            else:
+                users[user] = dict(tags=list())
+        return users
 
-                if tags != '':
-                    self._tags = tags.split(',')
-                else:
-                    self._tags = list()
+    def list_permissions(self):
+        """
+        All permissions keyed by (user, vhost); only the management API
+        can return them in one request
+        """
+        if self.api is None:
+            return None
+        permissions = dict()
+        for perm in self.api.get('permissions'):
+            permissions[(perm['user'], perm['vhost'])] = dict(
+                vhost=perm['vhost'],
+                configure_priv=perm['configure'],
+                write_priv=perm['write'],
+                read_priv=perm['read']
+            )
+        return permissions
+
+    def get(self, users=None, permissions=None):
+        if users is None:
+            users = self.list()
+            permissions = self.list_permissions()
 
+        if self.username in users:
+            user = users[self.username]
+            self._tags = user['tags']
+            self._password_hash = user.get('password_hash')
+            self._hashing_algorithm = user.get('hashing_algorithm')
+            if permissions is not None:
+                self._permissions = permissions.get((self.username, self.permissions['vhost']), dict())
+            else:
                 self._permissions = self._get_permissions()
-                return True
+            return True
         return False
 
     def _get_permissions(self):
@@ -162,6 +309,16 @@ class RabbitMqUser(object):
         return dict()
 
     def add(self):
+        if self.api is not None:
+            if self.password is not None:
+                data = dict(password=self.password)
+            else:
+                data = dict(password_hash='')
+            self._password_hash = None
+            data['tags'] = ','.join(self.tags)
+            self.api.put(data, 'users', self.username)
+            return
+
         if self.password is not None:
             self._exec(['add_user', self.username, self.password])
         else:
@@ -169,12 +326,32 @@ class RabbitMqUser(object):
             self._exec(['clear_password', self.username])
 
     def delete(self):
+        if self.api is not None:
+            self.api.delete('users', self.username)
+            return
         self._exec(['delete_user', self.username])
 
     def set_tags(self):
+        if self.api is not None:
+            if self._password_hash is None:
+                # just created by add(), which already set the tags
+                return
+            # the API replaces the whole user, so keep its password
+            data = dict(password_hash=self._password_hash, tags=','.join(self.tags))
+            if self._hashing_algorithm:
+                data['hashing_algorithm'] = self._hashing_algorithm
+            self.api.put(data, 'users', self.username)
+            return
         self._exec(['set_user_tags', self.username] + self.tags)
 
     def set_permissions(self):
+        if self.api is not None:
+            self.api.put(dict(
+                configure=self.permissions['configure_priv'],
+                write=self.permissions['write_priv'],
+                read=self.permissions['read_priv']
+            ), 'permissions', self.permissions['vhost'], self.username)
+            return
         cmd = ['set_permissions']
         cmd.append('-p')
         cmd.append(self.permissions['vhost'])
@@ -192,7 +369,7 @@ class RabbitMqUser(object):
 
 def main():
     arg_spec = dict(
-        user=dict(required=True, aliases=['username', 'name']),
+        user=dict(aliases=['username', 'name']),
         password=dict(default=None),
         tags=dict(default=None),
         vhost=dict(default='/'),
@@ -201,10 +378,18 @@ def main():
         read_priv=dict(default='^$'),
         force=dict(default='no', type='bool'),
         state=dict(default='present', choices=['present', 'absent']),
-        node=dict(default='rabbit')
+        node=dict(default='rabbit'),
+        users=dict(type='list'),
+        management_api=dict(default='no', type='bool'),
+        login_user=dict(default='guest'),
+        login_password=dict(default='guest', no_log=True),
+        login_host=dict(default='localhost'),
+        login_port=dict(default='15672'),
     )
     module = AnsibleModule(
         argument_spec=arg_spec,
+        required_one_of=[['user', 'users']],
+        mutually_exclusive=[['user', 'users']],
         supports_check_mode=True
     )
 
@@ -219,33 +404,71 @@ def main():
     state = module.params['state']
     node = module.params['node']
 
-    rabbitmq_user = RabbitMqUser(module, username, password, tags, vhost, configure_priv, write_priv, read_priv, node)
+    api = None
+    if module.params['management_api']:
+        if not HAS_REQUESTS:
+            module.fail_json(msg="python requests is required when management_api=yes")
+        api = RabbitMqApi(module)
 
-    changed = False
-    if rabbitmq_user.get():
-        if state == 'absent':
-            rabbitmq_user.delete()
-            changed = True
-        else:
-            if force:
-                rabbitmq_user.delete()
-                rabbitmq_user.add()
-                rabbitmq_user.get()
-                changed = True
+    if module.params['users'] is not None:
+        items = list()
+        for item in module.params['users']:
+            if not item.get('user'):
+                module.fail_json(msg="user must be supplied for each user")
+            items.append((item['user'],
+                          item.get('password', password),
+                          item.get('tags', tags),
+                          item.get('vhost', vhost),
+                          item.get('configure_priv', configure_priv),
+                          item.get('write_priv', write_priv),
+                          item.get('read_priv', read_priv)))
+    else:
+        items = [(username, password, tags, vhost, configure_priv, write_priv, read_priv)]
 
-            if rabbitmq_user.has_tags_modifications():
-                rabbitmq_user.set_tags()
-                changed = True
+    changed_users = list()
+    users = None
+    permissions = None
+    try:
+        for item in items:
+            rabbitmq_user = RabbitMqUser(module, *(item + (node, api)))
+            if users is None:
+                users = rabbitmq_user.list()
+                permissions = rabbitmq_user.list_permissions()
+
+            changed = False
+            if rabbitmq_user.get(users, permissions):
+                if state == 'absent':
+                    rabbitmq_user.delete()
+                    changed = True
+                else:
+                    if force:
+                        rabbitmq_user.delete()
+                        rabbitmq_user.add()
+                        rabbitmq_user.get()
+                        changed = True
+
+                    if rabbitmq_user.has_tags_modifications():
+                        rabbitmq_user.set_tags()
+                        changed = True
 
-            if rabbitmq_user.has_permissions_modifications():
+                    if rabbitmq_user.has_permissions_modifications():
+                        rabbitmq_user.set_permissions()
+                        changed = True
+            elif state == 'present':
+                rabbitmq_user.add()
+                rabbitmq_user.set_tags()
                 rabbitmq_user.set_permissions()
                 changed = True
-    elif state == 'present':
-        rabbitmq_user.add()
-        rabbitmq_user.set_tags()
-        rabbitmq_user.set_permissions()
-        changed = True
 
+            if changed:
+                changed_users.append(item[0])
+    except Exception, e:
+        # errors of the management API
+        module.fail_json(msg=str(e))
+
+    changed = len(changed_users) > 0
+    if module.params['users'] is not None:
+        module.exit_json(changed=changed, users=changed_users, state=state)
     module.exit_json(changed=changed, user=username, state=state)
 
 # import module snippets
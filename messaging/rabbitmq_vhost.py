@@ -31,7 +31,8 @@ options:
   name:
     description:
       - The name of the vhost to manage
-    required: true
+      - Required unless I(vhosts) is given.
+    required: false
     default: null
     aliases: [vhost]
   node:
@@ -51,22 +52,121 @@ options:
       - The state of vhost
     default: present
     choices: [present, absent]
+  vhosts:
+    description:
+      - List of vhosts to manage in one run, each either a name or a dict
+        with the key C(name) and optionally C(tracing).
+      - The existing vhosts are read once for the whole list.
+    required: false
+    default: null
+    version_added: "2.1"
+  management_api:
+    description:
+      - Talk to the management plugin HTTP API instead of running C(rabbitmqctl).
+    required: false
+    default: "no"
+    choices: [ "yes", "no" ]
+    version_added: "2.1"
+  login_user:
+    description:
+      - rabbitMQ user for connection when I(management_api=yes)
+    required: false
+    default: guest
+    version_added: "2.1"
+  login_password:
+    description:
+      - rabbitMQ password for connection when I(management_api=yes)
+    required: false
+    default: guest
+    version_added: "2.1"
+  login_host:
+    description:
+      - rabbitMQ host for connection when I(management_api=yes)
+    required: false
+    default: localhost
+    version_added: "2.1"
+  login_port:
+    description:
+      - rabbitMQ management api port
+    required: false
+    default: 15672
+    version_added: "2.1"
 '''
 
 EXAMPLES = '''
 # Ensure that the vhost /test exists.
 - rabbitmq_vhost: name=/test state=present
+
+# Ensure a set of vhosts exists, using the management API
+- rabbitmq_vhost:
+    management_api: yes
+    login_user: admin
+    login_password: secret
+    vhosts:
+      - /orders
+      - /billing
+      - { name: /audit, tracing: yes }
 '''
 
+import json
+import urllib
+try:
+    import requests
+    HAS_REQUESTS = True
+except ImportError:
+    HAS_REQUESTS = False
+
+
+# This class is copied verbatim into rabbitmq_user, rabbitmq_vhost,
+# rabbitmq_policy, rabbitmq_parameter and rabbitmq_topology, as modules
+# can only share code through ansible's module_utils. Keep the copies
+# identical.
+class RabbitMqApi(object):
+    """
+    Minimal client for the management plugin HTTP API over one requests
+    session. Changes are skipped in check mode, and errors are raised
+    rather than failing the module so they can be reported per object.
+    """
+    def __init__(self, module):
+        self.module = module
+        self.base_url = "http://%s:%s/api/" % (module.params['login_host'], module.params['login_port'])
+        self.session = requests.Session()
+        self.session.auth = (module.params['login_user'], module.params['login_password'])
+        self.session.headers.update({"content-type": "application/json"})
+
+    def request(self, method, data, *parts):
+        if method != 'GET' and self.module.check_mode:
+            return None
+        url = self.base_url + '/'.join([urllib.quote(part, '') for part in parts])
+        if data is not None:
+            data = json.dumps(data)
+        r = self.session.request(method, url, data=data)
+        if r.status_code not in (200, 201, 204):
+            raise Exception("Invalid response from RESTAPI for %s: %s %s" % (r.url, r.status_code, r.text))
+        if method == 'GET':
+            return r.json()
+
+    def get(self, *parts):
+        return self.request('GET', None, *parts)
+
+    def put(self, data, *parts):
+        return self.request('PUT', data, *parts)
+
+    def delete(self, *parts):
+        return self.request('DELETE', None, *parts)
+
+
 class RabbitMqVhost(object):
-    def __init__(self, module, name, tracing, node):
+    def __init__(self, module, name, tracing, node, api=None):
         self.module = module
         self.name = name
         self.tracing = tracing
         self.node = node
+        self.api = api
 
         self._tracing = False
-        self._rabbitmqctl = module.get_bin_path('rabbitmqctl', True)
+        if api is None:
+            self._rabbitmqctl = module.get_bin_path('rabbitmqctl', True)
 
     def _exec(self, args, run_in_check_mode=False):
         if not self.module.check_mode or (self.module.check_mode and run_in_check_mode):
@@ -75,20 +175,35 @@ class RabbitMqVhost(object):
             return out.splitlines()
         return list()
 
-    def get(self):
-        vhosts = self._exec(['list_vhosts', 'name', 'tracing'], True)
+    def list(self):
+        vhosts = dict()
+        if self.api is not None:
+            for vhost in self.api.get('vhosts'):
+                vhosts[vhost['name']] = vhost.get('tracing', False)
+            return vhosts
 
-        for vhost in vhosts:
+        for vhost in self._exec(['list_vhosts', 'name', 'tracing'], True):
             name, tracing = vhost.split('\t')
-            if name == self.name:
-                self._tracing = self.module.boolean(tracing)
-                return True
+            vhosts[name] = self.module.boolean(tracing)
+        return vhosts
+
+    def get(self, vhosts=None):
+        if vhosts is None:
+            vhosts = self.list()
+
+        if self.name in vhosts:
+            self._tracing = vhosts[self.name]
+            return True
         return False
 
     def add(self):
+        if self.api is not None:
+            return self.api.put({}, 'vhosts', self.name)
         return self._exec(['add_vhost', self.name])
 
     def delete(self):
+        if self.api is not None:
+            return self.api.delete('vhosts', self.name)
         return self._exec(['delete_vhost', self.name])
 
     def set_tracing(self):
@@ -101,22 +216,34 @@ class RabbitMqVhost(object):
         return False
 
     def _enable_tracing(self):
+        if self.api is not None:
+            return self.api.put({'tracing': True}, 'vhosts', self.name)
         return self._exec(['trace_on', '-p', self.name])
 
     def _disable_tracing(self):
+        if self.api is not None:
+            return self.api.put({'tracing': False}, 'vhosts', self.name)
         return self._exec(['trace_off', '-p', self.name])
 
 
 def main():
     arg_spec = dict(
-        name=dict(required=True, aliases=['vhost']),
+        name=dict(aliases=['vhost']),
         tracing=dict(default='off', aliases=['trace'], type='bool'),
         state=dict(default='present', choices=['present', 'absent']),
         node=dict(default='rabbit'),
+        vhosts=dict(type='list'),
+        management_api=dict(default='no', type='bool'),
+        login_user=dict(default='guest'),
+        login_password=dict(default='guest', no_log=True),
+        login_host=dict(default='localhost'),
+        login_port=dict(default='15672'),
     )
 
     module = AnsibleModule(
         argument_spec=arg_spec,
+        required_one_of=[['name', 'vhosts']],
+        mutually_exclusive=[['name', 'vhosts']],
         supports_check_mode=True
     )
 
@@ -125,21 +252,49 @@ def main():
     state = module.params['state']
     node = module.params['node']
 
-    rabbitmq_vhost = RabbitMqVhost(module, name, tracing, node)
-
-    changed = False
-    if rabbitmq_vhost.get():
-        if state == 'absent':
-            rabbitmq_vhost.delete()
-            changed = True
-        else:
-            if rabbitmq_vhost.set_tracing():
-                changed = True
-    elif state == 'present':
-        rabbitmq_vhost.add()
-        rabbitmq_vhost.set_tracing()
-        changed = True
+    api = None
+    if module.params['management_api']:
+        if not HAS_REQUESTS:
+            module.fail_json(msg="python requests is required when management_api=yes")
+        api = RabbitMqApi(module)
+
+    if module.params['vhosts'] is not None:
+        items = list()
+        for item in module.params['vhosts']:
+            if not isinstance(item, dict):
+                item = dict(name=item)
+            if not item.get('name'):
+                module.fail_json(msg="name must be supplied for each vhost")
+            items.append((item['name'], module.boolean(item.get('tracing', tracing))))
+    else:
+        items = [(name, tracing)]
+
+    changed_vhosts = list()
+    vhosts = None
+    try:
+        for vhost_name, vhost_tracing in items:
+            rabbitmq_vhost = RabbitMqVhost(module, vhost_name, vhost_tracing, node, api)
+            if vhosts is None:
+                vhosts = rabbitmq_vhost.list()
+
+            if rabbitmq_vhost.get(vhosts):
+                if state == 'absent':
+                    rabbitmq_vhost.delete()
+                    changed_vhosts.append(vhost_name)
+                else:
+                    if rabbitmq_vhost.set_tracing():
+                        changed_vhosts.append(vhost_name)
+            elif state == 'present':
+                rabbitmq_vhost.add()
+                rabbitmq_vhost.set_tracing()
+                changed_vhosts.append(vhost_name)
+    except Exception, e:
+        # errors of the management API
+        module.fail_json(msg=str(e))
 
+    changed = len(changed_vhosts) > 0
+    if module.params['vhosts'] is not None:
+        module.exit_json(changed=changed, vhosts=changed_vhosts, state=state)
     module.exit_json(changed=changed, name=name, state=state)
 
 # import module snippets
@@ -35,7 +35,10 @@ notes: []
 requirements: []
 options:
     api_key:
-        description: ["Your DataDog API key."]
+        description:
+        - Your DataDog API key.
+        - Since version 2.1 a list of API keys may be given to post the event to several
+          accounts concurrently; the outcome and latency for each is returned in C(results).
         required: true
         default: null
     title:
@@ -78,6 +81,11 @@ options:
         default: 'yes'
         choices: ['yes', 'no']
         version_added: 1.5.1
+    concurrency:
+        description: ["The maximum number of accounts from I(api_key) posted to at the same time."]
+        required: false
+        default: 4
+        version_added: "2.1"
 '''
 
 EXAMPLES = '''
@@ -88,14 +96,19 @@ datadog_event: title="Testing from ansible" text="Test!" priority="low"
 datadog_event: title="Testing from ansible" text="Test!"
                api_key="6873258723457823548234234234"
                tags=aa,bb,#host:{{ inventory_hostname }}
+# Post an event to a production and a staging account
+datadog_event: title="Deploy finished" text="Deployed {{ version }}"
+               api_key={{ dd_prod_api_key }},{{ dd_staging_api_key }}
 '''
 
 import socket
+import time
+from multiprocessing.pool import ThreadPool
 
 def main():
     module = AnsibleModule(
         argument_spec=dict(
-            api_key=dict(required=True),
+            api_key=dict(required=True, type='list'),
             title=dict(required=True),
             text=dict(required=True),
             date_happened=dict(required=False, default=None, type='int'),
@@ -115,14 +128,15 @@ def main():
                          'capistrano']
             ),
             validate_certs = dict(default='yes', type='bool'),
+            concurrency=dict(required=False, default=4, type='int'),
         )
     )
 
+    if len(module.params['api_key']) > 1:
+        post_events(module)
     post_event(module)
 
-def post_event(module):
-    uri = "https://app.datadoghq.com/api/v1/events?api_key=%s" % module.params['api_key']
-
+def build_event(module):
     body = dict(
         title=module.params['title'],
         text=module.params['text'],
@@ -138,7 +152,12 @@ def post_event(module):
     if module.params['source_type_name'] != None:
         body['source_type_name'] = module.params['source_type_name']
 
-    json_body = module.jsonify(body)
+    return module.jsonify(body)
+
+def post_event(module):
+    uri = "https://app.datadoghq.com/api/v1/events?api_key=%s" % module.params['api_key'][0]
+
+    json_body = build_event(module)
     headers = {"Content-Type": "application/json"}
 
     (response, info) = fetch_url(module, uri, data=json_body, headers=headers)
@@ -152,6 +171,37 @@ def post_event(module):
     else:
         module.fail_json(**info)
 
+def post_events(module):
+    json_body = build_event(module)
+    headers = {"Content-Type": "application/json"}
+
+    def post(api_key):
+        uri = "https://app.datadoghq.com/api/v1/events?api_key=%s" % api_key
+        start = time.time()
+        (response, info) = fetch_url(module, uri, data=json_body, headers=headers)
+        # only the end of the key is reported back
+        result = dict(recipient='*' * 8 + api_key[-4:])
+        if info['status'] == 200:
+            response_json = module.from_json(response.read())
+            result['delivered'] = response_json['status'] == 'ok'
+            if not result['delivered']:
+                result['error'] = response_json
+        else:
+            result['delivered'] = False
+            result['error'] = info['msg']
+        result['latency'] = round(time.time() - start, 3)
+        return result
+
+    api_keys = module.params['api_key']
+    pool = ThreadPool(max(1, min(module.params['concurrency'], len(api_keys))))
+    results = pool.map(post, api_keys)
+    pool.close()
+
+    failed = [r['recipient'] for r in results if not r['delivered']]
+    if failed:
+        module.fail_json(msg="failed to post event for %s" % ', '.join(failed), results=results)
+    module.exit_json(changed=True, results=results)
+
 # import module snippets
 from ansible.module_utils.basic import *
 from ansible.module_utils.urls import *
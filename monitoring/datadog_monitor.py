@@ -58,8 +58,8 @@ options:
         required: false
         default: null
     name:
-        description: ["The name of the alert."]
-        required: true
+        description: ["The name of the alert. Required unless I(monitors) is given."]
+        required: false
     message:
         description: ["A message to include with notifications for this monitor. Email notifications can be sent to specific users by using the same '@username' notation as events."]
         required: false
@@ -96,6 +96,19 @@ options:
         description: ["A dictionary of thresholds by status. Because service checks can have multiple thresholds, we don't define them directly in the query."]
         required: false
         default: {'ok': 1, 'critical': 1, 'warning': 1}
+    monitors:
+        description:
+            - "List of monitors to reconcile in one run. Each is a dict with C(name) and any of C(type), C(query), C(message), C(state) (C(present) or C(absent)) and the monitor options above, which default to the module options of the same name."
+            - "All monitors are fetched once, page by page, and indexed by name; only the monitors that differ are created, updated or deleted."
+            - "Requests go straight to the Datadog REST API and wait out the rate limit announced in the C(X-RateLimit-*) response headers."
+        required: false
+        default: null
+        version_added: "2.1"
+    concurrency:
+        description: ["Maximum number of monitors from I(monitors) that are created, updated or deleted at the same time."]
+        required: false
+        default: 4
+        version_added: "2.1"
 '''
 
 EXAMPLES = '''
@@ -130,8 +143,35 @@ datadog_monitor:
   state: "unmute"
   api_key: "9775a026f1ca7d1c6c5af9d94d9595a4"
   app_key: "87ce4a24b5553d2e482ea8a8500e71b8ad4554ff"
+
+# Syncs a list of monitors
+datadog_monitor:
+  state: "present"
+  notify_no_data: yes
+  monitors:
+    - name: "Agent up"
+      type: "service check"
+      query: "\"datadog.agent.up\".over(\"*\").last(2).count_by_status()"
+      message: "Agent down @ops"
+    - name: "High load"
+      type: "metric alert"
+      query: "avg(last_5m):avg:system.load.1{*} > 4"
+      message: "Load is high @ops"
+    - name: "Old monitor"
+      state: "absent"
+  api_key: "9775a026f1ca7d1c6c5af9d94d9595a4"
+  app_key: "87ce4a24b5553d2e482ea8a8500e71b8ad4554ff"
 '''
 
+import time
+import urllib
+from multiprocessing.pool import ThreadPool
+from threading import Lock
+
+DATADOG_API_URL = 'https://api.datadoghq.com/api/v1'
+MONITOR_OPTIONS = ['silenced', 'notify_no_data', 'no_data_timeframe', 'timeout_h',
+                   'renotify_interval', 'escalation_message', 'notify_audit', 'thresholds']
+
 
 def main():
     module = AnsibleModule(
@@ -140,7 +180,7 @@ def main():
             app_key=dict(required=True),
             state=dict(required=True, choises=['present', 'absent', 'mute', 'unmute']),
             type=dict(required=False, choises=['metric alert', 'service check']),
-            name=dict(required=True),
+            name=dict(required=False),
             query=dict(required=False),
             message=dict(required=False, default=None),
             silenced=dict(required=False, default=None, type='dict'),
@@ -151,9 +191,16 @@ def main():
             escalation_message=dict(required=False, default=None),
             notify_audit=dict(required=False, default=False, choices=BOOLEANS),
             thresholds=dict(required=False, type='dict', default={'ok': 1, 'critical': 1, 'warning': 1}),
-        )
+            monitors=dict(required=False, default=None, type='list'),
+            concurrency=dict(required=False, default=4, type='int'),
+        ),
+        required_one_of=[['name', 'monitors']],
+        mutually_exclusive=[['name', 'monitors']]
     )
 
+    if module.params['monitors'] is not None:
+        sync_monitors(module)
+
     # Prepare Datadog
     if not HAS_DATADOG:
         module.fail_json(msg='datadogpy required for this module')
@@ -214,19 +261,24 @@ def _update_monitor(module, monitor, options):
         module.fail_json(msg=str(e))
 
 
-def install_monitor(module):
+def _monitor_options(module, params):
     options = {
-        "silenced": module.params['silenced'],
-        "notify_no_data": module.boolean(module.params['notify_no_data']),
-        "no_data_timeframe": module.params['no_data_timeframe'],
-        "timeout_h": module.params['timeout_h'],
-        "renotify_interval": module.params['renotify_interval'],
-        "escalation_message": module.params['escalation_message'],
-        "notify_audit": module.boolean(module.params['notify_audit']),
+        "silenced": params['silenced'],
+        "notify_no_data": module.boolean(params['notify_no_data']),
+        "no_data_timeframe": params['no_data_timeframe'],
+        "timeout_h": params['timeout_h'],
+        "renotify_interval": params['renotify_interval'],
+        "escalation_message": params['escalation_message'],
+        "notify_audit": module.boolean(params['notify_audit']),
     }
 
-    if module.params['type'] == "service check":
-        options["thresholds"] = module.params['thresholds']
+    if params['type'] == "service check":
+        options["thresholds"] = params['thresholds']
+    return options
+
+
+def install_monitor(module):
+    options = _monitor_options(module, module.params)
 
     monitor = _get_monitor(module)
     if not monitor:
@@ -278,6 +330,163 @@ def unmute_monitor(module):
         module.fail_json(msg=str(e))
 
 
+class DatadogApi(object):
+    """Datadog REST client for batched runs, shared by all worker threads.
+
+    When a response says the rate limit is used up, every thread waits
+    until the period announced in X-RateLimit-Reset is over."""
+
+    def __init__(self, module, api_key, app_key, retries=5):
+        self.module = module
+        self.keys = {'api_key': api_key, 'application_key': app_key}
+        self.retries = retries
+        self.lock = Lock()
+        self.resume_at = 0
+
+    def _wait(self):
+        self.lock.acquire()
+        try:
+            delay = self.resume_at - time.time()
+        finally:
+            self.lock.release()
+        if delay > 0:
+            time.sleep(delay)
+
+    def _pause(self, info):
+        try:
+            reset = float(info.get('x-ratelimit-reset', 1))
+        except ValueError:
+            reset = 1
+        self.lock.acquire()
+        try:
+            self.resume_at = max(self.resume_at, time.time() + reset)
+        finally:
+            self.lock.release()
+
+    def request(self, method, path, params=None, data=None):
+        query = dict(self.keys)
+        query.update(params or {})
+        url = '%s/%s?%s' % (DATADOG_API_URL, path, urllib.urlencode(query))
+        if data is not None:
+            data = json.dumps(data)
+
+        for attempt in range(self.retries):
+            self._wait()
+            response, info = fetch_url(self.module, url, data=data, method=method,
+                                       headers={'Content-Type': 'application/json'})
+            if info['status'] == 429:
+                self._pause(info)
+                continue
+            if info.get('x-ratelimit-remaining') == '0':
+                self._pause(info)
+            if info['status'] >= 400 or response is None:
+                try:
+                    errors = json.loads(info['body'])['errors']
+                except Exception:
+                    errors = info['msg']
+                raise Exception('%s %s failed: %s' % (method, path, errors))
+            body = response.read()
+            if not body:
+                return {}
+            return json.loads(body)
+        raise Exception('%s %s failed: rate limit still exceeded after %d attempts' % (method, path, self.retries))
+
+    def get_monitors(self, page_size=1000):
+        """All monitors, page by page"""
+        monitors = []
+        seen = set()
+        page = 0
+        while True:
+            batch = self.request('GET', 'monitor', {'page': page, 'page_size': page_size})
+            new = [m for m in batch if m['id'] not in seen]
+            monitors.extend(new)
+            seen.update(m['id'] for m in new)
+            # endpoints without paging return everything on each page
+            if len(batch) < page_size or not new:
+                return monitors
+            page += 1
+
+
+def _monitor_params(module, item):
+    if not isinstance(item, dict) or not item.get('name'):
+        module.fail_json(msg="each entry of monitors needs a name")
+    unknown = set(item).difference(['name', 'type', 'query', 'message', 'state'] + MONITOR_OPTIONS)
+    if unknown:
+        module.fail_json(msg="unsupported keys for monitor %s: %s" % (item['name'], ', '.join(sorted(unknown))))
+    params = dict(module.params)
+    params.update(item)
+    if params['state'] not in ['present', 'absent']:
+        module.fail_json(msg="Monitor %s: only states present and absent are supported in monitors" % item['name'])
+    return params
+
+
+def _monitor_changed(monitor, params, options):
+    wanted = {'query': params['query'], 'message': params['message']}
+    current = dict((k, monitor.get(k)) for k in wanted)
+    if not _equal_dicts(current, wanted, []):
+        return True
+    # the API fills in defaults, so unset and empty values are the same
+    current = dict((k, monitor['options'].get(k) or None) for k in options)
+    wanted = dict((k, v or None) for k, v in options.items())
+    return not _equal_dicts(current, wanted, [])
+
+
+def sync_monitors(module):
+    dd = DatadogApi(module, module.params['api_key'], module.params['app_key'])
+
+    wanted = [_monitor_params(module, item) for item in module.params['monitors']]
+    try:
+        index = dict((m['name'], m) for m in reversed(dd.get_monitors()))
+    except Exception, e:
+        module.fail_json(msg=str(e))
+
+    # work out the changed subset against the one listing
+    jobs = []
+    for params in wanted:
+        monitor = index.get(params['name'])
+        if params['state'] == 'absent':
+            if monitor:
+                jobs.append(('deleted', params['name'], 'DELETE', 'monitor/%s' % monitor['id'], None))
+            continue
+        options = _monitor_options(module, params)
+        if not monitor:
+            if not params['type'] or not params['query']:
+                module.fail_json(msg="Monitor %s does not exist, type and query are required to create it" % params['name'])
+            data = {'type': params['type'], 'query': params['query'], 'name': params['name'],
+                    'message': params['message'], 'options': options}
+            jobs.append(('created', params['name'], 'POST', 'monitor', data))
+        elif _monitor_changed(monitor, params, options):
+            data = {'query': params['query'], 'name': params['name'],
+                    'message': params['message'], 'options': options}
+            jobs.append(('updated', params['name'], 'PUT', 'monitor/%s' % monitor['id'], data))
+
+    result = {'created': [], 'updated': [], 'deleted': []}
+    for action, name, method, path, data in jobs:
+        result[action].append(name)
+
+    if not jobs:
+        module.exit_json(changed=False, **result)
+
+    def apply(job):
+        action, name, method, path, data = job
+        try:
+            dd.request(method, path, data=data)
+            return name, None
+        except Exception, e:
+            return name, str(e)
+
+    pool = ThreadPool(max(1, min(module.params['concurrency'], len(jobs))))
+    try:
+        errors = dict((name, err) for name, err in pool.map(apply, jobs) if err)
+    finally:
+        pool.close()
+        pool.join()
+
+    if errors:
+        module.fail_json(msg="failed to sync monitors: %s" % ', '.join(sorted(errors)), errors=errors, **result)
+    module.exit_json(changed=True, **result)
+
+
 from ansible.module_utils.basic import *
 from ansible.module_utils.urls import *
 main()
@@ -62,59 +62,80 @@ def query_log_status(module, le_path, path, state="present"):
 
         return False
 
+def followed_logs(module, le_path, logs):
+    """ Returns the set of logs among logs that are followed.
+
+    The agent lists the logs of this host, with their filenames, in one call;
+    when that listing is not available each log is queried on its own. """
+
+    rc, out, err = module.run_command([le_path, 'whoami'])
+    if rc == 0:
+        followed = set()
+        for line in out.splitlines():
+            fields = line.split('=', 1)
+            if len(fields) == 2 and fields[0].strip() in ('filename', 'path'):
+                followed.add(fields[1].strip())
+        # an agent that lists no filenames at all cannot be told apart from
+        # one that prints them differently, so only trust a non-empty listing
+        if followed:
+            return followed.intersection(logs)
+
+    return set(log for log in logs if query_log_status(module, le_path, log))
+
 def follow_log(module, le_path, logs, name=None, logtype=None):
     """ Follows one or more logs if not already followed. """
 
-    followed_count = 0
+    followed = followed_logs(module, le_path, logs)
+    to_follow = [log for log in logs if log not in followed]
 
-    for log in logs:
-        if query_log_status(module, le_path, log):
-            continue
+    if not to_follow:
+        module.exit_json(changed=False, msg="logs(s) already followed")
 
-        if module.check_mode:
-            module.exit_json(changed=True)
+    if module.check_mode:
+        module.exit_json(changed=True)
 
+    errors = {}
+    for log in to_follow:
         cmd = [le_path, 'follow', log]
         if name:
             cmd.extend(['--name',name])
         if logtype:
             cmd.extend(['--type',logtype])
-        rc, out, err = module.run_command(' '.join(cmd))
-
-        if not query_log_status(module, le_path, log):
-            module.fail_json(msg="failed to follow '%s': %s" % (log, err.strip()))
-
-        followed_count += 1
+        rc, out, err = module.run_command(cmd)
+        errors[log] = err.strip()
 
-    if followed_count > 0:
-        module.exit_json(changed=True, msg="followed %d log(s)" % (followed_count,))
+    followed = followed_logs(module, le_path, to_follow)
+    for log in to_follow:
+        if log not in followed:
+            module.fail_json(msg="failed to follow '%s': %s" % (log, errors[log]))
 
-    module.exit_json(changed=False, msg="logs(s) already followed")
+    module.exit_json(changed=True, msg="followed %d log(s)" % (len(to_follow),))
 
 def unfollow_log(module, le_path, logs):
     """ Unfollows one or more logs if followed. """
 
-    removed_count = 0
+    # Query the logs first, to see if we even need to remove.
+    followed = followed_logs(module, le_path, logs)
+    to_remove = [log for log in logs if log in followed]
 
-    # Using a for loop incase of error, we can report the package that failed
-    for log in logs:
-        # Query the log first, to see if we even need to remove.
-        if not query_log_status(module, le_path, log):
-            continue
+    if not to_remove:
+        module.exit_json(changed=False, msg="logs(s) already unfollowed")
 
-        if module.check_mode:
-            module.exit_json(changed=True)
-        rc, out, err = module.run_command([le_path, 'rm', log])
-
-        if query_log_status(module, le_path, log):
-            module.fail_json(msg="failed to remove '%s': %s" % (log, err.strip()))
+    if module.check_mode:
+        module.exit_json(changed=True)
 
-        removed_count += 1
+    errors = {}
+    for log in to_remove:
+        rc, out, err = module.run_command([le_path, 'rm', log])
+        errors[log] = err.strip()
 
-    if removed_count > 0:
-        module.exit_json(changed=True, msg="removed %d package(s)" % removed_count)
+    # Using one refreshed listing we can still report the log that failed
+    followed = followed_logs(module, le_path, to_remove)
+    for log in to_remove:
+        if log in followed:
+            module.fail_json(msg="failed to remove '%s': %s" % (log, errors[log]))
 
-    module.exit_json(changed=False, msg="logs(s) already unfollowed")
+    module.exit_json(changed=True, msg="removed %d package(s)" % len(to_remove))
 
 def main():
     module = AnsibleModule(
@@ -134,6 +155,8 @@ def main():
     # Handle multiple log files
     logs = p["path"].split(",")
     logs = filter(None, logs)
+    # a log listed twice is still followed once
+    logs = [log for i, log in enumerate(logs) if log not in logs[:i]]
 
     if p["state"] in ["present", "followed"]:
         follow_log(module, le_path, logs, name=p['name'], logtype=p['logtype'])
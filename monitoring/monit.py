@@ -30,6 +30,8 @@ options:
   name:
     description:
       - The name of the I(monit) program/process to manage
+      - Since version 2.1 a list of names may be given; their statuses are read
+        in one pass and all of them are brought to I(state) together.
     required: true
     default: null
   state:
@@ -38,6 +40,33 @@ options:
     required: true
     default: null
     choices: [ "present", "started", "stopped", "restarted", "monitored", "unmonitored", "reloaded" ]
+  timeout:
+    description:
+      - Seconds to wait for all programs to leave their pending states and
+        reach I(state). With 0 a pending action is accepted as success.
+    required: false
+    default: 0
+    version_added: "2.1"
+  http_url:
+    description:
+      - Base URL of the I(monit) HTTP interface, for example C(http://localhost:2812).
+        When set, statuses are read from C(/_status?format=xml) instead of
+        running C(monit summary). Requires python 2.5 or later on the managed host.
+    required: false
+    default: null
+    version_added: "2.1"
+  url_username:
+    description:
+      - The username for the I(monit) HTTP interface.
+    required: false
+    default: null
+    version_added: "2.1"
+  url_password:
+    description:
+      - The password for the I(monit) HTTP interface.
+    required: false
+    default: null
+    version_added: "2.1"
 requirements: [ ]
 author: "Darryl Stoflet (@dstoflet)" 
 '''
@@ -45,18 +74,110 @@ author: "Darryl Stoflet (@dstoflet)"
 EXAMPLES = '''
 # Manage the state of program "httpd" to be in "started" state.
 - monit: name=httpd state=started
+
+# Restart a set of programs and wait until all of them are running again
+- monit: name=nginx,php-fpm,memcached state=restarted timeout=60
 '''
 
+import time
+
+try:
+    import xml.etree.ElementTree as ET
+    HAS_ETREE = True
+except ImportError:
+    HAS_ETREE = False
+
+# monit's numeric action codes, as reported in pendingaction
+MONIT_ACTIONS = {
+    '1': 'alert',
+    '2': 'restart',
+    '3': 'stop',
+    '4': 'exec',
+    '5': 'unmonitor',
+    '6': 'start',
+    '7': 'monitor',
+}
+
+
+def parse_summary(out):
+    """Map every process of monit summary output to its lower-cased status."""
+    statuses = {}
+    for line in out.split('\n'):
+        # Sample output lines:
+        # Process 'name'    Running
+        # Process 'name'    Running - restart pending
+        parts = line.split()
+        if len(parts) > 2 and parts[0].lower() == 'process' and \
+           parts[1].startswith("'") and parts[1].endswith("'"):
+            statuses[parts[1][1:-1]] = ' '.join(parts[2:]).lower()
+    return statuses
+
+
+def parse_status_xml(data):
+    """Map every process of monit's XML status to a status in the words of monit summary."""
+    statuses = {}
+    for service in ET.fromstring(data).findall('service'):
+        # type 3 is a process
+        if service.get('type', service.findtext('type')) != '3':
+            continue
+        monitor = service.findtext('monitor', '0')
+        if monitor == '0':
+            status = 'not monitored'
+        elif monitor == '2':
+            status = 'initializing'
+        elif service.findtext('status', '0') != '0':
+            status = 'execution failed'
+        else:
+            status = 'running'
+        action = MONIT_ACTIONS.get(service.findtext('pendingaction', '0'))
+        if action:
+            status += ' - %s pending' % action
+        statuses[service.get('name', service.findtext('name'))] = status
+    return statuses
+
+
+def succeeded(state, status, final=False):
+    """Whether status satisfies state; with final, pending actions do not count."""
+    if final and ('pending' in status or status == 'initializing'):
+        return False
+    if state == 'present':
+        return status != ''
+    if state in ['stopped', 'unmonitored']:
+        command = state == 'stopped' and 'stop' or 'unmonitor'
+        return status in ['not monitored'] or '%s pending' % command in status
+    if state in ['started', 'restarted']:
+        command = state == 'started' and 'start' or 'restart'
+        return status in ['initializing', 'running'] or '%s pending' % command in status
+    if state == 'monitored':
+        return status not in ['not monitored']
+    return True
+
+
 def main():
     arg_spec = dict(
-        name=dict(required=True),
-        state=dict(required=True, choices=['present', 'started', 'restarted', 'stopped', 'monitored', 'unmonitored', 'reloaded'])
+        name=dict(required=True, type='list'),
+        state=dict(required=True, choices=['present', 'started', 'restarted', 'stopped', 'monitored', 'unmonitored', 'reloaded']),
+        timeout=dict(default=0, type='int'),
+        http_url=dict(default=None),
+        url_username=dict(default=None),
+        url_password=dict(default=None, no_log=True),
     )
 
     module = AnsibleModule(argument_spec=arg_spec, supports_check_mode=True)
 
-    name = module.params['name']
+    names = module.params['name']
     state = module.params['state']
+    timeout = module.params['timeout']
+    http_url = module.params['http_url']
+
+    if http_url and not HAS_ETREE:
+        module.fail_json(msg='http_url requires xml.etree.ElementTree, which is part of python 2.5 and later')
+
+    # report a single name the way it was given
+    if len(names) == 1:
+        name = names[0]
+    else:
+        name = names
 
     MONIT = module.get_bin_path('monit', True)
 
@@ -67,90 +188,79 @@ def main():
         if rc != 0:
             module.fail_json(msg='monit reload failed', stdout=out, stderr=err)
         module.exit_json(changed=True, name=name, state=state)
-    
-    def status():
-        """Return the status of the process in monit, or the empty string if not present."""
-        rc, out, err = module.run_command('%s summary' % MONIT, check_rc=True)
-        for line in out.split('\n'):
-            # Sample output lines:
-            # Process 'name'    Running
-            # Process 'name'    Running - restart pending
-            parts = line.split()
-            if len(parts) > 2 and parts[0].lower() == 'process' and parts[1] == "'%s'" % name:
-                return ' '.join(parts[2:]).lower()
-        else:
-            return ''
 
-    def run_command(command):
-        """Runs a monit command, and returns the new status."""
-        module.run_command('%s %s %s' % (MONIT, command, name), check_rc=True)
-        return status()
-
-    process_status = status()
-    present = process_status != ''
+    def statuses():
+        """Return the status of every process in monit, in one pass."""
+        if http_url:
+            response, info = fetch_url(module, '%s/_status?format=xml' % http_url.rstrip('/'))
+            if info['status'] != 200:
+                module.fail_json(msg='unable to read monit status from %s: %s' % (http_url, info['msg']))
+            return parse_status_xml(response.read())
+        rc, out, err = module.run_command('%s summary' % MONIT, check_rc=True)
+        return parse_summary(out)
 
-    if not present and not state == 'present':
-        module.fail_json(msg='%s process not presently configured with monit' % name, name=name, state=state)
+    process_statuses = statuses()
 
-    if state == 'present':
-        if not present:
-            if module.check_mode:
-                module.exit_json(changed=True)
-            status = run_command('reload')
-            if status == '':
-                module.fail_json(msg='%s process not configured with monit' % name, name=name, state=state)
-            else:
-                module.exit_json(changed=True, name=name, state=state)
-        module.exit_json(changed=False, name=name, state=state)
+    missing = [n for n in names if n not in process_statuses]
+    if missing and not state == 'present':
+        module.fail_json(msg='%s process not presently configured with monit' % ', '.join(missing), name=name, state=state)
 
-    running = 'running' in process_status 
+    # work out the command each process needs
+    commands = {}
+    for n in names:
+        running = 'running' in process_statuses.get(n, '')
+        if state == 'present':
+            if n in missing:
+                commands[n] = 'reload'
+        elif state == 'restarted':
+            commands[n] = 'restart'
+        elif running and state == 'stopped':
+            commands[n] = 'stop'
+        elif running and state == 'unmonitored':
+            commands[n] = 'unmonitor'
+        elif not running and state == 'started':
+            commands[n] = 'start'
+        elif not running and state == 'monitored':
+            commands[n] = 'monitor'
 
-    if running and state in ['started', 'monitored']:
+    if not commands:
         module.exit_json(changed=False, name=name, state=state)
+    if module.check_mode:
+        module.exit_json(changed=True)
 
-    if running and state == 'stopped':
-        if module.check_mode:
-            module.exit_json(changed=True)
-        status = run_command('stop')
-        if status in ['not monitored'] or 'stop pending' in status:
-            module.exit_json(changed=True, name=name, state=state)
-        module.fail_json(msg='%s process not stopped' % name, status=status)
-
-    if running and state == 'unmonitored':
-        if module.check_mode:
-            module.exit_json(changed=True)
-        status = run_command('unmonitor')
-        if status in ['not monitored'] or 'unmonitor pending' in status:
-            module.exit_json(changed=True, name=name, state=state)
-        module.fail_json(msg='%s process not unmonitored' % name, status=status)
-
-    elif state == 'restarted':
-        if module.check_mode:
-            module.exit_json(changed=True)
-        status = run_command('restart')
-        if status in ['initializing', 'running'] or 'restart pending' in status:
-            module.exit_json(changed=True, name=name, state=state)
-        module.fail_json(msg='%s process not restarted' % name, status=status)
+    if state == 'present':
+        # a reload picks up every new process at once
+        module.run_command('%s reload' % MONIT, check_rc=True)
+    else:
+        for n in names:
+            if n in commands:
+                module.run_command('%s %s %s' % (MONIT, commands[n], n), check_rc=True)
 
-    elif not running and state == 'started':
-        if module.check_mode:
-            module.exit_json(changed=True)
-        status = run_command('start')
-        if status in ['initializing', 'running'] or 'start pending' in status:
-            module.exit_json(changed=True, name=name, state=state)
-        module.fail_json(msg='%s process not started' % name, status=status)
+    # wait for all processes in one shared loop; pending actions only
+    # count as success when there is no timeout to wait for them
+    final = timeout > 0
+    deadline = time.time() + timeout
+    while True:
+        process_statuses = statuses()
+        failed = [n for n in commands if not succeeded(state, process_statuses.get(n, ''), final)]
+        if not failed or time.time() >= deadline:
+            break
+        time.sleep(1)
 
-    elif not running and state == 'monitored':
-        if module.check_mode:
-            module.exit_json(changed=True)
-        status = run_command('monitor')
-        if status not in ['not monitored']:
-            module.exit_json(changed=True, name=name, state=state)
-        module.fail_json(msg='%s process not monitored' % name, status=status)
+    if failed:
+        status = dict((n, process_statuses.get(n, '')) for n in failed)
+        if len(names) == 1:
+            status = status[names[0]]
+        if state == 'present':
+            module.fail_json(msg='%s process not configured with monit' % ', '.join(failed), name=name, state=state)
+        command = commands[failed[0]]
+        module.fail_json(msg='%s process not %s' % (', '.join(failed), {'stop': 'stopped', 'unmonitor': 'unmonitored',
+                         'restart': 'restarted', 'start': 'started', 'monitor': 'monitored'}[command]), status=status)
 
-    module.exit_json(changed=False, name=name, state=state)
+    module.exit_json(changed=True, name=name, state=state)
 
 # import module snippets
 from ansible.module_utils.basic import *
+from ansible.module_utils.urls import *
 
 main()
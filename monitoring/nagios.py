@@ -22,6 +22,7 @@ short_description: Perform common tasks in Nagios related to downtime and notifi
 description:
   - "The M(nagios) module has two basic functions: scheduling downtime and toggling alerts for services or hosts."
   - All actions require the I(host) parameter to be given explicitly. In playbooks you can use the C({{inventory_hostname}}) variable to refer to the host the playbook is currently running on.
+  - Several hosts and actions may be given at once as lists. All resulting external commands are built in memory and submitted to Nagios in a single write.
   - You can specify multiple services at once by separating them with commas, .e.g., C(services=httpd,nfs,puppet).
   - When specifying what service to handle there is a special service value, I(host), which will handle alerts/downtime for the I(host itself), e.g., C(service=host). This keyword may not be given with other services at the same time. I(Setting alerts/downtime for a host does not affect alerts/downtime for any of the services running on it.) To schedule downtime for all services on particular host use keyword "all", e.g., C(service=all).
   - When using the M(nagios) module you will need to specify your Nagios server using the C(delegate_to) parameter.
@@ -31,6 +32,7 @@ options:
     description:
       - Action to take.
       - servicegroup options were added in 2.0.
+      - Since 2.1 a list (or comma separated string) of actions may be given; they are applied in order.
     required: true
     default: null
     choices: [ "downtime", "enable_alerts", "disable_alerts", "silence", "unsilence",
@@ -39,6 +41,7 @@ options:
   host:
     description:
       - Host to operate on in Nagios.
+      - Since 2.1 a list (or comma separated string) of hosts may be given.
     required: false
     default: null
   cmdfile:
@@ -47,6 +50,13 @@ options:
         Only required if auto-detection fails.
     required: false
     default: auto-detected
+  livestatus:
+    version_added: "2.1"
+    description:
+      - Path to a MK Livestatus unix socket. When given, commands are
+        submitted over the socket instead of the I(command file).
+    required: false
+    default: null
   author:
     description:
      - Author to leave downtime comments as.
@@ -104,6 +114,16 @@ EXAMPLES = '''
 # schedule downtime for ALL services on HOST
 - nagios: action=downtime minutes=45 service=all host={{ inventory_hostname }}
 
+# schedule downtime for a list of hosts in one submission
+- nagios: action=downtime minutes=30 service=host host={{ groups['webservers'] | join(',') }}
+
+# silence hosts and put them into downtime, sending the commands over livestatus
+- nagios:
+    action: [ "silence", "downtime" ]
+    service: all
+    host: "{{ groups['webservers'] }}"
+    livestatus: /var/lib/nagios/rw/live
+
 # schedule downtime for a few services
 - nagios: action=downtime services=frob,foobar,qeuz host={{ inventory_hostname }}
 
@@ -141,7 +161,24 @@ EXAMPLES = '''
 import ConfigParser
 import types
 import time
+import os
 import os.path
+import select
+import socket
+
+# Writes of at most PIPE_BUF bytes to a FIFO are atomic, so commands are
+# submitted in chunks no larger than this to keep them from interleaving
+# with those of other writers.
+PIPE_BUF = getattr(select, 'PIPE_BUF', 512)
+
+# Actions which are not bound to the I(host) parameter and run only once
+GLOBAL_ACTIONS = [
+    'command',
+    'silence_nagios',
+    'unsilence_nagios',
+    'servicegroup_host_downtime',
+    'servicegroup_service_downtime',
+    ]
 
 ######################################################################
 
@@ -199,26 +236,33 @@ def main():
 
     module = AnsibleModule(
         argument_spec=dict(
-            action=dict(required=True, default=None, choices=ACTION_CHOICES),
+            action=dict(required=True, default=None, type='list'),
             author=dict(default='Ansible'),
             comment=dict(default='Scheduling downtime'),
-            host=dict(required=False, default=None),
+            host=dict(required=False, default=None, type='list'),
             servicegroup=dict(required=False, default=None),
             minutes=dict(default=30),
             cmdfile=dict(default=which_cmdfile()),
+            livestatus=dict(required=False, default=None),
             services=dict(default=None, aliases=['service']),
             command=dict(required=False, default=None),
             )
         )
 
-    action = module.params['action']
+    actions = module.params['action']
     host = module.params['host']
     servicegroup = module.params['servicegroup']
     minutes = module.params['minutes']
     services = module.params['services']
     cmdfile = module.params['cmdfile']
+    livestatus = module.params['livestatus']
     command = module.params['command']
 
+    for action in actions:
+        if action not in ACTION_CHOICES:
+            module.fail_json(msg="value of action must be one of: %s, got: %s" % \
+                                 (", ".join(ACTION_CHOICES), action))
+
     ##################################################################
     # Required args per action:
     # downtime = (minutes, service, host)
@@ -229,48 +273,49 @@ def main():
     # AnsibleModule will verify most stuff, we need to verify
     # 'minutes' and 'service' manually.
 
+    for action in actions:
+        ##################################################################
+        if action not in ['command', 'silence_nagios', 'unsilence_nagios']:
+            if not host:
+                module.fail_json(msg='no host specified for action requiring one')
+        ######################################################################
+        if action == 'downtime':
+            # Make sure there's an actual service selected
+            if not services:
+                module.fail_json(msg='no service selected to set downtime for')
+            # Make sure minutes is a number
+            try:
+                m = int(minutes)
+                if not isinstance(m, types.IntType):
+                    module.fail_json(msg='minutes must be a number')
+            except Exception:
+                module.fail_json(msg='invalid entry for minutes')
+
+        ######################################################################
+
+        if action in ['servicegroup_service_downtime', 'servicegroup_host_downtime']:
+            # Make sure there's an actual servicegroup selected
+            if not servicegroup:
+                module.fail_json(msg='no servicegroup selected to set downtime for')
+            # Make sure minutes is a number
+            try:
+                m = int(minutes)
+                if not isinstance(m, types.IntType):
+                    module.fail_json(msg='minutes must be a number')
+            except Exception:
+                module.fail_json(msg='invalid entry for minutes')
+
+        ##################################################################
+        if action in ['enable_alerts', 'disable_alerts']:
+            if not services:
+                module.fail_json(msg='a service is required when setting alerts')
+
+        if action in ['command']:
+            if not command:
+                module.fail_json(msg='no command passed for command action')
     ##################################################################
-    if action not in ['command', 'silence_nagios', 'unsilence_nagios']:
-        if not host:
-            module.fail_json(msg='no host specified for action requiring one')
-    ######################################################################
-    if action == 'downtime':
-        # Make sure there's an actual service selected
-        if not services:
-            module.fail_json(msg='no service selected to set downtime for')
-        # Make sure minutes is a number
-        try:
-            m = int(minutes)
-            if not isinstance(m, types.IntType):
-                module.fail_json(msg='minutes must be a number')
-        except Exception:
-            module.fail_json(msg='invalid entry for minutes')
-
-    ######################################################################
-
-    if action in ['servicegroup_service_downtime', 'servicegroup_host_downtime']:
-        # Make sure there's an actual servicegroup selected
-        if not servicegroup:
-            module.fail_json(msg='no servicegroup selected to set downtime for')
-        # Make sure minutes is a number
-        try:
-            m = int(minutes)
-            if not isinstance(m, types.IntType):
-                module.fail_json(msg='minutes must be a number')
-        except Exception:
-            module.fail_json(msg='invalid entry for minutes')
-
-    ##################################################################
-    if action in ['enable_alerts', 'disable_alerts']:
-        if not services:
-            module.fail_json(msg='a service is required when setting alerts')
-
-    if action in ['command']:
-        if not command:
-            module.fail_json(msg='no command passed for command action')
-    ##################################################################
-    if not cmdfile:
-        module.fail_json('unable to locate nagios.cfg')
+    if not cmdfile and not livestatus:
+        module.fail_json(msg='unable to locate nagios.cfg')
 
     ##################################################################
     ansible_nagios = Nagios(module, **module.params)
@@ -299,21 +344,26 @@ class Nagios(object):
 
     def __init__(self, module, **kwargs):
         self.module = module
-        self.action = kwargs['action']
+        self.actions = kwargs['action']
         self.author = kwargs['author']
         self.comment = kwargs['comment']
-        self.host = kwargs['host']
+        self.hosts = kwargs['host'] or []
         self.servicegroup = kwargs['servicegroup']
         self.minutes = int(kwargs['minutes'])
         self.cmdfile = kwargs['cmdfile']
+        self.livestatus = kwargs['livestatus']
         self.command = kwargs['command']
 
-        if (kwargs['services'] is None) or (kwargs['services'] == 'host') or (kwargs['services'] == 'all'):
-            self.services = kwargs['services']
+        services = kwargs['services']
+        if isinstance(services, list):
+            services = ','.join(services)
+        if (services is None) or (services == 'host') or (services == 'all'):
+            self.services = services
         else:
-            self.services = kwargs['services'].split(',')
+            self.services = services.split(',')
 
         self.command_results = []
+        self.command_queue = []
 
     def _now(self):
         """
@@ -324,16 +374,62 @@ class Nagios(object):
 
     def _write_command(self, cmd):
         """
-        Write the given command to the Nagios command file
+        Queue the given command for the Nagios command file. Nothing
+        is written until _submit_commands() is called.
+        """
+
+        self.command_queue.append(cmd)
+        self.command_results.append(cmd.strip())
+        return True
+
+    def _chunk_commands(self, cmds):
+        """
+        Group command lines into chunks of at most PIPE_BUF bytes,
+        never splitting a single command across two chunks.
+        """
+
+        chunk = ''
+        for cmd in cmds:
+            if chunk and len(chunk) + len(cmd) > PIPE_BUF:
+                yield chunk
+                chunk = ''
+            chunk += cmd
+        if chunk:
+            yield chunk
+
+    def _submit_commands(self):
+        """
+        Write all queued commands to Nagios in one go, either through
+        the livestatus socket or the command file.
         """
 
+        cmds = self.command_queue
+        self.command_queue = []
+        if not cmds:
+            return
+
+        if self.livestatus:
+            payload = ''.join(["COMMAND %s\n" % cmd.rstrip('\n') for cmd in cmds])
+            try:
+                sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+                sock.connect(self.livestatus)
+                sock.sendall(payload)
+                sock.shutdown(socket.SHUT_WR)
+                sock.close()
+            except socket.error:
+                self.module.fail_json(msg='unable to write to livestatus socket',
+                                      livestatus=self.livestatus)
+            return
+
         try:
-            fp = open(self.cmdfile, 'w')
-            fp.write(cmd)
-            fp.flush()
-            fp.close()
-            self.command_results.append(cmd.strip())
-        except IOError:
+            fd = os.open(self.cmdfile, os.O_WRONLY)
+            try:
+                for chunk in self._chunk_commands(cmds):
+                    while chunk:
+                        chunk = chunk[os.write(fd, chunk):]
+            finally:
+                os.close(fd)
+        except (IOError, OSError):
             self.module.fail_json(msg='unable to write to nagios command file',
                                   cmdfile=self.cmdfile)
 
@@ -885,60 +981,75 @@ class Nagios(object):
         Figure out what you want to do from ansible, and then do the
         needful (at the earliest).
         """
+
+        for action in self.actions:
+            if action in GLOBAL_ACTIONS:
+                self._act(action, None)
+            else:
+                for host in self.hosts:
+                    self._act(action, host)
+
+        self._submit_commands()
+        self.module.exit_json(nagios_commands=self.command_results,
+                              changed=True)
+
+    def _act(self, action, host):
+        """
+        Queue the commands for a single action on a single host.
+        """
+
         # host or service downtime?
-        if self.action == 'downtime':
+        if action == 'downtime':
             if self.services == 'host':
-                self.schedule_host_downtime(self.host, self.minutes)
+                self.schedule_host_downtime(host, self.minutes)
             elif self.services == 'all':
-                self.schedule_host_svc_downtime(self.host, self.minutes)
+                self.schedule_host_svc_downtime(host, self.minutes)
             else:
-                self.schedule_svc_downtime(self.host,
+                self.schedule_svc_downtime(host,
                                            services=self.services,
                                            minutes=self.minutes)
-        elif self.action == "servicegroup_host_downtime":
+
+        elif action == "servicegroup_host_downtime":
             if self.servicegroup:
                 self.schedule_servicegroup_host_downtime(servicegroup = self.servicegroup, minutes = self.minutes)
-        elif self.action == "servicegroup_service_downtime":
+        elif action == "servicegroup_service_downtime":
             if self.servicegroup:
                 self.schedule_servicegroup_svc_downtime(servicegroup = self.servicegroup, minutes = self.minutes)
 
         # toggle the host AND service alerts
-        elif self.action == 'silence':
-            self.silence_host(self.host)
+        elif action == 'silence':
+            self.silence_host(host)
 
-        elif self.action == 'unsilence':
-            self.unsilence_host(self.host)
+        elif action == 'unsilence':
+            self.unsilence_host(host)
 
         # toggle host/svc alerts
-        elif self.action == 'enable_alerts':
+        elif action == 'enable_alerts':
             if self.services == 'host':
-                self.enable_host_notifications(self.host)
+                self.enable_host_notifications(host)
             else:
-                self.enable_svc_notifications(self.host,
+                self.enable_svc_notifications(host,
                                               services=self.services)
 
-        elif self.action == 'disable_alerts':
+        elif action == 'disable_alerts':
             if self.services == 'host':
-                self.disable_host_notifications(self.host)
+                self.disable_host_notifications(host)
             else:
-                self.disable_svc_notifications(self.host,
+                self.disable_svc_notifications(host,
                                                services=self.services)
-        elif self.action == 'silence_nagios':
+        elif action == 'silence_nagios':
             self.silence_nagios()
 
-        elif self.action == 'unsilence_nagios':
+        elif action == 'unsilence_nagios':
             self.unsilence_nagios()
 
-        elif self.action == 'command':
+        elif action == 'command':
             self.nagios_cmd(self.command)
 
         # wtf?
         else:
             self.module.fail_json(msg="unknown action specified: '%s'" % \
-                                      self.action)
-
-        self.module.exit_json(nagios_commands=self.command_results,
-                              changed=True)
+                                      action)
 
 ######################################################################
 # import module snippets
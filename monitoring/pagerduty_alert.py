@@ -36,6 +36,8 @@ options:
         description:
             - The GUID of one of your "Generic API" services.
             - This is the "service key" listed on a Generic API's service detail page.
+            - Since version 2.1 a list of service keys may be given; the event is then sent to all of
+              these services concurrently and the outcome and latency for each is returned in C(results).
         required: true
     state:
         description:
@@ -69,6 +71,12 @@ options:
         description:
         -  The URL of the monitoring client that is triggering this event.
         required: false
+    concurrency:
+        description:
+        - The maximum number of services from I(service_key) that are handled at the same time.
+        required: false
+        default: 4
+        version_added: "2.1"
 '''
 
 EXAMPLES = '''
@@ -105,8 +113,20 @@ EXAMPLES = '''
         state=resolved
         incident_key=somekey
         desc="some text for incident's log"
+
+# Trigger the same incident on several services
+- pagerduty_alert:
+        name: companyabc
+        service_key: [xxx, yyy]
+        api_key: yourapikey
+        state: triggered
+        incident_key: deploy-failed
+        desc: "deployment failed"
 '''
 
+import time
+from multiprocessing.pool import ThreadPool
+
 
 def check(module, name, state, service_key, api_key, incident_key=None):
     url = "https://%s.pagerduty.com/api/v1/incidents" % name
@@ -125,8 +145,8 @@ def check(module, name, state, service_key, api_key, incident_key=None):
                                headers=headers, data=json.dumps(data))
 
     if info['status'] != 200:
-        module.fail_json(msg="failed to check current incident status."
-                             "Reason: %s" % info['msg'])
+        raise Exception("failed to check current incident status."
+                        "Reason: %s" % info['msg'])
     json_out = json.loads(response.read())["incidents"][0]
 
     if state != json_out["status"]:
@@ -153,30 +173,62 @@ def send_event(module, service_key, event_type, desc,
     response, info = fetch_url(module, url, method='post',
                                headers=headers, data=json.dumps(data))
     if info['status'] != 200:
-        module.fail_json(msg="failed to %s. Reason: %s" %
-                         (event_type, info['msg']))
+        raise Exception("failed to %s. Reason: %s" %
+                        (event_type, info['msg']))
     json_out = json.loads(response.read())
     return json_out
 
 
+def alert(module, name, state, service_key, api_key, event_type, desc,
+          incident_key=None, client=None, client_url=None):
+    out, changed = check(module, name, state,
+                         service_key, api_key, incident_key)
+
+    if not module.check_mode and changed is True:
+        out = send_event(module, service_key, event_type, desc,
+                         incident_key, client, client_url)
+    return out, changed
+
+
+def alert_services(module, service_keys, alert_service, concurrency=4):
+    """ Run alert_service(service_key) for all services in parallel and
+    report the outcome of each """
+
+    def run(service_key):
+        start = time.time()
+        result = dict(recipient=service_key, delivered=True)
+        try:
+            result['result'], result['changed'] = alert_service(service_key)
+        except Exception, e:
+            result.update(delivered=False, error=str(e))
+        result['latency'] = round(time.time() - start, 3)
+        return result
+
+    pool = ThreadPool(max(1, min(concurrency, len(service_keys))))
+    results = pool.map(run, service_keys)
+    pool.close()
+    return results
+
+
 def main():
     module = AnsibleModule(
         argument_spec=dict(
             name=dict(required=True),
-            service_key=dict(required=True),
+            service_key=dict(required=True, type='list'),
             api_key=dict(required=True),
             state=dict(required=True,
                        choices=['triggered', 'acknowledged', 'resolved']),
             client=dict(required=False, default=None),
             client_url=dict(required=False, default=None),
             desc=dict(required=False, default='Created via Ansible'),
-            incident_key=dict(required=False, default=None)
+            incident_key=dict(required=False, default=None),
+            concurrency=dict(required=False, default=4, type='int')
         ),
         supports_check_mode=True
     )
 
     name = module.params['name']
-    service_key = module.params['service_key']
+    service_keys = module.params['service_key']
     api_key = module.params['api_key']
     state = module.params['state']
     client = module.params['client']
@@ -196,12 +248,23 @@ def main():
         module.fail_json(msg="incident_key is required for "
                              "acknowledge or resolve events")
 
-    out, changed = check(module, name, state,
-                         service_key, api_key, incident_key)
+    if len(service_keys) > 1:
+        results = alert_services(module, service_keys,
+                                 lambda service_key: alert(module, name, state, service_key, api_key, event_type,
+                                                           desc, incident_key, client, client_url),
+                                 module.params['concurrency'])
+        changed = any(r.get('changed') for r in results)
+        failed = [r['recipient'] for r in results if not r['delivered']]
+        if failed:
+            module.fail_json(msg="failed to %s on %s" % (event_type, ', '.join(failed)),
+                             results=results, changed=changed)
+        module.exit_json(results=results, changed=changed)
 
-    if not module.check_mode and changed is True:
-        out = send_event(module, service_key, event_type, desc,
-                         incident_key, client, client_url)
+    try:
+        out, changed = alert(module, name, state, service_keys[0], api_key, event_type,
+                             desc, incident_key, client, client_url)
+    except Exception, e:
+        module.fail_json(msg=str(e))
 
     module.exit_json(result=out, changed=changed)
 
@@ -34,7 +34,8 @@ options:
     description:
       - The name of the check
       - This is the key that is used to determine whether a check exists
-    required: true
+      - Required unless I(checks) is given
+    required: false
   state:
     description: Whether the check should be present or not
     choices: [ 'present', 'absent' ]
@@ -47,6 +48,26 @@ options:
       - The parent folders need to exist when I(state=present), otherwise an error will be thrown
     required: false
     default: /etc/sensu/conf.d/checks.json
+  checks:
+    description:
+      - Dict of checks to manage in one run, keyed by check name. Each value is
+        a dict of the check options of this module (including I(state)), which
+        default to the module options of the same name.
+      - The file is read once, all checks are reconciled in memory and the file
+        is written once, atomically, and only if its content changed.
+    required: false
+    default: null
+    version_added: "2.1"
+  split:
+    description:
+      - Keep every check in a file of its own, C(<name>.json) in the directory
+        of I(path), instead of in I(path) itself, so that updating one check
+        does not rewrite all others.
+      - The file of a check is removed when the check is absent and nothing else is defined in it.
+    choices: [ 'yes', 'no' ]
+    required: false
+    default: no
+    version_added: "2.1"
   backup:
     description:
       - Create a backup file (if yes), including the timestamp information so
@@ -170,36 +191,136 @@ EXAMPLES = '''
 # to remove it completely you need to issue a DELETE request to the sensu api.
 - name: check disk
   sensu_check: name=check_disk_capacity
+
+# Manage a set of checks with one read and one write of checks.json
+- name: web checks
+  sensu_check:
+    handlers: default
+    subscribers: web
+    interval: 60
+    checks:
+      nginx_running:
+        command: /etc/sensu/plugins/processes/check-procs.rb -p nginx
+      http_ok:
+        command: /etc/sensu/plugins/http/check-http.rb -u http://localhost/
+        interval: 30
+      old_check:
+        state: absent
+
+# The same, with one file per check under /etc/sensu/conf.d
+- name: web checks
+  sensu_check:
+    split: yes
+    handlers: default
+    checks:
+      nginx_running:
+        command: /etc/sensu/plugins/processes/check-procs.rb -p nginx
 '''
 
 
-def sensu_check(module, path, name, state='present', backup=False):
-    changed = False
-    reasons = []
+import os
+import tempfile
 
+try:
+    import json
+except ImportError:
+    import simplejson as json
+
+SIMPLE_OPTS = ['command',
+               'handlers',
+               'subscribers',
+               'interval',
+               'timeout',
+               'handle',
+               'dependencies',
+               'standalone',
+               'publish',
+               'occurrences',
+               'refresh',
+               'aggregate',
+               'low_flap_threshold',
+               'high_flap_threshold',
+               ]
+
+BOOL_OPTS = ['handle', 'metric', 'standalone', 'publish', 'aggregate']
+INT_OPTS = ['interval', 'timeout', 'occurrences', 'refresh', 'low_flap_threshold', 'high_flap_threshold']
+LIST_OPTS = ['handlers', 'subscribers', 'dependencies']
+CHECK_OPTS = SIMPLE_OPTS + ['metric', 'subdue_begin', 'subdue_end', 'state']
+
+
+def check_options(module, name, item):
+    """Options of one entry of checks, defaulting to the module options"""
+    if item is None:
+        item = {}
+    if not isinstance(item, dict):
+        module.fail_json(msg='options of check {name} must be a dict'.format(name=name))
+    unknown = [key for key in item if key not in CHECK_OPTS]
+    if unknown:
+        module.fail_json(msg='unsupported options for check {name}: {opts}'.format(name=name, opts=', '.join(unknown)))
+
+    opts = {}
+    for opt in CHECK_OPTS:
+        value = item.get(opt, module.params[opt])
+        if value is not None and opt in item:
+            try:
+                if opt in BOOL_OPTS:
+                    value = module.boolean(value)
+                elif opt in INT_OPTS:
+                    value = int(value)
+                elif opt in LIST_OPTS and not isinstance(value, list):
+                    value = str(value).split(',')
+            except ValueError:
+                module.fail_json(msg='invalid value for `{opt}\' of check {name}'.format(opt=opt, name=name))
+        opts[opt] = value
+
+    if opts['state'] not in ['present', 'absent']:
+        module.fail_json(msg='invalid state `{state}\' for check {name}'.format(state=opts['state'], name=name))
+    if opts['state'] != 'absent' and opts['command'] is None:
+        module.fail_json(msg='missing required arguments: command (check {name})'.format(name=name))
+    if (opts['subdue_begin'] is None) != (opts['subdue_end'] is None):
+        module.fail_json(msg='subdue_begin and subdue_end must be given together (check {name})'.format(name=name))
+    return opts
+
+
+def load_config(module, path):
+    """Parse the json file at path, None if it does not exist"""
     try:
-        import json
-    except ImportError:
-        import simplejson as json
+        stream = open(path, 'r')
+    except IOError, e:
+        if e.errno == 2:  # File not found, non-fatal
+            return None
+        module.fail_json(msg=str(e))
 
     try:
         try:
-            stream = open(path, 'r')
-            config = json.load(stream.read())
-        except IOError, e:
-            if e.errno is 2:  # File not found, non-fatal
-                if state == 'absent':
-                    reasons.append('file did not exist and state is `absent\'')
-                    return changed, reasons
-                config = {}
-            else:
-                module.fail_json(msg=str(e))
+            return json.load(stream)
         except ValueError:
             msg = '{path} contains invalid JSON'.format(path=path)
             module.fail_json(msg=msg)
     finally:
-        if stream:
+        stream.close()
+
+
+def write_config(module, path, config, backup=False):
+    """Replace the file at path with config in one atomic move"""
+    if backup and os.path.exists(path):
+        module.backup_local(path)
+    try:
+        fd, tmp = tempfile.mkstemp(prefix='.sensu_check', dir=os.path.dirname(path) or '.')
+        stream = os.fdopen(fd, 'w')
+        try:
+            stream.write(json.dumps(config, indent=2) + '\n')
+        finally:
             stream.close()
+    except (IOError, OSError), e:
+        module.fail_json(msg=str(e))
+    module.atomic_move(tmp, path)
+
+
+def update_check(config, name, state, opts):
+    """Bring check name in config to state, in memory"""
+    changed = False
+    reasons = []
 
     if 'checks' not in config:
         if state == 'absent':
@@ -223,25 +344,10 @@ def sensu_check(module, path, name, state='present', backup=False):
             reasons.append('check was absent and state is `present\'')
         else:
             check = config['checks'][name]
-        simple_opts = ['command',
-                       'handlers',
-                       'subscribers',
-                       'interval',
-                       'timeout',
-                       'handle',
-                       'dependencies',
-                       'standalone',
-                       'publish',
-                       'occurrences',
-                       'refresh',
-                       'aggregate',
-                       'low_flap_threshold',
-                       'high_flap_threshold',
-                       ]
-        for opt in simple_opts:
-            if module.params[opt] is not None:
-                if opt not in check or check[opt] != module.params[opt]:
-                    check[opt] = module.params[opt]
+        for opt in SIMPLE_OPTS:
+            if opts[opt] is not None:
+                if opt not in check or check[opt] != opts[opt]:
+                    check[opt] = opts[opt]
                     changed = True
                     reasons.append('`{opt}\' did not exist or was different'.format(opt=opt))
             else:
@@ -250,19 +356,19 @@ def sensu_check(module, path, name, state='present', backup=False):
                     changed = True
                     reasons.append('`{opt}\' was removed'.format(opt=opt))
 
-        if module.params['metric']:
+        if opts['metric']:
             if 'type' not in check or check['type'] != 'metric':
                 check['type'] = 'metric'
                 changed = True
                 reasons.append('`type\' was not defined or not `metric\'')
-        if not module.params['metric'] and 'type' in check:
+        if not opts['metric'] and 'type' in check:
             del check['type']
             changed = True
             reasons.append('`type\' was defined')
 
-        if module.params['subdue_begin'] is not None and module.params['subdue_end'] is not None:
-            subdue = {'begin': module.params['subdue_begin'],
-                      'end': module.params['subdue_end'],
+        if opts['subdue_begin'] is not None and opts['subdue_end'] is not None:
+            subdue = {'begin': opts['subdue_begin'],
+                      'end': opts['subdue_end'],
                       }
             if 'subdue' not in check or check['subdue'] != subdue:
                 check['subdue'] = subdue
@@ -274,25 +380,50 @@ def sensu_check(module, path, name, state='present', backup=False):
                 changed = True
                 reasons.append('`subdue\' was removed')
 
-    if changed and not module.check_mode:
-        if backup:
-            module.backup_local(path)
-        try:
+    return changed, reasons
+
+
+def sensu_checks(module, path, checks, backup=False, remove_empty=False):
+    """Reconcile a list of (name, state, opts) with one read and at most one write of path"""
+    changed = []
+    reasons = {}
+
+    config = load_config(module, path)
+    if config is None:
+        if all(state == 'absent' for name, state, opts in checks):
+            for name, state, opts in checks:
+                reasons[name] = ['file did not exist and state is `absent\'']
+            return changed, reasons
+        config = {}
+    original = json.dumps(config, sort_keys=True)
+
+    for name, state, opts in checks:
+        check_changed, reasons[name] = update_check(config, name, state, opts)
+        if check_changed:
+            changed.append(name)
+
+    if changed and not module.check_mode and json.dumps(config, sort_keys=True) != original:
+        if remove_empty and config == {'checks': {}}:
+            if backup:
+                module.backup_local(path)
             try:
-                stream = open(path, 'w')
-                stream.write(json.dumps(config, indent=2) + '\n')
-            except IOError, e:
+                os.remove(path)
+            except OSError, e:
                 module.fail_json(msg=str(e))
-        finally:
-            if stream:
-                stream.close()
+        else:
+            write_config(module, path, config, backup)
 
     return changed, reasons
 
 
+def sensu_check(module, path, name, state='present', backup=False):
+    changed, reasons = sensu_checks(module, path, [(name, state, module.params)], backup)
+    return len(changed) > 0, reasons[name]
+
+
 def main():
 
-    arg_spec = {'name':         {'type': 'str', 'required': True},
+    arg_spec = {'name':         {'type': 'str'},
                 'path':         {'type': 'str', 'default': '/etc/sensu/conf.d/checks.json'},
                 'state':        {'type': 'str', 'default': 'present', 'choices': ['present', 'absent']},
                 'backup':       {'type': 'bool', 'default': 'no'},
@@ -313,22 +444,48 @@ def main():
                 'aggregate':    {'type': 'bool'},
                 'low_flap_threshold':  {'type': 'int'},
                 'high_flap_threshold': {'type': 'int'},
+                'checks':       {'type': 'dict'},
+                'split':        {'type': 'bool', 'default': 'no'},
                 }
 
     required_together = [['subdue_begin', 'subdue_end']]
 
     module = AnsibleModule(argument_spec=arg_spec,
                            required_together=required_together,
+                           required_one_of=[['name', 'checks']],
+                           mutually_exclusive=[['name', 'checks']],
                            supports_check_mode=True)
-    if module.params['state'] != 'absent' and module.params['command'] is None:
-        module.fail_json(msg="missing required arguments: %s" % ",".join(['command']))
 
     path = module.params['path']
     name = module.params['name']
     state = module.params['state']
     backup = module.params['backup']
+    split = module.params['split']
+
+    if module.params['checks'] is not None:
+        checks = [(n, opts['state'], opts) for n, opts in
+                  sorted((n, check_options(module, n, item)) for n, item in module.params['checks'].items())]
+        if not split:
+            changed, reasons = sensu_checks(module, path, checks, backup)
+        else:
+            changed, reasons = [], {}
+            for check in checks:
+                check_path = os.path.join(os.path.dirname(path), check[0] + '.json')
+                check_changed, check_reasons = sensu_checks(module, check_path, [check], backup, remove_empty=True)
+                changed.extend(check_changed)
+                reasons.update(check_reasons)
+        module.exit_json(path=path, changed=len(changed) > 0, msg='OK', checks=changed, reasons=reasons)
+
+    if module.params['state'] != 'absent' and module.params['command'] is None:
+        module.fail_json(msg="missing required arguments: %s" % ",".join(['command']))
 
-    changed, reasons = sensu_check(module, path, name, state, backup)
+    if split:
+        path = os.path.join(os.path.dirname(path), name + '.json')
+        changed, reasons = sensu_checks(module, path, [(name, state, module.params)], backup, remove_empty=True)
+        changed = len(changed) > 0
+        reasons = reasons[name]
+    else:
+        changed, reasons = sensu_check(module, path, name, state, backup)
 
     module.exit_json(path=path, changed=changed, msg='OK', name=name, reasons=reasons)
 
@@ -32,6 +32,7 @@ options:
   nsc_host:
     description:
       - hostname or ip of your netscaler
+      - Since version 2.1 a list of appliances may be given; the same actions are then applied to each of them in parallel.
     required: true
     default: null
     aliases: []
@@ -63,6 +64,7 @@ options:
   name:
     description:
       - name of the entity
+      - Since version 2.1 a list of names may be given; they are enabled or disabled with a single bulk request per appliance.
     required: true
     default: hostname
     aliases: []
@@ -80,6 +82,12 @@ options:
     required: false
     default: 'yes'
     choices: ['yes', 'no']
+  concurrency:
+    description:
+      - Maximum number of appliances from I(nsc_host) that are contacted at the same time.
+    required: false
+    default: 4
+    version_added: "2.1"
 
 requirements: []
 author: "Nandor Sivok (@dominis)"
@@ -94,12 +102,22 @@ ansible host -m netscaler -a "nsc_host=nsc.example.com user=apiuser password=api
 
 # Disable the service local:8080
 ansible host -m netscaler -a "nsc_host=nsc.example.com user=apiuser password=apipass name=local:8080 type=service action=disable"
+
+# Disable a batch of services on two appliances
+- local_action:
+    module: netscaler
+    nsc_host: [nsc1.example.com, nsc2.example.com]
+    user: apiuser
+    password: apipass
+    type: service
+    action: disable
+    name: [web01:8080, web02:8080, web03:8080]
 '''
 
 
 import base64
 import socket
-import urllib
+from multiprocessing.pool import ThreadPool
 
 class netscaler(object):
 
@@ -111,38 +129,40 @@ class netscaler(object):
     def http_request(self, api_endpoint, data_json={}):
         request_url = self._nsc_protocol + '://' + self._nsc_host + self._nitro_base_url + api_endpoint
 
-        data_json = urllib.urlencode(data_json)
-        if not len(data_json):
+        if data_json:
+            data_json = json.dumps(data_json)
+        else:
             data_json = None
 
         auth = base64.encodestring('%s:%s' % (self._nsc_user, self._nsc_pass)).replace('\n', '').strip()
         headers = {
             'Authorization': 'Basic %s' % auth,
-            'Content-Type' : 'application/x-www-form-urlencoded',
+            'Content-Type' : 'application/json',
+            # keep going on a bulk request when a single entity fails
+            'X-NITRO-ONERROR': 'continue',
         }
 
         response, info = fetch_url(self.module, request_url, data=data_json, headers=headers)
+        if response is None:
+            body = info.get('body')
+            if body:
+                return json.loads(body)
+            raise Exception('%s: %s' % (self._nsc_host, info['msg']))
 
         return json.load(response)
 
     def prepare_request(self, action):
         resp = self.http_request(
-            'config',
-            {
-                "object":
-                {
-                    "params": {"action": action},
-                    self._type: {"name": self._name}
-                }
-            }
+            'config/%s?action=%s' % (self._type, action),
+            {self._type: [{"name": name} for name in self._name]}
         )
 
         return resp
 
 
-def core(module):
+def core(module, nsc_host):
     n = netscaler(module)
-    n._nsc_host = module.params.get('nsc_host')
+    n._nsc_host = nsc_host
     n._nsc_user = module.params.get('user')
     n._nsc_pass = module.params.get('password')
     n._nsc_protocol = module.params.get('nsc_protocol')
@@ -150,6 +170,8 @@ def core(module):
     n._type = module.params.get('type')
     action = module.params.get('action')
 
+    # all names go in one bulk request, so a NITRO login session would
+    # only add a login and a logout request per appliance
     r = n.prepare_request(action)
 
     return r['errorcode'], r
@@ -159,28 +181,51 @@ def main():
 
     module = AnsibleModule(
         argument_spec = dict(
-            nsc_host = dict(required=True),
+            nsc_host = dict(required=True, type='list'),
             nsc_protocol = dict(default='https'),
             user = dict(required=True),
             password = dict(required=True),
             action = dict(default='enable', choices=['enable','disable']),
-            name = dict(default=socket.gethostname()),
+            name = dict(default=[socket.gethostname()], type='list'),
             type = dict(default='server', choices=['service', 'server']),
             validate_certs=dict(default='yes', type='bool'),
+            concurrency=dict(default=4, type='int'),
         )
     )
 
-    rc = 0
+    nsc_hosts = module.params.get('nsc_host')
+
+    if len(nsc_hosts) == 1:
+        rc = 0
+        try:
+            rc, result = core(module, nsc_hosts[0])
+        except Exception, e:
+            module.fail_json(msg=str(e))
+
+        if rc != 0:
+            module.fail_json(rc=rc, msg=result)
+        else:
+            result['changed'] = True
+            module.exit_json(**result)
+
+    def _core(nsc_host):
+        try:
+            return nsc_host, core(module, nsc_host)
+        except Exception, e:
+            return nsc_host, (-1, str(e))
+
+    pool = ThreadPool(max(1, min(module.params.get('concurrency'), len(nsc_hosts))))
     try:
-        rc, result = core(module)
-    except Exception, e:
-        module.fail_json(msg=str(e))
-
-    if rc != 0:
-        module.fail_json(rc=rc, msg=result)
-    else:
-        result['changed'] = True
-        module.exit_json(**result)
+        results = dict(pool.map(_core, nsc_hosts))
+    finally:
+        pool.close()
+        pool.join()
+
+    failed = [h for h in nsc_hosts if results[h][0] != 0]
+    results = dict((h, r) for h, (rc, r) in results.items())
+    if failed:
+        module.fail_json(msg='action failed on %s' % ', '.join(failed), results=results)
+    module.exit_json(changed=True, results=results)
 
 
 # import module snippets
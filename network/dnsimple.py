@@ -92,6 +92,29 @@ options:
     required: false
     default: null
 
+  records:
+    description:
+      - List of records to manage for I(domain) in one run. Each item is a dict with the keys C(name), C(type), C(value) and optionally C(ttl) (defaults to I(ttl)) and C(priority).
+      - The zone is downloaded once, the minimal set of creates, updates and deletes is computed and then issued concurrently. The changes are returned in C(result) as C(created), C(updated) and C(deleted).
+      - Changes rejected by the API are returned in C(failed) of C(result) along with their error, and fail the module. When a delete fails, the updates and creates are not attempted.
+    required: false
+    default: null
+    version_added: "2.1"
+
+  purge:
+    description:
+      - When used with I(records) and C(state=present), delete all records of the domain which are not in I(records). System records (SOA and DNSimple name servers) are never deleted.
+    required: false
+    default: false
+    version_added: "2.1"
+
+  concurrency:
+    description:
+      - Maximum number of API requests issued at the same time when applying I(records).
+    required: false
+    default: 4
+    version_added: "2.1"
+
 requirements: [ dnsimple ]
 author: "Alex Coomans (@drcapulet)"
 '''
@@ -127,9 +150,22 @@ EXAMPLES = '''
 # and delete the record
 - local_action: dnsimpledomain=my.com record= type=CNAME value=example.com state=absent
 
+# make the zone contain exactly these records
+- local_action:
+    module: dnsimple
+    domain: my.com
+    state: present
+    purge: yes
+    records:
+      - { name: "", type: "A", value: "127.0.0.1" }
+      - { name: "www", type: "CNAME", value: "my.com", ttl: 600 }
+      - { name: "", type: "MX", value: "mail.my.com", priority: 10 }
+  register: zone
+
 '''
 
 import os
+from multiprocessing.pool import ThreadPool
 try:
     from dnsimple import DNSimple
     from dnsimple.dnsimple import DNSimpleException
@@ -137,6 +173,84 @@ try:
 except ImportError:
     HAS_DNSIMPLE = False
 
+def record_key(name, record_type, content):
+    return (name, record_type, content)
+
+def diff_records(current, desired, state, purge):
+    """
+    Compute the minimal changes between the zone records and the desired
+    records, returning the (create, update, delete) lists
+    """
+    index = {}
+    for r in current:
+        index.setdefault(record_key(r['name'], r['record_type'], r['content']), r)
+
+    create, update, delete = [], [], []
+    wanted = set()
+    for d in desired:
+        key = record_key(d['name'], d['record_type'], d['content'])
+        wanted.add(key)
+        rr = index.get(key)
+        if state == 'absent':
+            if rr:
+                delete.append(rr)
+        elif not rr:
+            create.append(d)
+        elif rr['ttl'] != d.get('ttl', rr['ttl']) or rr['prio'] != d.get('prio', rr['prio']):
+            data = dict((k, d[k]) for k in ('ttl', 'prio') if k in d)
+            update.append((rr, data))
+
+    if state == 'present' and purge:
+        for key, rr in index.items():
+            if key not in wanted and not rr.get('system_record'):
+                delete.append(rr)
+
+    return create, update, delete
+
+def apply_records(client, domain, create, update, delete, concurrency):
+    """
+    Issue all changes through a bounded pool of concurrent API requests,
+    the deletes first. Changes the API rejects are collected in failed.
+    """
+    def _apply(change):
+        action, item = change
+        try:
+            if action == 'create':
+                return action, client.add_record(domain, item)['record'], None
+            elif action == 'update':
+                rr, data = item
+                return action, client.update_record(domain, str(rr['id']), data)['record'], None
+            else:
+                client.delete_record(domain, item['id'])
+                return action, item, None
+        except DNSimpleException, e:
+            return action, item, str(e)
+
+    # deletes finish before anything is added, so that e.g. a CNAME can be
+    # replaced by an A record of the same name
+    batches = [[('delete', r) for r in delete],
+               [('update', u) for u in update] + [('create', c) for c in create]]
+
+    result = dict(created=[], updated=[], deleted=[], failed=[])
+    if not delete and not update and not create:
+        return result
+
+    pool = ThreadPool(max(1, min(concurrency, max(len(batch) for batch in batches))))
+    try:
+        for batch in batches:
+            for action, record, error in pool.map(_apply, batch):
+                if error is None:
+                    result[action + 'd'].append(record)
+                else:
+                    result['failed'].append(dict(action=action, record=record, error=error))
+            # a record that was not deleted can make the creates conflict
+            if result['failed']:
+                break
+    finally:
+        pool.close()
+        pool.join()
+    return result
+
 def main():
     module = AnsibleModule(
         argument_spec = dict(
@@ -151,10 +265,17 @@ def main():
             priority          = dict(required=False, type='int'),
             state             = dict(required=False, choices=['present', 'absent']),
             solo              = dict(required=False, type='bool'),
+            records           = dict(required=False, type='list'),
+            purge             = dict(required=False, default=False, type='bool'),
+            concurrency       = dict(required=False, default=4, type='int'),
         ),
         required_together = (
             ['record', 'value']
         ),
+        mutually_exclusive = (
+            ['records', 'record'],
+            ['records', 'record_ids'],
+        ),
         supports_check_mode = True,
     )
 
@@ -172,6 +293,7 @@ def main():
     priority          = module.params.get('priority')
     state             = module.params.get('state')
     is_solo           = module.params.get('solo')
+    wanted_records    = module.params.get('records')
 
     if account_email and account_api_token:
         client = DNSimple(email=account_email, api_token=account_api_token)
@@ -188,6 +310,40 @@ def main():
             domains = client.domains()
             module.exit_json(changed=False, result=[d['domain'] for d in domains])
 
+        # Domain & a list of records, download the zone once and sync it
+        if domain and wanted_records is not None:
+            if state not in ('present', 'absent'):
+                module.fail_json(msg="'%s' is an unknown value for the state argument" % state)
+
+            desired = []
+            for r in wanted_records:
+                try:
+                    data = {
+                        'name':        r['name'],
+                        'record_type': r['type'],
+                        'content':     r['value'],
+                        'ttl':         int(r.get('ttl', ttl)),
+                    }
+                except (KeyError, ValueError), e:
+                    module.fail_json(msg="invalid record %s: %s" % (r, e))
+                if r.get('priority') is not None:
+                    data['prio'] = int(r['priority'])
+                desired.append(data)
+
+            records = [r['record'] for r in client.records(str(domain))]
+            create, update, delete = diff_records(records, desired, state, module.params.get('purge'))
+            changed = bool(create or update or delete)
+
+            if module.check_mode:
+                module.exit_json(changed=changed, result=dict(
+                    created=create, updated=[dict(rr, **data) for rr, data in update], deleted=delete))
+
+            result = apply_records(client, str(domain), create, update, delete, module.params.get('concurrency'))
+            if result['failed']:
+                module.fail_json(msg="%d record changes failed" % len(result['failed']), result=result,
+                                 changed=bool(result['created'] or result['updated'] or result['deleted']))
+            module.exit_json(changed=changed, result=result)
+
         # Domain & No record
         if domain and record is None and not record_ids:
             domains = [d['domain'] for d in client.domains()]
@@ -66,6 +66,30 @@ options:
     required: false
     default: 1800
     
+  records:
+    description:
+      - "List of records to manage in a single run, each a dict with the keys C(name), C(type), C(value) and optionally C(ttl) (defaults to I(record_ttl)). Values use the same format as I(record_value)."
+      - The zone is fetched once and all changes are sent through the multi-record API endpoints in batches. Cannot be used together with I(record_name).
+      - Records are matched against the zone by name, type and value, so a name can have several records of one type, e.g. round-robin A records. CNAME and HTTPRED records are matched by name and type only, and their value is updated in place; each name may be given only once for these types.
+    required: false
+    default: null
+    version_added: "2.1"
+
+  purge:
+    description:
+      - When used with I(records) and C(state=present), delete all records of the domain which are not in I(records), making I(records) the complete record set of the zone. This includes duplicate records for a name and type that allows only one, and records of types this module does not manage.
+    required: false
+    default: 'no'
+    choices: ['yes', 'no']
+    version_added: "2.1"
+
+  batch_size:
+    description:
+      - Maximum number of records sent in a single multi-record API request.
+    required: false
+    default: 100
+    version_added: "2.1"
+
   state:
     description:
       - whether the record should exist or not
@@ -85,6 +109,7 @@ options:
 notes:
   - The DNS Made Easy service requires that machines interacting with the API have the proper time and timezone set. Be sure you are within a few seconds of actual time by using NTP. 
   - This module returns record(s) in the "result" element when 'state' is set to 'present'. This value can be be registered and used in your playbooks.
+  - The DNS Made Easy API limits the number of requests per account. When the limit is reached the module waits and retries the request.
   
 requirements: [ hashlib, hmac ]
 author: "Brice Burgess (@briceburg)"
@@ -107,6 +132,18 @@ EXAMPLES = '''
   
 # delete a record / ensure it is absent
 - dnsmadeeasy: account_key=key account_secret=secret domain=my.com state=absent record_name="test"
+
+# make the zone contain exactly these records
+- dnsmadeeasy:
+    account_key: key
+    account_secret: secret
+    domain: my.com
+    state: present
+    purge: yes
+    records:
+      - { name: "www", type: "A", value: "192.168.0.1" }
+      - { name: "", type: "MX", value: "10 mail.my.com.", ttl: 3600 }
+      - { name: "", type: "TXT", value: "v=spf1 mx -all" }
 '''
 
 # ============================================
@@ -114,6 +151,7 @@ EXAMPLES = '''
 #
 
 import urllib
+import time
 
 IMPORT_ERROR = None
 try:
@@ -124,6 +162,10 @@ try:
 except ImportError, e:
     IMPORT_ERROR = str(e)
 
+RECORD_TYPES = ['A', 'AAAA', 'CNAME', 'HTTPRED', 'MX', 'NS', 'PTR', 'SRV', 'TXT']
+# types of which a name can only have a single record
+SINGLE_RECORD_TYPES = ['CNAME', 'HTTPRED']
+
 class DME2:
 
     def __init__(self, apikey, secret, domain, module):
@@ -137,6 +179,9 @@ class DME2:
         self.record_map = None      # ["record_name"] => ID
         self.records = None         # ["record_ID"] => <record>
         self.all_records = None
+        self.record_index = None    # [record key] => <record>
+        self.name_index = None      # [(name, type)] => first <record>
+        self.requests_remaining = None
 
         # Lookup the domain ID if passed as a domain name vs. ID
         if not self.domain.isdigit():
@@ -164,7 +209,18 @@ class DME2:
         if data and not isinstance(data, basestring):
             data = urllib.urlencode(data)
 
-        response, info = fetch_url(self.module, url, data=data, method=method, headers=self._headers())
+        # Back off while the account has used up its request allowance
+        delay = 5
+        for attempt in range(6):
+            response, info = fetch_url(self.module, url, data=data, method=method, headers=self._headers())
+            remaining = info.get('x-dnsme-requestsremaining')
+            if remaining is not None:
+                self.requests_remaining = int(remaining)
+            if info['status'] in (200, 201, 204) or self.requests_remaining != 0:
+                break
+            time.sleep(delay)
+            delay = min(delay * 2, 60)
+
         if info['status'] not in (200, 201, 204):
             self.module.fail_json(msg="%s returned %s, with body: %s" % (url, info['status'], info['msg']))
 
@@ -194,44 +250,69 @@ class DME2:
 
         return self.records.get(record_id, False)
 
-    # Try to find a single record matching this one.
+    # Build the key identifying a record within the zone.
     # How we do this depends on the type of record. For instance, there
-    # can be several MX records for a single record_name while there can
-    # only be a single CNAME for a particular record_name. Note also that
-    # there can be several records with different types for a single name.
+    # can be several A or MX records for a single record_name while there
+    # can only be a single CNAME for a particular record_name. Note also
+    # that there can be several records with different types for a single
+    # name.
+    def _recordKey(self, record_name, record_type, record_value):
+        if record_type in SINGLE_RECORD_TYPES:
+            return (record_name, record_type)
+        elif record_type in RECORD_TYPES:
+            return (record_name, record_type, record_value)
+        else:
+            raise Exception('record_type not yet supported')
+
+    # Try to find a single record matching this one.
     def getMatchingRecord(self, record_name, record_type, record_value):
         # Get all the records if not already cached
+        if self.record_index is None:
+            self._indexRecords()
+
+        # A single A, AAAA or PTR record is matched by name, so that its
+        # value can be updated in place
+        if record_type in ["A", "AAAA", "PTR"]:
+            return self.name_index.get((record_name, record_type), False)
+
+        if record_type == "MX":
+            record_value = record_value.split(" ")[1]
+        elif record_type == "SRV":
+            record_value = record_value.split(" ")[3]
+
+        return self.record_index.get(self._recordKey(record_name, record_type, record_value), False)
+
+    def _indexRecords(self):
         if not self.all_records:
             self.all_records = self.getRecords()
 
-        # TODO SRV type not yet implemented
-        if record_type in ["A", "AAAA", "CNAME", "HTTPRED", "PTR"]:
-            for result in self.all_records:
-                if result['name'] == record_name and result['type'] == record_type:
-                    return result
-            return False
-        elif record_type in ["MX", "NS", "TXT"]:
-            for result in self.all_records:
-                if record_type == "MX":
-                    value = record_value.split(" ")[1]
-                else:
-                    value = record_value
-                if result['name'] == record_name and result['type'] == record_type and result['value'] == value:
-                    return result
-            return False
-        else:
-            raise Exception('record_type not yet supported')
+        # Only the first record of a key can be matched; further ones are
+        # duplicates, which diffRecords purges along with unmanaged types.
+        self.record_index = {}
+        self.name_index = {}
+        for result in self.all_records:
+            if result['type'] not in RECORD_TYPES:
+                continue
+            key = self._recordKey(result['name'], result['type'], result['value'])
+            self.record_index.setdefault(key, result)
+            self.name_index.setdefault((result['name'], result['type']), result)
 
     def getRecords(self):
         return self.query(self.record_url, 'GET')['data']
 
     def _instMap(self, type):
-        #@TODO cache this call so it's executed only once per ansible execution
         map = {}
         results = {}
 
-        # iterate over e.g. self.getDomains() || self.getRecords()
-        for result in getattr(self, 'get' + type.title() + 's')():
+        # iterate over e.g. self.getDomains() || self.getRecords(), reusing
+        # the records of the zone if they were already fetched
+        if type == 'record':
+            if not self.all_records:
+                self.all_records = self.getRecords()
+            items = self.all_records
+        else:
+            items = getattr(self, 'get' + type.title() + 's')()
+        for result in items:
 
             map[result['name']] = result['id']
             results[result['id']] = result
@@ -255,6 +336,78 @@ class DME2:
         #@TODO remove record from the cache when impleneted
         return self.query(self.record_url + '/' + str(record_id), 'DELETE')
 
+    def createRecords(self, records):
+        return self.query(self.record_url + '/createMulti', 'POST', self.prepareRecord(records))
+
+    def updateRecords(self, records):
+        return self.query(self.record_url + '/updateMulti', 'PUT', self.prepareRecord(records))
+
+    def deleteRecords(self, record_ids):
+        ids = urllib.urlencode([('ids', record_id) for record_id in record_ids])
+        return self.query(self.record_url + '?' + ids, 'DELETE')
+
+    def buildRecord(self, record_name, record_type, record_value, record_ttl):
+        new_record = {'name': record_name, 'type': record_type,
+                      'value': record_value, 'ttl': record_ttl}
+        # Special handling for mx and srv records
+        if record_type == "MX":
+            new_record["mxLevel"], new_record["value"] = record_value.split(" ")
+        elif record_type == "SRV":
+            (new_record["priority"], new_record["weight"], new_record["port"],
+             new_record["value"]) = record_value.split(" ")
+        return new_record
+
+    # Compute the changes needed to bring the zone to the desired records
+    # against the index of the zone fetched once.
+    def diffRecords(self, desired, state, purge):
+        if self.record_index is None:
+            self._indexRecords()
+
+        create, update, delete = [], [], []
+        matched = set()
+        seen = set()
+        for new_record in desired:
+            key = self._recordKey(new_record['name'], new_record['type'], new_record['value'])
+            if key in seen:
+                self.module.fail_json(msg="duplicate record %s in records" % (new_record,))
+            seen.add(key)
+            current_record = self.record_index.get(key)
+            if current_record:
+                matched.add(current_record['id'])
+
+            if state == 'absent':
+                if current_record:
+                    delete.append(current_record)
+            elif not current_record:
+                create.append(new_record)
+            else:
+                for i in new_record:
+                    if str(current_record.get(i)) != str(new_record[i]):
+                        new_record['id'] = current_record['id']
+                        update.append(new_record)
+                        break
+
+        if state == 'present' and purge:
+            for current_record in self.all_records:
+                if current_record['id'] not in matched:
+                    delete.append(current_record)
+
+        return create, update, delete
+
+    def syncRecords(self, create, update, delete, batch_size):
+        created = []
+        for i in range(0, len(create), batch_size):
+            result = self.createRecords(create[i:i + batch_size])
+            if isinstance(result, list):
+                created.extend(result)
+            else:
+                created.extend(create[i:i + batch_size])
+        for i in range(0, len(update), batch_size):
+            self.updateRecords(update[i:i + batch_size])
+        for i in range(0, len(delete), batch_size):
+            self.deleteRecords([record['id'] for record in delete[i:i + batch_size]])
+        return created
+
 
 # ===========================================
 # Module execution.
@@ -269,14 +422,19 @@ def main():
             domain=dict(required=True),
             state=dict(required=True, choices=['present', 'absent']),
             record_name=dict(required=False),
-            record_type=dict(required=False, choices=[
-                             'A', 'AAAA', 'CNAME', 'HTTPRED', 'MX', 'NS', 'PTR', 'SRV', 'TXT']),
+            record_type=dict(required=False, choices=RECORD_TYPES),
             record_value=dict(required=False),
             record_ttl=dict(required=False, default=1800, type='int'),
+            records=dict(required=False, type='list'),
+            purge=dict(required=False, default='no', type='bool'),
+            batch_size=dict(required=False, default=100, type='int'),
             validate_certs = dict(default='yes', type='bool'),
         ),
         required_together=(
             ['record_value', 'record_ttl', 'record_type']
+        ),
+        mutually_exclusive=(
+            ['records', 'record_name'],
         )
     )
 
@@ -290,6 +448,26 @@ def main():
     record_type = module.params["record_type"]
     record_value = module.params["record_value"]
 
+    # Synchronize a list of records with one zone fetch and batched changes
+    if module.params["records"] is not None:
+        desired = []
+        for record in module.params["records"]:
+            if not isinstance(record, dict):
+                module.fail_json(msg="invalid record %s: each record must be a dict" % (record,))
+            if record.get('type') not in RECORD_TYPES:
+                module.fail_json(msg="invalid record %s: type must be one of %s" % (record, ', '.join(RECORD_TYPES)))
+            try:
+                desired.append(DME.buildRecord(
+                    record['name'], record['type'], record['value'],
+                    record.get('ttl', module.params['record_ttl'])))
+            except (KeyError, ValueError), e:
+                module.fail_json(msg="invalid record %s: %s" % (record, e))
+
+        create, update, delete = DME.diffRecords(desired, state, module.params["purge"])
+        created = DME.syncRecords(create, update, delete, module.params["batch_size"])
+        module.exit_json(changed=bool(create or update or delete),
+                         result=dict(created=created, updated=update, deleted=delete))
+
     # Follow Keyword Controlled Behavior
     if record_name is None:
         domain_records = DME.getRecords()
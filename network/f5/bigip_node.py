@@ -94,7 +94,7 @@ options:
         aliases: []
     name:
         description:
-            - "Node name"
+            - "Node name. Required unless I(nodes) is given."
         required: false
         default: null
         choices: []
@@ -111,6 +111,14 @@ options:
         required: false
         default: null
         choices: []
+    nodes:
+        description:
+            - "List of nodes to manage in one run, each a dict with the key C(name) and optionally C(host), C(description), C(session_state) and C(monitor_state). Node settings default to the module options of the same name."
+            - "The node list and the addresses, descriptions and statuses of the requested nodes are read with a few list-valued calls and all creates and state changes are applied in single array calls."
+        version_added: "2.1"
+        required: false
+        default: null
+        choices: []
 '''
 
 EXAMPLES = '''
@@ -161,6 +169,20 @@ EXAMPLES = '''
       partition=matthite
       name="{{ ansible_default_ipv4["address"] }}"
 
+  - name: Register a list of nodes in one run
+    local_action:
+      module: bigip_node
+      server: lb.mydomain.com
+      user: admin
+      password: mysecret
+      state: present
+      partition: matthite
+      session_state: enabled
+      nodes:
+        - { name: web01, host: 10.0.0.1 }
+        - { name: web02, host: 10.0.0.2 }
+        - { name: web03, host: 10.0.0.3, description: "canary" }
+
 # The BIG-IP GUI doesn't map directly to the API calls for "Node ->
 # General Properties -> State". The following states map to API monitor
 # and session states.
@@ -260,20 +282,132 @@ def get_node_monitor_status(api, name):
     result = result.split("MONITOR_STATUS_")[-1].lower()
     return result
 
+def bulk_manage_nodes(module, api, state, wanted):
+    """
+    Reconcile a list of nodes against one snapshot of the node list, using
+    the list-valued NodeAddressV2 getters and setters
+    """
+    result = {'changed': False, 'created': [], 'modified': [], 'deleted': []}
+    NodeAddress = api.LocalLB.NodeAddressV2
+    current = set(NodeAddress.get_list())
+
+    if state == 'absent':
+        delete = [n for n in wanted if n in current]
+        if delete:
+            if not module.check_mode:
+                try:
+                    NodeAddress.delete_node_address(nodes=delete)
+                except bigsuds.OperationFailed, e:
+                    if "is referenced by a member of pool" not in str(e):
+                        raise
+                    # find out which nodes are still in use
+                    failed = []
+                    for name in delete:
+                        deleted, desc = delete_node_address(api, name)
+                        if not deleted:
+                            failed.append(name)
+                    if failed:
+                        module.fail_json(msg="unable to delete: node referenced by pool",
+                                         nodes=failed, changed=len(failed) < len(delete),
+                                         deleted=[n for n in delete if n not in failed])
+            result['changed'] = True
+            result['deleted'] = delete
+        return result
+
+    create = [n for n in wanted if n not in current]
+    existing = [n for n in wanted if n in current]
+
+    missing = [n for n in create if wanted[n].get('host') is None]
+    if missing:
+        module.fail_json(msg="host parameter required when " \
+                             "state=present and node does not exist",
+                         nodes=missing)
+
+    # read the attributes of the existing nodes, one call per attribute
+    nodes = [n for n in existing if wanted[n].get('host') is not None]
+    if nodes:
+        for name, address in zip(nodes, NodeAddress.get_address(nodes=nodes)):
+            if address != wanted[name]['host']:
+                module.fail_json(msg="Changing the node address is " \
+                                     "not supported by the API; " \
+                                     "delete and recreate the node.",
+                                 node=name)
+
+    changes = {'description': [], 'session_state': [], 'monitor_state': []}
+    nodes = [n for n in existing if wanted[n].get('description') is not None]
+    if nodes:
+        for name, description in zip(nodes, NodeAddress.get_description(nodes=nodes)):
+            if description != wanted[name]['description']:
+                changes['description'].append(name)
+    nodes = [n for n in existing if wanted[n].get('session_state') is not None]
+    if nodes:
+        for name, status in zip(nodes, NodeAddress.get_session_status(nodes=nodes)):
+            status = status.split("SESSION_STATUS_")[-1].lower()
+            session_state = wanted[name]['session_state']
+            if (session_state == 'enabled' and status == 'forced_disabled') or \
+               (session_state == 'disabled' and status != 'force_disabled'):
+                changes['session_state'].append(name)
+    nodes = [n for n in existing if wanted[n].get('monitor_state') is not None]
+    if nodes:
+        for name, status in zip(nodes, NodeAddress.get_monitor_status(nodes=nodes)):
+            status = status.split("MONITOR_STATUS_")[-1].lower()
+            monitor_state = wanted[name]['monitor_state']
+            if (monitor_state == 'enabled' and status == 'forced_down') or \
+               (monitor_state == 'disabled' and status != 'forced_down'):
+                changes['monitor_state'].append(name)
+
+    # new nodes get every requested attribute set
+    for name in create:
+        for attribute in changes:
+            if wanted[name].get(attribute) is not None:
+                changes[attribute].append(name)
+
+    if not module.check_mode:
+        if create:
+            NodeAddress.create(nodes=create,
+                               addresses=[wanted[n]['host'] for n in create],
+                               limits=[0] * len(create))
+        if changes['session_state']:
+            NodeAddress.set_session_enabled_state(
+                nodes=changes['session_state'],
+                states=["STATE_%s" % wanted[n]['session_state'].strip().upper()
+                        for n in changes['session_state']])
+        if changes['monitor_state']:
+            NodeAddress.set_monitor_state(
+                nodes=changes['monitor_state'],
+                states=["STATE_%s" % wanted[n]['monitor_state'].strip().upper()
+                        for n in changes['monitor_state']])
+        if changes['description']:
+            NodeAddress.set_description(
+                nodes=changes['description'],
+                descriptions=[wanted[n]['description']
+                              for n in changes['description']])
+
+    modified = set()
+    for nodes in changes.values():
+        modified.update([n for n in nodes if n not in create])
+    result['created'] = create
+    result['modified'] = sorted(modified)
+    result['changed'] = bool(create or modified)
+    return result
+
 
 def main():
     argument_spec=f5_argument_spec();
     argument_spec.update(dict(
             session_state = dict(type='str', choices=['enabled', 'disabled']),
             monitor_state = dict(type='str', choices=['enabled', 'disabled']),
-            name = dict(type='str', required=True),
+            name = dict(type='str'),
             host = dict(type='str', aliases=['address', 'ip']),
-            description = dict(type='str')
+            description = dict(type='str'),
+            nodes = dict(type='list')
         )
     )
 
     module = AnsibleModule(
         argument_spec = argument_spec,
+        required_one_of = [['name', 'nodes']],
+        mutually_exclusive = [['name', 'nodes'], ['host', 'nodes']],
         supports_check_mode=True
     )
 
@@ -283,16 +417,34 @@ def main():
     monitor_state = module.params['monitor_state']
     host = module.params['host']
     name = module.params['name']
-    address = fq_name(partition, name)
     description = module.params['description']
+    nodes = module.params['nodes']
 
     if state == 'absent' and host is not None:
         module.fail_json(msg="host parameter invalid when state=absent")
 
+    if nodes is not None:
+        wanted = {}
+        for node in nodes:
+            if not node.get('name'):
+                module.fail_json(msg="name must be supplied for each node")
+            if state == 'absent' and node.get('host') is not None:
+                module.fail_json(msg="host parameter invalid when state=absent")
+            settings = {'host': node.get('host')}
+            for attribute in ['description', 'session_state', 'monitor_state']:
+                settings[attribute] = node.get(attribute, module.params[attribute])
+            wanted[fq_name(partition, node['name'])] = settings
+    else:
+        address = fq_name(partition, name)
+
     try:
         api = bigip_api(server, user, password)
         result = {'changed': False}  # default
 
+        if nodes is not None:
+            result = bulk_manage_nodes(module, api, state, wanted)
+            module.exit_json(**result)
+
         if state == 'absent':
             if node_exists(api, address):
                 if not module.check_mode:
@@ -87,12 +87,27 @@ options:
     host:
         description:
             - Pool member IP
-        required: true
+            - Required unless I(members) is given.
+        required: false
         aliases: ['address', 'name']
     port:
         description:
             - Pool member port
-        required: true
+            - Required unless I(members) is given.
+        required: false
+    members:
+        description:
+            - List of pool members to manage in one run, each a dict with the
+              keys C(host) and C(port) and optionally C(connection_limit),
+              C(description), C(rate_limit), C(ratio), C(session_state) and
+              C(monitor_state). Member settings default to the module options
+              of the same name.
+            - The pool's members and their attributes are read with a few
+              array-valued iControl calls and all changes are written back in
+              batched calls.
+        version_added: "2.1"
+        required: false
+        default: null
     connection_limit:
         description:
             - Pool member connection limit. Setting this to 0 disables the limit.
@@ -166,6 +181,21 @@ EXAMPLES = '''
       host="{{ ansible_default_ipv4["address"] }}"
       port=80
 
+  - name: Add a list of pool members in one run
+    local_action:
+      module: bigip_pool_member
+      server: lb.mydomain.com
+      user: admin
+      password: mysecret
+      state: present
+      pool: matthite-pool
+      partition: matthite
+      ratio: 1
+      members:
+        - { host: 10.0.0.1, port: 80 }
+        - { host: 10.0.0.2, port: 80, ratio: 2 }
+        - { host: 10.0.0.3, port: 8080, description: "canary" }
+
 
   # The BIG-IP GUI doesn't map directly to the API calls for "Pool ->
   # Members -> State". The following states map to API monitor
@@ -305,14 +335,126 @@ def get_member_monitor_status(api, pool, address, port):
     result = result.split("MONITOR_STATUS_")[-1].lower()
     return result
 
+# Attributes managed for pool members:
+# name -> (getter, setter, setter value keyword)
+MEMBER_ATTRIBUTES = {
+    'connection_limit': ('get_member_connection_limit', 'set_member_connection_limit', 'limits'),
+    'description': ('get_member_description', 'set_member_description', 'descriptions'),
+    'rate_limit': ('get_member_rate_limit', 'set_member_rate_limit', 'limits'),
+    'ratio': ('get_member_ratio', 'set_member_ratio', 'ratios'),
+}
+
+def get_pool_members(api, pool):
+    members = api.LocalLB.Pool.get_member_v2(pool_names=[pool])[0]
+    return [(m['address'], int(m['port'])) for m in members]
+
+def _members(keys):
+    return [{'address': address, 'port': port} for address, port in keys]
+
+def bulk_manage_members(module, api, pool, state, wanted):
+    """
+    Reconcile a list of pool members against a single snapshot of the pool,
+    reading and writing attributes with array-valued iControl calls
+    """
+    result = {'changed': False, 'added': [], 'modified': [], 'removed': []}
+    current = set(get_pool_members(api, pool))
+
+    if state == 'absent':
+        remove = [k for k in wanted if k in current]
+        if remove:
+            if not module.check_mode:
+                api.LocalLB.Pool.remove_member_v2(pool_names=[pool], members=[_members(remove)])
+                nodes = list(set([address for address, port in remove]))
+                try:
+                    api.LocalLB.NodeAddressV2.delete_node_address(nodes=nodes)
+                except bigsuds.OperationFailed, e:
+                    if "is referenced by a member of pool" not in str(e):
+                        raise
+                    # some nodes are still in use, delete the others one by one
+                    for node in nodes:
+                        delete_node_address(api, node)
+            result['changed'] = True
+            result['removed'] = ["%s:%s" % k for k in remove]
+        return result
+
+    add = [k for k in wanted if k not in current]
+    existing = [k for k in wanted if k in current]
+
+    # read every requested attribute of the existing members in one call each
+    actual = {}
+    for name, (getter, setter, keyword) in MEMBER_ATTRIBUTES.items():
+        members = [k for k in existing if wanted[k].get(name) is not None]
+        if members:
+            values = getattr(api.LocalLB.Pool, getter)(pool_names=[pool], members=[_members(members)])[0]
+            for k, value in zip(members, values):
+                actual.setdefault(k, {})[name] = value
+    members = [k for k in existing if wanted[k].get('session_state') is not None]
+    if members:
+        values = api.LocalLB.Pool.get_member_session_status(pool_names=[pool], members=[_members(members)])[0]
+        for k, value in zip(members, values):
+            actual.setdefault(k, {})['session_state'] = value.split("SESSION_STATUS_")[-1].lower()
+    members = [k for k in existing if wanted[k].get('monitor_state') is not None]
+    if members:
+        values = api.LocalLB.Pool.get_member_monitor_status(pool_names=[pool], members=[_members(members)])[0]
+        for k, value in zip(members, values):
+            actual.setdefault(k, {})['monitor_state'] = value.split("MONITOR_STATUS_")[-1].lower()
+
+    # compute the changes locally
+    changes = {}
+    for k in add + existing:
+        settings = wanted[k]
+        have = actual.get(k, {})
+        for name in MEMBER_ATTRIBUTES:
+            if settings.get(name) is not None and (k in add or settings[name] != have.get(name)):
+                changes.setdefault(name, []).append(k)
+        session_state = settings.get('session_state')
+        if session_state is not None:
+            session_status = have.get('session_state')
+            if k in add or \
+               (session_state == 'enabled' and session_status == 'forced_disabled') or \
+               (session_state == 'disabled' and session_status != 'force_disabled'):
+                changes.setdefault('session_state', []).append(k)
+        monitor_state = settings.get('monitor_state')
+        if monitor_state is not None:
+            monitor_status = have.get('monitor_state')
+            if k in add or \
+               (monitor_state == 'enabled' and monitor_status == 'forced_down') or \
+               (monitor_state == 'disabled' and monitor_status != 'forced_down'):
+                changes.setdefault('monitor_state', []).append(k)
+
+    # write all changes back in one call per attribute
+    if not module.check_mode:
+        if add:
+            api.LocalLB.Pool.add_member_v2(pool_names=[pool], members=[_members(add)])
+        for name, members in changes.items():
+            if name == 'session_state':
+                states = ["STATE_%s" % wanted[k][name].strip().upper() for k in members]
+                api.LocalLB.Pool.set_member_session_enabled_state(pool_names=[pool], members=[_members(members)], session_states=[states])
+            elif name == 'monitor_state':
+                states = ["STATE_%s" % wanted[k][name].strip().upper() for k in members]
+                api.LocalLB.Pool.set_member_monitor_state(pool_names=[pool], members=[_members(members)], monitor_states=[states])
+            else:
+                getter, setter, keyword = MEMBER_ATTRIBUTES[name]
+                values = [wanted[k][name] for k in members]
+                getattr(api.LocalLB.Pool, setter)(**{'pool_names': [pool], 'members': [_members(members)], keyword: [values]})
+
+    modified = set()
+    for members in changes.values():
+        modified.update([k for k in members if k not in add])
+    result['added'] = ["%s:%s" % k for k in add]
+    result['modified'] = ["%s:%s" % k for k in sorted(modified)]
+    result['changed'] = bool(add or modified)
+    return result
+
 def main():
     argument_spec = f5_argument_spec();
     argument_spec.update(dict(
             session_state = dict(type='str', choices=['enabled', 'disabled']),
             monitor_state = dict(type='str', choices=['enabled', 'disabled']),
             pool = dict(type='str', required=True),
-            host = dict(type='str', required=True, aliases=['address', 'name']),
-            port = dict(type='int', required=True),
+            host = dict(type='str', aliases=['address', 'name']),
+            port = dict(type='int'),
+            members = dict(type='list'),
             connection_limit = dict(type='int'),
             description = dict(type='str'),
             rate_limit = dict(type='int'),
@@ -322,6 +464,7 @@ def main():
 
     module = AnsibleModule(
         argument_spec = argument_spec,
+        mutually_exclusive = [['members', 'host'], ['members', 'port']],
         supports_check_mode=True
     )
 
@@ -336,15 +479,31 @@ def main():
     host = module.params['host']
     address = fq_name(partition, host)
     port = module.params['port']
+    members = module.params['members']
 
 
     # sanity check user supplied values
 
-    if (host and not port) or (port and not host):
-        module.fail_json(msg="both host and port must be supplied")
-
-    if 1 > port > 65535:
-        module.fail_json(msg="valid ports must be in range 1 - 65535")
+    if members is not None:
+        wanted = {}
+        for member in members:
+            if not member.get('host') or not member.get('port'):
+                module.fail_json(msg="both host and port must be supplied for each member")
+            member_port = int(member['port'])
+            if not 1 <= member_port <= 65535:
+                module.fail_json(msg="valid ports must be in range 1 - 65535")
+            settings = {}
+            for name in ['connection_limit', 'description', 'rate_limit', 'ratio', 'session_state', 'monitor_state']:
+                settings[name] = member.get(name, module.params[name])
+                if settings[name] is not None and name in ['connection_limit', 'rate_limit', 'ratio']:
+                    settings[name] = int(settings[name])
+            wanted[(fq_name(partition, member['host']), member_port)] = settings
+    else:
+        if not host or not port:
+            module.fail_json(msg="both host and port must be supplied")
+
+        if 1 > port > 65535:
+            module.fail_json(msg="valid ports must be in range 1 - 65535")
 
     try:
         api = bigip_api(server, user, password)
@@ -352,6 +511,10 @@ def main():
             module.fail_json(msg="pool %s does not exist" % pool)
         result = {'changed': False}  # default
 
+        if members is not None:
+            result = bulk_manage_members(module, api, pool, state, wanted)
+            module.exit_json(**result)
+
         if state == 'absent':
             if member_exists(api, pool, address, port):
                 if not module.check_mode:
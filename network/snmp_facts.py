@@ -31,7 +31,38 @@ options:
     host:
         description:
             - Set to target snmp server (normally {{inventory_hostname}})
-        required: true
+            - Either I(host) or I(hosts) is required.
+        required: false
+    hosts:
+        version_added: "2.1"
+        description:
+            - List of snmp servers to poll concurrently. Entries may be given
+              as C(host:port). The facts of every target are returned in
+              C(ansible_snmp_targets), keyed by the target as given.
+        required: false
+    port:
+        version_added: "2.1"
+        description:
+            - UDP port of the snmp servers.
+        required: false
+        default: 161
+    max_repetitions:
+        version_added: "2.1"
+        description:
+            - Number of rows requested per GETBULK request when walking
+              the MIB tables. Higher values mean fewer round-trips on
+              devices with many interfaces.
+        required: false
+        default: 25
+    tables:
+        version_added: "2.1"
+        description:
+            - MIB tables to walk. C(interfaces) covers the IF-MIB
+              interface table and interface aliases, C(ipv4) the IP-MIB
+              address table.
+        choices: [ 'interfaces', 'ipv4' ]
+        required: false
+        default: [ 'interfaces', 'ipv4' ]
     version:
         description:
             - SNMP Version to use, v2/v2c or v3
@@ -86,6 +117,16 @@ EXAMPLES = '''
     authkey=abc12345
     privkey=def6789
   delegate_to: localhost
+
+# Poll the interface tables of many switches concurrently
+- snmp_facts:
+    hosts: "{{ groups['switches'] }}"
+    version: v2c
+    community: public
+    tables: [ 'interfaces' ]
+    max_repetitions: 50
+  run_once: true
+  delegate_to: localhost
 '''
 
 from ansible.module_utils.basic import *
@@ -93,6 +134,7 @@ from collections import defaultdict
 
 try:
     from pysnmp.entity.rfc3413.oneliner import cmdgen
+    from pysnmp.proto import rfc1905
     has_pysnmp = True
 except:
     has_pysnmp = False
@@ -127,7 +169,22 @@ class DefineOid(object):
         self.ipAdEntAddr    = dp + "1.3.6.1.2.1.4.20.1.1"
         self.ipAdEntIfIndex = dp + "1.3.6.1.2.1.4.20.1.2"
         self.ipAdEntNetMask = dp + "1.3.6.1.2.1.4.20.1.3"
-        
+
+    def system(self):
+        return [self.sysDescr, self.sysObjectId, self.sysUpTime,
+                self.sysContact, self.sysName, self.sysLocation]
+
+    def tables(self):
+        # Columns walked for each of the selectable MIB tables
+        return {
+            'interfaces': [self.ifIndex, self.ifDescr, self.ifMtu,
+                           self.ifSpeed, self.ifPhysAddress,
+                           self.ifAdminStatus, self.ifOperStatus,
+                           self.ifAlias],
+            'ipv4': [self.ipAdEntAddr, self.ipAdEntIfIndex,
+                     self.ipAdEntNetMask],
+        }
+
 
 def decode_hex(hexstring):
  
@@ -173,10 +230,176 @@ def lookup_operstatus(int_operstatus):
     else:
         return ""
 
+def get_callback(sendRequestHandle, errorIndication, errorStatus, errorIndex,
+                 varBinds, cbCtx):
+    collected = cbCtx
+    if errorIndication:
+        collected['error'] = str(errorIndication)
+        return
+    for oid, val in varBinds:
+        collected['varbinds'][oid.prettyPrint()] = val.prettyPrint()
+
+def walk_callback(sendRequestHandle, errorIndication, errorStatus, errorIndex,
+                  varBindTable, cbCtx):
+    collected, columns = cbCtx
+    if errorIndication:
+        collected['error'] = str(errorIndication)
+        return False
+    if errorStatus:
+        collected['error'] = errorStatus.prettyPrint()
+        return False
+
+    # Keep walking as long as a row brought a new value inside one of the
+    # requested columns. Columns which ran out return OIDs of the following
+    # table, which are ignored.
+    more = False
+    for varBindRow in varBindTable:
+        for oid, val in varBindRow:
+            if val is None or isinstance(val, rfc1905.EndOfMibView):
+                continue
+            current_oid = oid.prettyPrint()
+            if current_oid in collected['varbinds']:
+                continue
+            for column in columns:
+                if current_oid.startswith(column + '.'):
+                    collected['varbinds'][current_oid] = val.prettyPrint()
+                    more = True
+                    break
+    return more
+
+def collect(snmp_auth, targets, max_repetitions, tables):
+    """
+    Poll all targets over a single asynchronous dispatcher, walking the
+    MIB tables with GETBULK, and return the raw values per target
+    """
+
+    p = DefineOid(dotprefix=True)
+    v = DefineOid(dotprefix=False)
+    table_columns = v.tables()
+
+    cmdGen = cmdgen.AsynCommandGenerator()
+    collected = {}
+
+    for target, (host, port) in targets.items():
+        collected[target] = {'varbinds': {}, 'error': None}
+        try:
+            transport = cmdgen.UdpTransportTarget((host, port))
+        except Exception, e:
+            collected[target]['error'] = str(e)
+            continue
+
+        cmdGen.asyncGetCmd(
+            snmp_auth,
+            transport,
+            tuple([cmdgen.MibVariable(oid,) for oid in p.system()]),
+            (get_callback, collected[target]),
+        )
+
+        for table in tables:
+            columns = table_columns[table]
+            cmdGen.asyncBulkCmd(
+                snmp_auth,
+                transport,
+                0, max_repetitions,
+                tuple([cmdgen.MibVariable('.' + oid,) for oid in columns]),
+                (walk_callback, (collected[target], columns)),
+            )
+
+    cmdGen.snmpEngine.transportDispatcher.runDispatcher()
+
+    return collected
+
+def build_facts(varbinds):
+    # Use v without a prefix to use with return values
+    v = DefineOid(dotprefix=False)
+
+    Tree = lambda: defaultdict(Tree)
+
+    results = Tree()
+
+    system = {
+        v.sysDescr: 'ansible_sysdescr',
+        v.sysObjectId: 'ansible_sysobjectid',
+        v.sysUpTime: 'ansible_sysuptime',
+        v.sysContact: 'ansible_syscontact',
+        v.sysName: 'ansible_sysname',
+        v.sysLocation: 'ansible_syslocation',
+    }
+    for oid, fact in system.items():
+        if oid in varbinds:
+            results[fact] = varbinds[oid]
+    if 'ansible_sysdescr' in results:
+        results['ansible_sysdescr'] = decode_hex(results['ansible_sysdescr'])
+
+    all_ipv4_addresses = []
+    ipv4_networks = Tree()
+
+    for current_oid in sorted(varbinds):
+        current_val = varbinds[current_oid]
+        column, index = current_oid.rsplit('.', 1)
+        if column == v.ifIndex:
+            ifIndex = int(index)
+            results['ansible_interfaces'][ifIndex]['ifindex'] = current_val
+        elif column == v.ifDescr:
+            ifIndex = int(index)
+            results['ansible_interfaces'][ifIndex]['name'] = current_val
+        elif column == v.ifMtu:
+            ifIndex = int(index)
+            results['ansible_interfaces'][ifIndex]['mtu'] = current_val
+        elif column == v.ifSpeed:
+            ifIndex = int(index)
+            results['ansible_interfaces'][ifIndex]['speed'] = current_val
+        elif column == v.ifPhysAddress:
+            ifIndex = int(index)
+            results['ansible_interfaces'][ifIndex]['mac'] = decode_mac(current_val)
+        elif column == v.ifAdminStatus:
+            ifIndex = int(index)
+            results['ansible_interfaces'][ifIndex]['adminstatus'] = lookup_adminstatus(int(current_val))
+        elif column == v.ifOperStatus:
+            ifIndex = int(index)
+            results['ansible_interfaces'][ifIndex]['operstatus'] = lookup_operstatus(int(current_val))
+        elif column == v.ifAlias:
+            ifIndex = int(index)
+            results['ansible_interfaces'][ifIndex]['description'] = current_val
+        else:
+            for ip_column, key in ((v.ipAdEntAddr, 'address'),
+                                   (v.ipAdEntIfIndex, 'interface'),
+                                   (v.ipAdEntNetMask, 'netmask')):
+                if current_oid.startswith(ip_column + '.'):
+                    curIP = current_oid[len(ip_column) + 1:]
+                    ipv4_networks[curIP][key] = current_val
+                    if key == 'address':
+                        all_ipv4_addresses.append(current_val)
+                    break
+
+    interface_to_ipv4 = {}
+    for ipv4_network in ipv4_networks:
+        current_interface = ipv4_networks[ipv4_network]['interface']
+        current_network = {
+                            'address':  ipv4_networks[ipv4_network]['address'],
+                            'netmask':  ipv4_networks[ipv4_network]['netmask']
+                          }
+        if not current_interface in interface_to_ipv4:
+            interface_to_ipv4[current_interface] = []
+            interface_to_ipv4[current_interface].append(current_network)
+        else:
+            interface_to_ipv4[current_interface].append(current_network)
+
+    for interface in interface_to_ipv4:
+        results['ansible_interfaces'][int(interface)]['ipv4'] = interface_to_ipv4[interface]
+
+    results['ansible_all_ipv4_addresses'] = all_ipv4_addresses
+
+    return results
+
 def main():
     module = AnsibleModule(
         argument_spec=dict(
-            host=dict(required=True),
+            host=dict(required=False),
+            hosts=dict(required=False, type='list'),
+            port=dict(required=False, default=161, type='int'),
+            max_repetitions=dict(required=False, default=25, type='int'),
+            tables=dict(required=False, default=['interfaces', 'ipv4'], type='list'),
             version=dict(required=True, choices=['v2', 'v2c', 'v3']),
             community=dict(required=False, default=False),
             username=dict(required=False),
@@ -187,6 +410,8 @@ def main():
             privkey=dict(required=False),
             removeplaceholder=dict(required=False)),
             required_together = ( ['username','level','integrity','authkey'],['privacy','privkey'],),
+            required_one_of = ( ['host','hosts'], ),
+            mutually_exclusive = ( ['host','hosts'], ),
         supports_check_mode=False)
 
     m_args = module.params
@@ -194,7 +419,9 @@ def main():
     if not has_pysnmp:
         module.fail_json(msg='Missing required pysnmp module (check docs)')
 
-    cmdGen = cmdgen.CommandGenerator()
+    for table in m_args['tables']:
+        if table not in DefineOid().tables():
+            module.fail_json(msg='Unknown table %s, choose from: %s' % (table, ', '.join(DefineOid().tables())))
 
     # Verify that we receive a community when using snmp v2
     if m_args['version'] == "v2" or m_args['version'] == "v2c":
@@ -231,136 +458,38 @@ def main():
     else:
         snmp_auth = cmdgen.UsmUserData(m_args['username'], authKey=m_args['authkey'], privKey=m_args['privkey'], authProtocol=integrity_proto, privProtocol=privacy_proto)
 
-    # Use p to prefix OIDs with a dot for polling
-    p = DefineOid(dotprefix=True)
-    # Use v without a prefix to use with return values
-    v = DefineOid(dotprefix=False)
-
-    Tree = lambda: defaultdict(Tree)
-                               
-    results = Tree()
-            
-    errorIndication, errorStatus, errorIndex, varBinds = cmdGen.getCmd(
-        snmp_auth,
-        cmdgen.UdpTransportTarget((m_args['host'], 161)),
-        cmdgen.MibVariable(p.sysDescr,),
-        cmdgen.MibVariable(p.sysObjectId,), 
-        cmdgen.MibVariable(p.sysUpTime,),
-        cmdgen.MibVariable(p.sysContact,), 
-        cmdgen.MibVariable(p.sysName,),
-        cmdgen.MibVariable(p.sysLocation,),
-    )
-
-
-    if errorIndication:
-        module.fail_json(msg=str(errorIndication))
-
-    for oid, val in varBinds:
-        current_oid = oid.prettyPrint()
-        current_val = val.prettyPrint()
-        if current_oid == v.sysDescr:
-            results['ansible_sysdescr'] = decode_hex(current_val)
-        elif current_oid == v.sysObjectId:
-            results['ansible_sysobjectid'] = current_val
-        elif current_oid == v.sysUpTime:
-            results['ansible_sysuptime'] = current_val
-        elif current_oid == v.sysContact:
-            results['ansible_syscontact'] = current_val
-        elif current_oid == v.sysName:
-            results['ansible_sysname'] = current_val
-        elif current_oid == v.sysLocation:
-            results['ansible_syslocation'] = current_val
-
-    errorIndication, errorStatus, errorIndex, varTable = cmdGen.nextCmd(
-        snmp_auth,
-        cmdgen.UdpTransportTarget((m_args['host'], 161)), 
-        cmdgen.MibVariable(p.ifIndex,),
-        cmdgen.MibVariable(p.ifDescr,),
-        cmdgen.MibVariable(p.ifMtu,),
-        cmdgen.MibVariable(p.ifSpeed,),
-        cmdgen.MibVariable(p.ifPhysAddress,),
-        cmdgen.MibVariable(p.ifAdminStatus,),
-        cmdgen.MibVariable(p.ifOperStatus,),
-        cmdgen.MibVariable(p.ipAdEntAddr,), 
-        cmdgen.MibVariable(p.ipAdEntIfIndex,), 
-        cmdgen.MibVariable(p.ipAdEntNetMask,), 
-
-        cmdgen.MibVariable(p.ifAlias,),
-    )
- 
-
-    if errorIndication:
-        module.fail_json(msg=str(errorIndication))
-
-    interface_indexes = []
-    
-    all_ipv4_addresses = []     
-    ipv4_networks = Tree()
-
-    for varBinds in varTable:
-        for oid, val in varBinds:
-            current_oid = oid.prettyPrint()
-            current_val = val.prettyPrint()
-            if v.ifIndex in current_oid:
-                ifIndex = int(current_oid.rsplit('.', 1)[-1])
-                results['ansible_interfaces'][ifIndex]['ifindex'] = current_val
-                interface_indexes.append(ifIndex)
-            if v.ifDescr in current_oid:
-                ifIndex = int(current_oid.rsplit('.', 1)[-1])
-                results['ansible_interfaces'][ifIndex]['name'] = current_val
-            if v.ifMtu in current_oid:
-                ifIndex = int(current_oid.rsplit('.', 1)[-1])
-                results['ansible_interfaces'][ifIndex]['mtu'] = current_val
-            if v.ifMtu in current_oid:
-                ifIndex = int(current_oid.rsplit('.', 1)[-1])
-                results['ansible_interfaces'][ifIndex]['speed'] = current_val
-            if v.ifPhysAddress in current_oid:
-                ifIndex = int(current_oid.rsplit('.', 1)[-1])
-                results['ansible_interfaces'][ifIndex]['mac'] = decode_mac(current_val)
-            if v.ifAdminStatus in current_oid:
-                ifIndex = int(current_oid.rsplit('.', 1)[-1])
-                results['ansible_interfaces'][ifIndex]['adminstatus'] = lookup_adminstatus(int(current_val))
-            if v.ifOperStatus in current_oid:
-                ifIndex = int(current_oid.rsplit('.', 1)[-1])
-                results['ansible_interfaces'][ifIndex]['operstatus'] = lookup_operstatus(int(current_val))
-            if v.ipAdEntAddr in current_oid:
-                curIPList = current_oid.rsplit('.', 4)[-4:]
-                curIP = ".".join(curIPList)
-                ipv4_networks[curIP]['address'] = current_val
-                all_ipv4_addresses.append(current_val)
-            if v.ipAdEntIfIndex in current_oid:
-                curIPList = current_oid.rsplit('.', 4)[-4:]
-                curIP = ".".join(curIPList)
-                ipv4_networks[curIP]['interface'] = current_val
-            if v.ipAdEntNetMask in current_oid:
-                curIPList = current_oid.rsplit('.', 4)[-4:]
-                curIP = ".".join(curIPList)
-                ipv4_networks[curIP]['netmask'] = current_val
-
-            if v.ifAlias in current_oid:
-                ifIndex = int(current_oid.rsplit('.', 1)[-1])
-                results['ansible_interfaces'][ifIndex]['description'] = current_val
-
-    interface_to_ipv4 = {}
-    for ipv4_network in ipv4_networks:
-        current_interface = ipv4_networks[ipv4_network]['interface']
-        current_network = {
-                            'address':  ipv4_networks[ipv4_network]['address'],
-                            'netmask':  ipv4_networks[ipv4_network]['netmask']
-                          }
-        if not current_interface in interface_to_ipv4:
-            interface_to_ipv4[current_interface] = []
-            interface_to_ipv4[current_interface].append(current_network)
+    if m_args['hosts']:
+        hosts = m_args['hosts']
+    else:
+        hosts = [m_args['host']]
+
+    targets = {}
+    for target in hosts:
+        host, port = target, m_args['port']
+        if ':' in target:
+            host, port = target.rsplit(':', 1)
+            port = int(port)
+        targets[target] = (host, port)
+
+    collected = collect(snmp_auth, targets, m_args['max_repetitions'], m_args['tables'])
+
+    if m_args['host']:
+        if collected[m_args['host']]['error']:
+            module.fail_json(msg=collected[m_args['host']]['error'])
+        module.exit_json(ansible_facts=build_facts(collected[m_args['host']]['varbinds']))
+
+    results = {}
+    failed = {}
+    for target in collected:
+        if collected[target]['error']:
+            failed[target] = collected[target]['error']
         else:
-            interface_to_ipv4[current_interface].append(current_network)
+            results[target] = build_facts(collected[target]['varbinds'])
 
-    for interface in interface_to_ipv4:
-        results['ansible_interfaces'][int(interface)]['ipv4'] = interface_to_ipv4[interface]
+    if not results:
+        module.fail_json(msg='No target could be polled', failed_targets=failed)
 
-    results['ansible_all_ipv4_addresses'] = all_ipv4_addresses
- 
-    module.exit_json(ansible_facts=results)
-    
+    module.exit_json(ansible_facts=dict(ansible_snmp_targets=results), failed_targets=failed)
 
-main()
 
+main()
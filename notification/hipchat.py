@@ -30,6 +30,8 @@ options:
   room:
     description:
       - ID or name of the room.
+      - Since version 2.1 a list of rooms may be given; the message is then sent to all of them
+        concurrently and the delivery status and latency of each room is returned in C(results).
     required: true
   from:
     description:
@@ -74,6 +76,12 @@ options:
     required: false
     default: 'https://api.hipchat.com/v1'
     version_added: 1.6.0
+  concurrency:
+    description:
+      - Maximum number of rooms from I(room) that are notified at the same time.
+    required: false
+    default: 4
+    version_added: 2.1
 
 
 requirements: [ ]
@@ -90,13 +98,22 @@ EXAMPLES = '''
     token: OAUTH2_TOKEN
     room: notify
     msg: "Ansible task finished"
+
+# Notify several rooms at once
+- hipchat:
+    api: "https://api.hipchat.com/v2/"
+    token: OAUTH2_TOKEN
+    room: [ops, deploys, qa]
+    msg: "Ansible task finished"
 '''
 
 # ===========================================
 # HipChat module specific support methods.
 #
 
+import time
 import urllib
+from multiprocessing.pool import ThreadPool
 
 DEFAULT_URI = "https://api.hipchat.com/v1"
 
@@ -129,7 +146,7 @@ def send_msg_v1(module, token, room, msg_from, msg, msg_format='text',
     if info['status'] == 200:
         return response.read()
     else:
-        module.fail_json(msg="failed to send message, return status=%s" % str(info['status']))
+        raise Exception("failed to send message, return status=%s" % str(info['status']))
 
 
 def send_msg_v2(module, token, room, msg_from, msg, msg_format='text',
@@ -158,7 +175,26 @@ def send_msg_v2(module, token, room, msg_from, msg, msg_format='text',
     if info['status'] == 200:
         return response.read()
     else:
-        module.fail_json(msg="failed to send message, return status=%s" % str(info['status']))
+        raise Exception("failed to send message, return status=%s" % str(info['status']))
+
+
+def send_msg_rooms(module, rooms, send_msg, concurrency=4):
+    '''sending a message to several rooms in parallel, send_msg(room) sends to one'''
+
+    def send(room):
+        start = time.time()
+        result = dict(recipient=room, delivered=True)
+        try:
+            send_msg(room)
+        except Exception, e:
+            result.update(delivered=False, error=str(e))
+        result['latency'] = round(time.time() - start, 3)
+        return result
+
+    pool = ThreadPool(max(1, min(concurrency, len(rooms))))
+    results = pool.map(send, rooms)
+    pool.close()
+    return results
 
 
 # ===========================================
@@ -170,7 +206,7 @@ def main():
     module = AnsibleModule(
         argument_spec=dict(
             token=dict(required=True),
-            room=dict(required=True),
+            room=dict(required=True, type='list'),
             msg=dict(required=True),
             msg_from=dict(default="Ansible", aliases=['from']),
             color=dict(default="yellow", choices=["yellow", "red", "green",
@@ -179,12 +215,13 @@ def main():
             notify=dict(default=True, type='bool'),
             validate_certs=dict(default='yes', type='bool'),
             api=dict(default=DEFAULT_URI),
+            concurrency=dict(default=4, type='int'),
         ),
         supports_check_mode=True
     )
 
     token = module.params["token"]
-    room = module.params["room"]
+    rooms = [str(room) for room in module.params["room"]]
     msg = module.params["msg"]
     msg_from = module.params["msg_from"]
     color = module.params["color"]
@@ -192,11 +229,26 @@ def main():
     notify = module.params["notify"]
     api = module.params["api"]
 
+    if api.find('/v2') != -1:
+        send_msg = send_msg_v2
+    else:
+        send_msg = send_msg_v1
+
+    if len(rooms) > 1:
+        if module.check_mode:
+            # In check mode, exit before actually sending the message
+            module.exit_json(changed=False)
+        results = send_msg_rooms(module, rooms,
+                                 lambda room: send_msg(module, token, room, msg_from, msg, msg_format, color, notify, api),
+                                 module.params["concurrency"])
+        failed = [r['recipient'] for r in results if not r['delivered']]
+        if failed:
+            module.fail_json(msg="unable to send msg to %s" % ', '.join(failed), results=results)
+        module.exit_json(changed=True, room=rooms, msg_from=msg_from, msg=msg, results=results)
+
+    room = rooms[0]
     try:
-        if api.find('/v2') != -1:
-            send_msg_v2(module, token, room, msg_from, msg, msg_format, color, notify, api)
-        else:
-            send_msg_v1(module, token, room, msg_from, msg, msg_format, color, notify, api)
+        send_msg(module, token, room, msg_from, msg, msg_format, color, notify, api)
     except Exception, e:
         module.fail_json(msg="unable to send msg: %s" % e)
 
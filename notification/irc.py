@@ -44,9 +44,15 @@ options:
     default: ansible
   msg:
     description:
-      - The message body.
-    required: true
+      - The message body. One of msg or messages needs to be set.
+    required: false
+    default: null
+  messages:
+    description:
+      - A list of message bodies, sent in order in the same session. One of msg or messages needs to be set.
+    required: false
     default: null
+    version_added: "2.1"
   topic:
     description:
       - Set the channel topic
@@ -62,6 +68,7 @@ options:
   channel:
     description:
       - Channel name.  One of nick_to or channel needs to be set.  When both are set, the message will be sent to both of them.
+      - Since version 2.1 a list of channels may be given; they are all joined in the same session.
     required: true
   nick_to:
     description:
@@ -107,6 +114,15 @@ EXAMPLES = '''
                 color=red
                 nick=ansibleIRC
 
+- local_action:
+    module: irc
+    server: irc.example.net
+    channel: [ "#deploys", "#ops" ]
+    messages:
+      - "Deploy of {{ version }} started"
+      - "Deploy of {{ version }} finished"
+    nick: ansibleIRC
+
 - local_action: irc port=6669
                 server="irc.example.net"
                 channel="#t1"
@@ -121,15 +137,83 @@ EXAMPLES = '''
 #
 
 import re
+import select
 import socket
 import ssl
 
 from time import sleep
 
+# Client side flood control: a burst of FLOOD_BURST lines may be sent at
+# once, after which lines are paced at one per FLOOD_INTERVAL seconds, the
+# rate most servers accept before applying their own penalties.
+FLOOD_BURST = 5
+FLOOD_INTERVAL = 1.0
+
+# numeric replies that mean a channel cannot be joined
+JOIN_ERRORS = ['403', '405', '471', '473', '474', '475', '477']
+
+
+class IrcConnection(object):
+    '''line buffered IRC connection, reading with select()'''
+
+    def __init__(self, server, port, timeout=30, use_ssl=False):
+        self.timeout = timeout
+        self.sock = socket.create_connection((server, int(port)), timeout)
+        if use_ssl:
+            self.sock = ssl.wrap_socket(self.sock)
+        self.buffer = ''
+        self.closed = False
+        self.tokens = FLOOD_BURST
+        self.last_send = time.time()
+
+    def send(self, line):
+        now = time.time()
+        self.tokens = min(FLOOD_BURST, self.tokens + (now - self.last_send) / FLOOD_INTERVAL)
+        self.last_send = now
+        if self.tokens < 1:
+            sleep((1 - self.tokens) * FLOOD_INTERVAL)
+            self.tokens = 1
+            self.last_send = time.time()
+        self.tokens -= 1
+        self.sock.sendall(line + '\r\n')
+
+    def lines(self, deadline):
+        '''yield the lines received until deadline, answering PINGs'''
+        while True:
+            while '\n' in self.buffer:
+                line, self.buffer = self.buffer.split('\n', 1)
+                line = line.rstrip('\r')
+                if line.startswith('PING '):
+                    self.sock.sendall('PONG %s\r\n' % line[5:])
+                    continue
+                yield line
+            if self.closed:
+                return
+            remaining = deadline - time.time()
+            if remaining <= 0:
+                return
+            # data already decrypted by the SSL layer does not wake select()
+            pending = getattr(self.sock, 'pending', None)
+            if not (pending and pending()):
+                readable, _, _ = select.select([self.sock], [], [], remaining)
+                if not readable:
+                    return
+            data = self.sock.recv(4096)
+            if not data:
+                self.closed = True
+            self.buffer += data
 
-def send_msg(msg, server='localhost', port='6667', channel=None, nick_to=[], key=None, topic=None,
+    def close(self):
+        '''wait for the server to close the link after QUIT'''
+        for line in self.lines(time.time() + self.timeout):
+            if line.startswith('ERROR'):
+                break
+        self.sock.close()
+
+
+def send_msg(msgs, server='localhost', port='6667', channels=[], nick_to=[], key=None, topic=None,
              nick="ansible", color='none', passwd=False, timeout=30, use_ssl=False):
-    '''send message to IRC'''
+    '''send messages to IRC'''
 
     colornumbers = {
         'black': "01",
@@ -145,58 +229,58 @@ def send_msg(msg, server='localhost', port='6667', channel=None, nick_to=[], key
     except:
         colortext = ""
 
-    message = colortext + msg
-
-    irc = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-    if use_ssl:
-        irc = ssl.wrap_socket(irc)
-    irc.connect((server, int(port)))
+    irc = IrcConnection(server, port, timeout, use_ssl)
     if passwd:
-        irc.send('PASS %s\r\n' % passwd)
-    irc.send('NICK %s\r\n' % nick)
-    irc.send('USER %s %s %s :ansible IRC\r\n' % (nick, nick, nick))
-    motd = ''
-    start = time.time()
-    while 1:
-        motd += irc.recv(1024)
-        # The server might send back a shorter nick than we specified (due to NICKLEN),
-        #  so grab that and use it from now on (assuming we find the 00[1-4] response).
-        match = re.search('^:\S+ 00[1-4] (?P<nick>\S+) :', motd, flags=re.M)
+        irc.send('PASS %s' % passwd)
+    irc.send('NICK %s' % nick)
+    irc.send('USER %s %s %s :ansible IRC' % (nick, nick, nick))
+
+    # The server might send back a shorter nick than we specified (due to NICKLEN),
+    #  so grab that and use it from now on (assuming we find the 00[1-4] response).
+    welcomed = False
+    for line in irc.lines(time.time() + timeout):
+        match = re.search('^:\S+ 00[1-4] (?P<nick>\S+) :', line)
         if match:
             nick = match.group('nick')
+            welcomed = True
             break
-        elif time.time() - start > timeout:
-            raise Exception('Timeout waiting for IRC server welcome response')
-        sleep(0.5)
-
-    if key:
-        irc.send('JOIN %s %s\r\n' % (channel, key))
-    else:
-        irc.send('JOIN %s\r\n' % channel)
-
-    join = ''
-    start = time.time()
-    while 1:
-        join += irc.recv(1024)
-        if re.search('^:\S+ 366 %s %s :' % (nick, channel), join, flags=re.M):
-            break
-        elif time.time() - start > timeout:
+        elif re.search('^:\S+ 43[1-6] ', line) or line.startswith('ERROR'):
+            raise Exception('IRC server refused registration: %s' % line)
+    if not welcomed:
+        raise Exception('Timeout waiting for IRC server welcome response')
+
+    if channels:
+        if key:
+            irc.send('JOIN %s %s' % (','.join(channels), ','.join([key] * len(channels))))
+        else:
+            irc.send('JOIN %s' % ','.join(channels))
+
+        waiting = set([channel.lower() for channel in channels])
+        for line in irc.lines(time.time() + timeout):
+            match = re.search('^:\S+ (?P<code>\d{3}) %s (?P<channel>\S+) :' % re.escape(nick), line)
+            if not match:
+                continue
+            if match.group('code') == '366':
+                waiting.discard(match.group('channel').lower())
+                if not waiting:
+                    break
+            elif match.group('code') in JOIN_ERRORS:
+                raise Exception('Unable to join %s: %s' % (match.group('channel'), line))
+        if waiting:
             raise Exception('Timeout waiting for IRC JOIN response')
-        sleep(0.5)
-
-    if topic is not None:
-        irc.send('TOPIC %s :%s\r\n' % (channel, topic))
-        sleep(1)
-
-    if nick_to:
-        for nick in nick_to:
-            irc.send('PRIVMSG %s :%s\r\n' % (nick, message))
-    if channel:
-        irc.send('PRIVMSG %s :%s\r\n' % (channel, message))
-    sleep(1)
-    irc.send('PART %s\r\n' % channel)
-    irc.send('QUIT\r\n')
-    sleep(1)
+
+        if topic is not None:
+            for channel in channels:
+                irc.send('TOPIC %s :%s' % (channel, topic))
+
+    for msg in msgs:
+        message = colortext + msg
+        for target in (nick_to or []) + channels:
+            irc.send('PRIVMSG %s :%s' % (target, message))
+
+    if channels:
+        irc.send('PART %s' % ','.join(channels))
+    irc.send('QUIT')
     irc.close()
 
 # ===========================================
@@ -211,10 +295,11 @@ def main():
             port=dict(default=6667),
             nick=dict(default='ansible'),
             nick_to=dict(required=False, type='list'),
-            msg=dict(required=True),
+            msg=dict(required=False),
+            messages=dict(required=False, type='list'),
             color=dict(default="none", choices=["yellow", "red", "green",
                                                  "blue", "black", "none"]),
-            channel=dict(required=False),
+            channel=dict(required=False, type='list'),
             key=dict(),
             topic=dict(),
             passwd=dict(),
@@ -222,7 +307,8 @@ def main():
             use_ssl=dict(type='bool', default=False)
         ),
         supports_check_mode=True,
-        required_one_of=[['channel', 'nick_to']]
+        required_one_of=[['channel', 'nick_to'], ['msg', 'messages']],
+        mutually_exclusive=[['msg', 'messages']]
     )
 
     server = module.params["server"]
@@ -230,8 +316,9 @@ def main():
     nick = module.params["nick"]
     nick_to = module.params["nick_to"]
     msg = module.params["msg"]
+    msgs = module.params["messages"] or [msg]
     color = module.params["color"]
-    channel = module.params["channel"]
+    channel = module.params["channel"] or []
     topic = module.params["topic"]
     if topic and not channel:
         module.fail_json(msg="When topic is specified, a channel is required.")
@@ -241,10 +328,19 @@ def main():
     use_ssl = module.params["use_ssl"]
 
     try:
-        send_msg(msg, server, port, channel, nick_to, key, topic, nick, color, passwd, timeout, use_ssl)
+        send_msg(msgs, server, port, channel, nick_to, key, topic, nick, color, passwd, timeout, use_ssl)
     except Exception, e:
         module.fail_json(msg="unable to send to IRC: %s" % e)
 
+    # report a single channel the way it was given
+    if len(channel) == 1:
+        channel = channel[0]
+    elif not channel:
+        channel = None
+
+    if module.params["messages"] is not None:
+        module.exit_json(changed=False, channel=channel, nick=nick,
+                         messages=msgs)
     module.exit_json(changed=False, channel=channel, nick=nick,
                      msg=msg)
 
@@ -62,7 +62,8 @@ options:
   subject:
     description:
       - The subject of the email being sent.
-    required: true
+      - Required unless I(messages) is given.
+    required: false
   body:
     description:
       - The body of the email being sent.
@@ -116,6 +117,30 @@ options:
     default: 'plain'
     required: false
     version_added: "2.0"
+  secure:
+    description:
+      - How to connect to the mail server. C(always) uses SSL, C(never) a plain
+        connection and C(try) attempts SSL first and falls back to a plain connection.
+      - With C(try) the outcome is remembered per host and port in
+        C(~/.ansible/tmp/mail_secure.json), so later runs connect the right way at once.
+    default: 'try'
+    choices: [ 'always', 'never', 'try' ]
+    required: false
+    version_added: "2.1"
+  messages:
+    description:
+      - A list of messages to send over one SMTP session, each a dict with the key
+        C(subject) and optionally C(body), C(to), C(cc), C(bcc), C(attach) and
+        C(headers), which default to the module options of the same name.
+        C(to), C(cc), C(bcc), C(attach) and C(headers) may also be given as lists.
+    default: null
+    required: false
+    version_added: "2.1"
+notes:
+  - Attachments are read and base64 encoded in chunks while the message is sent,
+    so large files are never held in memory as a whole.
+  - Recipients are announced in a single round-trip when the server supports
+    the SMTP C(PIPELINING) extension.
 """
 
 EXAMPLES = '''
@@ -144,6 +169,18 @@ EXAMPLES = '''
                 attach="/etc/group /tmp/pavatar2.png"
                 headers=Reply-To=john@example.com|X-Special="Something or other"
                 charset=utf8
+# Send a batch of reports over one SMTP session
+- local_action:
+    module: mail
+    host: smtp.example.com
+    to: "Ops <ops@example.com>"
+    messages:
+      - subject: "Nightly report for web"
+        attach: /var/log/reports/web.log
+      - subject: "Nightly report for db"
+        attach: /var/log/reports/db.log
+        cc: "DBA <dba@example.com>"
+
 # Sending an e-mail using the remote machine, not the Ansible controller node
 - mail:
     host='localhost'
@@ -153,10 +190,13 @@ EXAMPLES = '''
     body='System {{ ansible_hostname }} has been successfully provisioned.'
 '''
 
+import base64
+import json
 import os
 import sys
 import smtplib
 import ssl
+import tempfile
 
 try:
     from email import encoders
@@ -173,70 +213,83 @@ except ImportError:
     from email.MIMEMultipart import MIMEMultipart
     from email.MIMEText import MIMEText
 
-def main():
+# 57 bytes of input make one 76 character line of base64 output
+ATTACH_CHUNK_SIZE = 57 * 1024
 
-    module = AnsibleModule(
-        argument_spec = dict(
-            username = dict(default=None),
-            password = dict(default=None),
-            host = dict(default='localhost'),
-            port = dict(default='25'),
-            sender = dict(default='root', aliases=['from']),
-            to = dict(default='root', aliases=['recipients']),
-            cc = dict(default=None),
-            bcc = dict(default=None),
-            subject = dict(required=True, aliases=['msg']),
-            body = dict(default=None),
-            attach = dict(default=None),
-            headers = dict(default=None),
-            charset = dict(default='us-ascii'),
-            subtype = dict(default='plain')
-        )
-    )
+SECURE_CACHE = '~/.ansible/tmp/mail_secure.json'
 
-    username = module.params.get('username')
-    password = module.params.get('password')
-    host = module.params.get('host')
-    port = module.params.get('port')
-    sender = module.params.get('sender')
-    recipients = module.params.get('to')
-    copies = module.params.get('cc')
-    blindcopies = module.params.get('bcc')
-    subject = module.params.get('subject')
-    body = module.params.get('body')
-    attach_files = module.params.get('attach')
-    headers = module.params.get('headers')
-    charset = module.params.get('charset')
-    subtype = module.params.get('subtype')
-    sender_phrase, sender_addr = parseaddr(sender)
+# keys of an entry of messages, with the separator of those that take several values
+MESSAGE_KEYS = ['subject', 'body', 'to', 'cc', 'bcc', 'attach', 'headers']
+LIST_SEPARATORS = {'to': ',', 'cc': ',', 'bcc': ',', 'attach': ' ', 'headers': '|'}
 
-    if not body:
-        body = subject
 
+def read_secure_cache():
     try:
+        f = open(os.path.expanduser(SECURE_CACHE))
         try:
-            smtp = smtplib.SMTP_SSL(host, port=int(port))
-        except (smtplib.SMTPException, ssl.SSLError):
-            smtp = smtplib.SMTP(host, port=int(port))
-    except Exception, e:
-        module.fail_json(rc=1, msg='Failed to send mail to server %s on port %s: %s' % (host, port, e))
+            return json.load(f)
+        finally:
+            f.close()
+    except (IOError, ValueError):
+        return {}
 
-    smtp.ehlo()
-    if username and password:
-        if smtp.has_extn('STARTTLS'):
-            smtp.starttls()
+
+def write_secure_cache(module, cache):
+    path = os.path.expanduser(SECURE_CACHE)
+    try:
+        if not os.path.isdir(os.path.dirname(path)):
+            os.makedirs(os.path.dirname(path), 0700)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path))
+        f = os.fdopen(fd, 'w')
         try:
-            smtp.login(username, password)
-        except smtplib.SMTPAuthenticationError:
-            module.fail_json(msg="Authentication to %s:%s failed, please check your username and/or password" % (host, port))
+            json.dump(cache, f)
+        finally:
+            f.close()
+        module.atomic_move(tmp_path, path)
+    except (IOError, OSError):
+        # only an optimisation for the next run
+        pass
+
+
+def smtp_connect(module, host, port, secure):
+    if secure == 'always':
+        return smtplib.SMTP_SSL(host, port=int(port))
+    if secure == 'never':
+        return smtplib.SMTP(host, port=int(port))
+
+    key = '%s:%s' % (host, port)
+    cache = read_secure_cache()
+    if cache.get(key) == 'never':
+        attempts = ['never', 'always']
+    else:
+        attempts = ['always', 'never']
+    try:
+        smtp = smtp_connect(module, host, port, attempts[0])
+        mode = attempts[0]
+    except (smtplib.SMTPException, ssl.SSLError):
+        smtp = smtp_connect(module, host, port, attempts[1])
+        mode = attempts[1]
+    if cache.get(key) != mode:
+        cache[key] = mode
+        write_secure_cache(module, cache)
+    return smtp
+
+
+def build_message(module, params):
+    """ Compose the MIME tree of one message, with a placeholder as the
+    payload of every attachment, and open the attached files """
+    sender_phrase, sender_addr = parseaddr(params['sender'])
+    body = params['body']
+    if not body:
+        body = params['subject']
 
     msg = MIMEMultipart()
-    msg['Subject'] = subject
+    msg['Subject'] = params['subject']
     msg['From'] = formataddr((sender_phrase, sender_addr))
     msg.preamble = "Multipart message"
 
-    if headers is not None:
-        for hdr in [x.strip() for x in headers.split('|')]:
+    if params['headers'] is not None:
+        for hdr in [x.strip() for x in params['headers'].split('|')]:
             try:
                 h_key, h_val = hdr.split('=')
                 msg.add_header(h_key, h_val)
@@ -250,16 +303,16 @@ def main():
     cc_list = []
     addr_list = []
 
-    if recipients is not None:
-        for addr in [x.strip() for x in recipients.split(',')]:
+    if params['to'] is not None:
+        for addr in [x.strip() for x in params['to'].split(',')]:
             to_list.append( formataddr( parseaddr(addr)) )
             addr_list.append( parseaddr(addr)[1] )    # address only, w/o phrase
-    if copies is not None:
-        for addr in [x.strip() for x in copies.split(',')]:
+    if params['cc'] is not None:
+        for addr in [x.strip() for x in params['cc'].split(',')]:
             cc_list.append( formataddr( parseaddr(addr)) )
             addr_list.append( parseaddr(addr)[1] )    # address only, w/o phrase
-    if blindcopies is not None:
-        for addr in [x.strip() for x in blindcopies.split(',')]:
+    if params['bcc'] is not None:
+        for addr in [x.strip() for x in params['bcc'].split(',')]:
             addr_list.append( parseaddr(addr)[1] )
 
     if len(to_list) > 0:
@@ -267,35 +320,169 @@ def main():
     if len(cc_list) > 0:
         msg['Cc'] = ", ".join(cc_list)
 
-    part = MIMEText(body + "\n\n", _subtype=subtype, _charset=charset)
+    part = MIMEText(body + "\n\n", _subtype=params['subtype'], _charset=params['charset'])
     msg.attach(part)
 
-    if attach_files is not None:
-        for file in attach_files.split():
+    attachments = []
+    if params['attach'] is not None:
+        for file in params['attach'].split():
             try:
                 fp = open(file, 'rb')
-
-                part = MIMEBase('application', 'octet-stream')
-                part.set_payload(fp.read())
-                fp.close()
-
-                encoders.encode_base64(part)
-
-                part.add_header('Content-disposition', 'attachment', filename=os.path.basename(file))
-                msg.attach(part)
             except Exception, e:
                 module.fail_json(rc=1, msg="Failed to send mail: can't attach file %s: %s" % (file, e))
                 sys.exit()
 
+            placeholder = '@@ansible-attachment-%d-%s@@' % (len(attachments), os.urandom(8).encode('hex'))
+            part = MIMEBase('application', 'octet-stream')
+            part.set_payload(placeholder)
+            part.add_header('Content-Transfer-Encoding', 'base64')
+            part.add_header('Content-disposition', 'attachment', filename=os.path.basename(file))
+            msg.attach(part)
+            attachments.append((placeholder, fp))
+
+    return sender_addr, set(addr_list), msg, attachments
+
+
+def message_chunks(msg, attachments):
+    """ Yield the message as SMTP DATA, streaming the attachments through
+    the base64 encoder chunk by chunk """
     composed = msg.as_string()
+    for placeholder, fp in attachments:
+        head, composed = composed.split(placeholder, 1)
+        yield smtplib.quotedata(head)
+        # no try/finally around yield, python 2.4 does not allow it
+        while True:
+            data = fp.read(ATTACH_CHUNK_SIZE)
+            if not data:
+                break
+            # base64 lines never start with a dot, no quoting needed
+            yield base64.encodestring(data).replace('\n', '\r\n')
+        fp.close()
+    yield smtplib.quotedata(composed)
+
+
+def send_message(smtp, sender_addr, addr_list, chunks):
+    """ Send one message, announcing sender and recipients in one
+    round-trip when the server supports pipelining """
+    addr_list = list(addr_list)
+    if smtp.has_extn('pipelining'):
+        commands = ['MAIL FROM:%s' % smtplib.quoteaddr(sender_addr)]
+        commands += ['RCPT TO:%s' % smtplib.quoteaddr(addr) for addr in addr_list]
+        smtp.send(''.join([command + '\r\n' for command in commands]))
+        replies = [smtp.getreply() for command in commands]
+    else:
+        replies = [smtp.mail(sender_addr)]
+        replies += [smtp.rcpt(addr) for addr in addr_list]
+
+    code, resp = replies[0]
+    if code != 250:
+        smtp.rset()
+        raise smtplib.SMTPSenderRefused(code, resp, sender_addr)
+    refused = {}
+    for addr, (code, resp) in zip(addr_list, replies[1:]):
+        if code not in (250, 251):
+            refused[addr] = (code, resp)
+    if len(refused) == len(addr_list):
+        smtp.rset()
+        raise smtplib.SMTPRecipientsRefused(refused)
+
+    code, resp = smtp.docmd('DATA')
+    if code != 354:
+        smtp.rset()
+        raise smtplib.SMTPDataError(code, resp)
+    last = ''
+    for chunk in chunks:
+        smtp.send(chunk)
+        if chunk:
+            last = chunk
+    if last.endswith('\r\n'):
+        smtp.send('.\r\n')
+    else:
+        smtp.send('\r\n.\r\n')
+    code, resp = smtp.getreply()
+    if code != 250:
+        raise smtplib.SMTPDataError(code, resp)
+    return refused
+
+
+def main():
+
+    module = AnsibleModule(
+        argument_spec = dict(
+            username = dict(default=None),
+            password = dict(default=None),
+            host = dict(default='localhost'),
+            port = dict(default='25'),
+            sender = dict(default='root', aliases=['from']),
+            to = dict(default='root', aliases=['recipients']),
+            cc = dict(default=None),
+            bcc = dict(default=None),
+            subject = dict(default=None, aliases=['msg']),
+            body = dict(default=None),
+            attach = dict(default=None),
+            headers = dict(default=None),
+            charset = dict(default='us-ascii'),
+            subtype = dict(default='plain'),
+            secure = dict(default='try', choices=['always', 'never', 'try']),
+            messages = dict(default=None, type='list'),
+        ),
+        required_one_of = [['subject', 'messages']],
+        mutually_exclusive = [['subject', 'messages']]
+    )
+
+    username = module.params.get('username')
+    password = module.params.get('password')
+    host = module.params.get('host')
+    port = module.params.get('port')
+
+    if module.params['messages'] is not None:
+        messages = []
+        for item in module.params['messages']:
+            if not isinstance(item, dict):
+                module.fail_json(msg="each entry of messages must be a dict")
+            unknown = set(item).difference(MESSAGE_KEYS)
+            if unknown:
+                module.fail_json(msg="unsupported keys in messages: %s" % ', '.join(sorted(unknown)))
+            if not item.get('subject'):
+                module.fail_json(msg="subject must be supplied for each message")
+            params = dict(module.params)
+            for key, value in item.items():
+                # lists are joined the way the option is written as a string
+                if isinstance(value, list) and key in LIST_SEPARATORS:
+                    value = LIST_SEPARATORS[key].join([str(v) for v in value])
+                elif value is not None and not isinstance(value, basestring):
+                    module.fail_json(msg="%s of a message must be a string" % key)
+                params[key] = value
+            messages.append(params)
+    else:
+        messages = [module.params]
 
     try:
-        smtp.sendmail(sender_addr, set(addr_list), composed)
+        smtp = smtp_connect(module, host, port, module.params['secure'])
     except Exception, e:
-        module.fail_json(rc=1, msg='Failed to send mail to %s: %s' % (", ".join(addr_list), e))
+        module.fail_json(rc=1, msg='Failed to send mail to server %s on port %s: %s' % (host, port, e))
+
+    smtp.ehlo()
+    if username and password:
+        if smtp.has_extn('STARTTLS'):
+            smtp.starttls()
+            smtp.ehlo()
+        try:
+            smtp.login(username, password)
+        except smtplib.SMTPAuthenticationError:
+            module.fail_json(msg="Authentication to %s:%s failed, please check your username and/or password" % (host, port))
+
+    for params in messages:
+        sender_addr, addr_list, msg, attachments = build_message(module, params)
+        try:
+            send_message(smtp, sender_addr, addr_list, message_chunks(msg, attachments))
+        except Exception, e:
+            module.fail_json(rc=1, msg='Failed to send mail to %s: %s' % (", ".join(addr_list), e))
 
     smtp.quit()
 
+    if module.params['messages'] is not None:
+        module.exit_json(changed=False, sent=len(messages))
     module.exit_json(changed=False)
 
 # import module snippets
@@ -52,6 +52,21 @@ options:
     description:
       the desired subject for the email
     required: true
+  individually:
+    description:
+      send a separate email to every address in I(to_addresses) instead of
+      one email to all of them. The emails are sent concurrently and the
+      delivery status and latency of each address is returned in C(results).
+    required: false
+    default: "no"
+    choices: ["yes", "no"]
+    version_added: "2.1"
+  concurrency:
+    description:
+      the maximum number of emails sent at the same time with I(individually)
+    required: false
+    default: 4
+    version_added: "2.1"
 
 author: "Matt Makai (@makaimc)"
 '''
@@ -79,12 +94,25 @@ EXAMPLES = '''
       subject: "Build failure!."
       body: "Unable to pull source repository from Git server."
   delegate_to: localhost
+
+# send every on-call engineer an email of their own
+- sendgrid:
+    username: "{{ sendgrid_username }}"
+    password: "{{ sendgrid_password }}"
+    from_address: "alerts@mycompany.com"
+    to_addresses: "{{ oncall_addresses }}"
+    individually: yes
+    subject: "Deployment started"
+    body: "The production deployment has started."
+  delegate_to: localhost
 '''
 
 # =======================================
 # sendgrid module support methods
 #
+import time
 import urllib
+from multiprocessing.pool import ThreadPool
 
 def post_sendgrid_api(module, username, password, from_address, to_addresses,
         subject, body):
@@ -106,6 +134,26 @@ def post_sendgrid_api(module, username, password, from_address, to_addresses,
     return fetch_url(module, SENDGRID_URI, data=encoded_data, headers=headers, method='POST')
 
 
+def post_sendgrid_api_individually(module, username, password, from_address,
+        to_addresses, subject, body, concurrency=4):
+    """Send every address its own email in parallel, reporting each delivery"""
+
+    def post(recipient):
+        start = time.time()
+        response, info = post_sendgrid_api(module, username, password,
+            from_address, [recipient], subject, body)
+        result = dict(recipient=recipient, delivered=info['status'] == 200,
+                      latency=round(time.time() - start, 3))
+        if not result['delivered']:
+            result['error'] = info['msg']
+        return result
+
+    pool = ThreadPool(max(1, min(concurrency, len(to_addresses))))
+    results = pool.map(post, to_addresses)
+    pool.close()
+    return results
+
+
 # =======================================
 # Main
 #
@@ -119,6 +167,8 @@ def main():
             to_addresses=dict(required=True, type='list'),
             subject=dict(required=True),
             body=dict(required=True),
+            individually=dict(default=False, type='bool'),
+            concurrency=dict(default=4, type='int'),
         ),
         supports_check_mode=True
     )
@@ -130,6 +180,15 @@ def main():
     subject = module.params['subject']
     body = module.params['body']
 
+    if module.params['individually']:
+        results = post_sendgrid_api_individually(module, username, password,
+            from_address, to_addresses, subject, body, module.params['concurrency'])
+        failed = [r['recipient'] for r in results if not r['delivered']]
+        if failed:
+            module.fail_json(msg="unable to send email through SendGrid API to %s" % ', '.join(failed),
+                results=results)
+        module.exit_json(msg=subject, changed=False, results=results)
+
     response, info = post_sendgrid_api(module, username, password,
         from_address, to_addresses, subject, body)
     if info['status'] != 200:
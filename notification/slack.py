@@ -50,6 +50,8 @@ options:
   channel:
     description:
       - Channel to send the message to. If absent, the message goes to the channel selected for the I(token).
+      - Since version 2.1 a list of channels may be given; the message is then posted to all of them concurrently
+        and the delivery status and latency of each channel is returned in C(results).
     required: false
   username:
     description:
@@ -100,6 +102,12 @@ options:
       - 'good'
       - 'warning'
       - 'danger'
+  concurrency:
+    version_added: 2.1
+    description:
+      - Maximum number of channels from I(channel) that are notified at the same time.
+    required: false
+    default: 4
 """
 
 EXAMPLES = """
@@ -130,8 +138,21 @@ EXAMPLES = """
     color: good
     username: ""
     icon_url: ""
+
+- name: Send notification message to several channels at once
+  local_action:
+    module: slack
+    token: thetokengeneratedbyslack
+    msg: "{{ inventory_hostname }} deployed"
+    channel:
+      - "#ops"
+      - "#deploys"
+      - "@oncall"
 """
 
+import time
+from multiprocessing.pool import ThreadPool
+
 OLD_SLACK_INCOMING_WEBHOOK = 'https://%s/services/hooks/incoming-webhook?token=%s'
 SLACK_INCOMING_WEBHOOK = 'https://hooks.slack.com/services/%s'
 
@@ -159,41 +180,62 @@ def build_payload_for_slack(module, text, channel, username, icon_url, icon_emoj
     payload="payload=" + module.jsonify(payload)
     return payload
 
-def do_notify_slack(module, domain, token, payload):
+def get_slack_incoming_webhook(module, domain, token):
     if token.count('/') >= 2:
         # New style token
-        slack_incoming_webhook = SLACK_INCOMING_WEBHOOK % (token)
-    else:
-        if not domain:
-            module.fail_json(msg="Slack has updated its webhook API.  You need to specify a token of the form XXXX/YYYY/ZZZZ in your playbook")
-        slack_incoming_webhook = OLD_SLACK_INCOMING_WEBHOOK % (domain, token)
+        return SLACK_INCOMING_WEBHOOK % (token)
+    if not domain:
+        module.fail_json(msg="Slack has updated its webhook API.  You need to specify a token of the form XXXX/YYYY/ZZZZ in your playbook")
+    return OLD_SLACK_INCOMING_WEBHOOK % (domain, token)
+
+def do_notify_slack(module, domain, token, payload):
+    slack_incoming_webhook = get_slack_incoming_webhook(module, domain, token)
 
     response, info = fetch_url(module, slack_incoming_webhook, data=payload)
     if info['status'] != 200:
         obscured_incoming_webhook = SLACK_INCOMING_WEBHOOK % ('[obscured]')
         module.fail_json(msg=" failed to send %s to %s: %s" % (payload, obscured_incoming_webhook, info['msg']))
 
+def do_notify_slack_channels(module, domain, token, payloads, concurrency=4):
+    """ post one payload per channel in parallel and report how each delivery went """
+    slack_incoming_webhook = get_slack_incoming_webhook(module, domain, token)
+
+    def notify(channel):
+        start = time.time()
+        response, info = fetch_url(module, slack_incoming_webhook, data=payloads[channel])
+        result = dict(recipient=channel, delivered=info['status'] == 200,
+                      latency=round(time.time() - start, 3))
+        if not result['delivered']:
+            result['error'] = info['msg']
+        return result
+
+    pool = ThreadPool(max(1, min(concurrency, len(payloads))))
+    results = pool.map(notify, sorted(payloads))
+    pool.close()
+    return results
+
 def main():
     module = AnsibleModule(
         argument_spec = dict(
             domain      = dict(type='str', required=False, default=None),
             token       = dict(type='str', required=True, no_log=True),
             msg         = dict(type='str', required=True),
-            channel     = dict(type='str', default=None),
+            channel     = dict(type='list', default=None),
             username    = dict(type='str', default='Ansible'),
             icon_url    = dict(type='str', default='http://www.ansible.com/favicon.ico'),
             icon_emoji  = dict(type='str', default=None),
             link_names  = dict(type='int', default=1, choices=[0,1]),
             parse       = dict(type='str', default=None, choices=['none', 'full']),
             validate_certs = dict(default='yes', type='bool'),
-            color       = dict(type='str', default='normal', choices=['normal', 'good', 'warning', 'danger'])
+            color       = dict(type='str', default='normal', choices=['normal', 'good', 'warning', 'danger']),
+            concurrency = dict(type='int', default=4),
         )
     )
 
     domain = module.params['domain']
     token = module.params['token']
     text = module.params['msg']
-    channel = module.params['channel']
+    channels = module.params['channel'] or [None]
     username = module.params['username']
     icon_url = module.params['icon_url']
     icon_emoji = module.params['icon_emoji']
@@ -201,7 +243,16 @@ def main():
     parse = module.params['parse']
     color = module.params['color']
 
-    payload = build_payload_for_slack(module, text, channel, username, icon_url, icon_emoji, link_names, parse, color)
+    if len(channels) > 1:
+        payloads = dict((channel, build_payload_for_slack(module, text, channel, username, icon_url, icon_emoji, link_names, parse, color))
+                        for channel in channels)
+        results = do_notify_slack_channels(module, domain, token, payloads, module.params['concurrency'])
+        failed = [r['recipient'] for r in results if not r['delivered']]
+        if failed:
+            module.fail_json(msg="failed to send to %s" % ', '.join(failed), results=results)
+        module.exit_json(msg="OK", results=results)
+
+    payload = build_payload_for_slack(module, text, channels[0], username, icon_url, icon_emoji, link_names, parse, color)
     do_notify_slack(module, domain, token, payload)
 
     module.exit_json(msg="OK")
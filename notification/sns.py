@@ -29,7 +29,8 @@ options:
   msg:
     description:
       - Default message to send.
-    required: true
+      - Required unless I(messages) is given.
+    required: false
     aliases: [ "default" ]
   subject:
     description:
@@ -38,7 +39,8 @@ options:
   topic:
     description:
       - The topic you want to publish to.
-    required: true
+      - Required unless I(messages) is given.
+    required: false
   email:
     description:
       - Message to send to email-only subscription
@@ -76,6 +78,26 @@ options:
       - The AWS region to use. If not specified then the value of the EC2_REGION environment variable, if any, is used.
     required: false
     aliases: ['aws_region', 'ec2_region']
+  messages:
+    description:
+      - List of messages to publish in one run, each a dict with the keys C(msg) and C(topic)
+        and optionally C(subject), C(email), C(sqs), C(sms), C(http) and C(https), which
+        default to the module options of the same name.
+      - All messages are published over one connection and topic names are resolved
+        with a single listing of the topics.
+    required: false
+    default: null
+    version_added: "2.1"
+  topic_cache:
+    description:
+      - Remember the ARNs of the topics per region and account in
+        C(~/.ansible/tmp/sns_topics.json), so that later runs publish to a topic
+        name without listing all topics first. A cached ARN that no longer
+        exists is looked up again.
+    required: false
+    default: "yes"
+    choices: [ "yes", "no" ]
+    version_added: "2.1"
 
 requirements: [ "boto" ]
 author: Michael J. Schultz
@@ -96,9 +118,23 @@ EXAMPLES = """
     sms: "deployed!"
     subject: "Deploy complete!"
     topic: "deploy"
+
+- name: Send several notifications via SNS in one go
+  local_action:
+    module: sns
+    subject: "Deploy complete!"
+    messages:
+      - topic: "deploy"
+        msg: "{{ inventory_hostname }} has completed the play."
+      - topic: "audit"
+        msg: "{{ inventory_hostname }} deployed {{ version }}."
+        sms: "deployed {{ version }}"
 """
 
+import hashlib
+import os
 import sys
+import tempfile
 
 from ansible.module_utils.basic import *
 from ansible.module_utils.ec2 import *
@@ -112,42 +148,150 @@ except ImportError:
     sys.exit(1)
 
 
-def arn_topic_lookup(connection, short_topic):
-    response = connection.get_all_topics()
-    result = response[u'ListTopicsResponse'][u'ListTopicsResult']
-    # topic names cannot have colons, so this captures the full topic name
-    lookup_topic = ':{}'.format(short_topic)
-    for topic in result[u'Topics']:
-        if topic[u'TopicArn'].endswith(lookup_topic):
-            return topic[u'TopicArn']
-    return None
+TOPIC_CACHE = '~/.ansible/tmp/sns_topics.json'
+MESSAGE_KEYS = ['msg', 'subject', 'topic', 'email', 'sqs', 'sms', 'http', 'https']
+
+
+def read_topic_cache():
+    try:
+        f = open(os.path.expanduser(TOPIC_CACHE))
+        try:
+            return json.load(f)
+        finally:
+            f.close()
+    except (IOError, ValueError):
+        return {}
+
+
+def write_topic_cache(module, cache):
+    path = os.path.expanduser(TOPIC_CACHE)
+    try:
+        if not os.path.isdir(os.path.dirname(path)):
+            os.makedirs(os.path.dirname(path), 0700)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path))
+        f = os.fdopen(fd, 'w')
+        try:
+            json.dump(cache, f)
+        finally:
+            f.close()
+        module.atomic_move(tmp_path, path)
+    except (IOError, OSError):
+        # only an optimisation for the next run
+        pass
+
+
+def topic_cache_key(connection, region):
+    # the access key stands in for the account, without an extra IAM call
+    access_key = connection.aws_access_key_id or ''
+    return '{}/{}'.format(region, hashlib.sha1(access_key).hexdigest()[:16])
+
+
+def list_topic_arns(connection):
+    arns = {}
+    next_token = None
+    while True:
+        response = connection.get_all_topics(next_token)
+        result = response[u'ListTopicsResponse'][u'ListTopicsResult']
+        for topic in result[u'Topics']:
+            # topic names cannot have colons, so this captures the full topic name
+            arn = topic[u'TopicArn']
+            arns[arn.rsplit(':', 1)[1]] = arn
+        next_token = result.get(u'NextToken')
+        if not next_token:
+            return arns
+
+
+def arn_topic_lookup(connection, short_topic, topics=None):
+    """ topics maps names to ARNs; it is consulted first and refreshed
+    from a full listing when short_topic is not in it """
+    if topics is not None and short_topic in topics:
+        return topics[short_topic]
+    arns = list_topic_arns(connection)
+    if topics is not None:
+        topics.clear()
+        topics.update(arns)
+    return arns.get(short_topic)
+
+
+def publish(module, connection, message, topics):
+    """ publish one message, returns the message id """
+    topic = message['topic']
+
+    # .publish() takes full ARN topic id, but I'm lazy and type shortnames
+    # so do a lookup (topics cannot contain ':', so thats the decider)
+    if ':' in topic:
+        arn_topic = topic
+    else:
+        cached = topic in topics
+        arn_topic = arn_topic_lookup(connection, topic, topics)
+
+    if not arn_topic:
+        module.fail_json(msg='Could not find topic: {}'.format(topic))
+
+    dict_msg = {'default': message['msg']}
+    for protocol in ['email', 'sqs', 'sms', 'http', 'https']:
+        if message[protocol]:
+            dict_msg[protocol] = message[protocol]
+
+    json_msg = json.dumps(dict_msg)
+    try:
+        try:
+            response = connection.publish(topic=arn_topic, subject=message['subject'],
+                                          message_structure='json', message=json_msg)
+        except boto.exception.BotoServerError, e:
+            if ':' in topic or not cached or e.error_code != 'NotFound':
+                raise
+            # the topic was recreated since it was cached
+            del topics[topic]
+            arn_topic = arn_topic_lookup(connection, topic, topics)
+            if not arn_topic:
+                module.fail_json(msg='Could not find topic: {}'.format(topic))
+            response = connection.publish(topic=arn_topic, subject=message['subject'],
+                                          message_structure='json', message=json_msg)
+    except boto.exception.BotoServerError, e:
+        module.fail_json(msg=str(e))
+
+    return response[u'PublishResponse'][u'PublishResult'][u'MessageId']
 
 
 def main():
     argument_spec = ec2_argument_spec()
     argument_spec.update(
         dict(
-            msg=dict(type='str', required=True, aliases=['default']),
+            msg=dict(type='str', default=None, aliases=['default']),
             subject=dict(type='str', default=None),
-            topic=dict(type='str', required=True),
+            topic=dict(type='str', default=None),
             email=dict(type='str', default=None),
             sqs=dict(type='str', default=None),
             sms=dict(type='str', default=None),
             http=dict(type='str', default=None),
             https=dict(type='str', default=None),
+            messages=dict(type='list', default=None),
+            topic_cache=dict(type='bool', default=True),
         )
     )
 
     module = AnsibleModule(argument_spec=argument_spec)
 
-    msg = module.params['msg']
-    subject = module.params['subject']
-    topic = module.params['topic']
-    email = module.params['email']
-    sqs = module.params['sqs']
-    sms = module.params['sms']
-    http = module.params['http']
-    https = module.params['https']
+    if module.params['messages'] is None:
+        missing = [key for key in ['msg', 'topic'] if module.params[key] is None]
+        if missing:
+            module.fail_json(msg="missing required arguments: %s" % ",".join(missing))
+        messages = [dict((key, module.params[key]) for key in MESSAGE_KEYS)]
+    else:
+        messages = []
+        for item in module.params['messages']:
+            if not isinstance(item, dict):
+                module.fail_json(msg="each entry of messages must be a dict")
+            if 'default' in item and 'msg' not in item:
+                item['msg'] = item.pop('default')
+            unknown = set(item).difference(MESSAGE_KEYS)
+            if unknown:
+                module.fail_json(msg="unsupported keys in messages: {}".format(', '.join(sorted(unknown))))
+            message = dict((key, item.get(key, module.params[key])) for key in MESSAGE_KEYS)
+            if message['msg'] is None or message['topic'] is None:
+                module.fail_json(msg="msg and topic are required for each entry of messages")
+            messages.append(message)
 
     region, ec2_url, aws_connect_params = get_aws_connection_info(module)
     if not region:
@@ -157,35 +301,23 @@ def main():
     except boto.exception.NoAuthHandlerFound, e:
         module.fail_json(msg=str(e))
 
-    # .publish() takes full ARN topic id, but I'm lazy and type shortnames
-    # so do a lookup (topics cannot contain ':', so thats the decider)
-    if ':' in topic:
-        arn_topic = topic
-    else:
-        arn_topic = arn_topic_lookup(connection, topic)
+    topics = {}
+    if module.params['topic_cache']:
+        cache = read_topic_cache()
+        key = topic_cache_key(connection, region)
+        topics.update(cache.get(key, {}))
+        cached_topics = dict(topics)
 
-    if not arn_topic:
-        module.fail_json(msg='Could not find topic: {}'.format(topic))
-
-    dict_msg = {'default': msg}
-    if email:
-        dict_msg.update(email=email)
-    if sqs:
-        dict_msg.update(sqs=sqs)
-    if sms:
-        dict_msg.update(sms=sms)
-    if http:
-        dict_msg.update(http=http)
-    if https:
-        dict_msg.update(https=https)
+    message_ids = []
+    for message in messages:
+        message_ids.append(publish(module, connection, message, topics))
 
-    json_msg = json.dumps(dict_msg)
-    try:
-        connection.publish(topic=arn_topic, subject=subject,
-                           message_structure='json', message=json_msg)
-    except boto.exception.BotoServerError, e:
-        module.fail_json(msg=str(e))
+    if module.params['topic_cache'] and topics != cached_topics:
+        cache[key] = topics
+        write_topic_cache(module, cache)
 
-    module.exit_json(msg="OK")
+    if module.params['messages'] is None:
+        module.exit_json(msg="OK")
+    module.exit_json(msg="OK", message_ids=message_ids)
 
 main()
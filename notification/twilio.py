@@ -46,7 +46,8 @@ options:
   to_number:
     description:
       one or more phone numbers to send the text message to,
-      format +15551112222
+      format +15551112222. Several numbers are messaged concurrently and
+      the delivery status and latency of each is returned in C(results).
     required: true
   from_number:
     description:
@@ -57,6 +58,12 @@ options:
       a URL with a picture, video or sound clip to send with an MMS
       (multimedia message) instead of a plain SMS
     required: false
+  concurrency:
+    description:
+      the maximum number of phone numbers messaged at the same time
+    required: false
+    default: 4
+    version_added: "2.1"
 
 author: "Matt Makai (@makaimc)"
 '''
@@ -104,7 +111,9 @@ EXAMPLES = '''
 # =======================================
 # twilio module support methods
 #
+import time
 import urllib
+from multiprocessing.pool import ThreadPool
 
 
 def post_twilio_api(module, account_sid, auth_token, msg, from_number,
@@ -130,6 +139,27 @@ def post_twilio_api(module, account_sid, auth_token, msg, from_number,
     return fetch_url(module, URI, data=encoded_data, headers=headers)
 
 
+def post_twilio_api_numbers(module, account_sid, auth_token, msg, from_number,
+                            to_numbers, media_url=None, concurrency=4):
+    """Send the message to all numbers in parallel, reporting each delivery"""
+
+    def post(number):
+        start = time.time()
+        r, info = post_twilio_api(module, account_sid, auth_token, msg,
+                from_number, number, media_url)
+        # a created message comes back as 201
+        result = dict(recipient=number, delivered=info['status'] in (200, 201),
+                      latency=round(time.time() - start, 3))
+        if not result['delivered']:
+            result['error'] = info['msg']
+        return result
+
+    pool = ThreadPool(max(1, min(concurrency, len(to_numbers))))
+    results = pool.map(post, to_numbers)
+    pool.close()
+    return results
+
+
 # =======================================
 # Main
 #
@@ -144,6 +174,7 @@ def main():
             from_number=dict(required=True),
             to_number=dict(required=True),
             media_url=dict(default=None, required=False),
+            concurrency=dict(default=4, type='int'),
         ),
         supports_check_mode=True
     )
@@ -158,11 +189,19 @@ def main():
     if not isinstance(to_number, list):
         to_number = [to_number]
 
-    for number in to_number:
-        r, info = post_twilio_api(module, account_sid, auth_token, msg,
-                from_number, number, media_url)
-        if info['status'] != 200:
-            module.fail_json(msg="unable to send message to %s" % number)
+    if len(to_number) > 1:
+        results = post_twilio_api_numbers(module, account_sid, auth_token, msg,
+                from_number, to_number, media_url, module.params['concurrency'])
+        failed = [r['recipient'] for r in results if not r['delivered']]
+        if failed:
+            module.fail_json(msg="unable to send message to %s" % ', '.join(failed),
+                             results=results)
+        module.exit_json(msg=msg, changed=False, results=results)
+
+    r, info = post_twilio_api(module, account_sid, auth_token, msg,
+            from_number, to_number[0], media_url)
+    if info['status'] not in (200, 201):
+        module.fail_json(msg="unable to send message to %s" % to_number[0])
 
     module.exit_json(msg=msg, changed=False)
 